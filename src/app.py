@@ -2,9 +2,7 @@
 
 from flask import Flask, request
 from health.main import get_health
-from main import post_transform
-from checkTokens.main import check_tokens
-from refreshTokens.main import refresh_tokens
+from main import get_metrics, post_transform, post_transform_batch, transform_jobs
 from flask_cors import CORS
 
 
@@ -21,14 +19,35 @@ def transform_route():
     """Mapping route for transform endpoint."""
     return post_transform(request)
 
+@app.route('/transform/batch', methods=['POST'])
+def transform_batch_route():
+    """Mapping route for batch transform endpoint."""
+    return post_transform_batch(request)
+
+@app.route('/transform/jobs', methods=['POST'])
+@app.route('/transform/jobs/<job_id>', methods=['GET'])
+@app.route('/transform/jobs/<job_id>/result', methods=['GET'])
+def transform_jobs_route(job_id=None):
+    """Mapping route for asynchronous transform job endpoints."""
+    return transform_jobs(request)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    """Mapping route for the metrics endpoint."""
+    return get_metrics(request)
+
 @app.route('/checkTokens', methods=['GET'])
 def checkTokens_route():
-    """Mapping route for checkTokens endpoint."""
+    """Mapping route for checkTokens endpoint (Firebase is loaded on first use)."""
+    from checkTokens.main import check_tokens
+
     return check_tokens(request)
 
 @app.route('/refreshTokens', methods=['GET'])
 def refreshTokens_route():
-    """Mapping route for refreshTokens endpoint."""
+    """Mapping route for refreshTokens endpoint (Firebase is loaded on first use)."""
+    from refreshTokens.main import refresh_tokens
+
     return refresh_tokens(request)
 
 if __name__ == '__main__':
@@ -3,34 +3,49 @@
 This module defines a Google Cloud Function for RateLimiting the transform Endpoint.
 """
 import base64
-import firebase_admin
 import functions_framework
 import json
-from firebase_admin import credentials, firestore
 from flask import jsonify
 import os
 import pytz
+import threading
 from datetime import datetime, timedelta
 
-GCP_SERVICE_ACCOUNT_CERTIFICATE_BASE64 = os.getenv( "GCP_SERVICE_ACCOUNT_CERTIFICATE" )
-if( GCP_SERVICE_ACCOUNT_CERTIFICATE_BASE64 is None ):
-    raise KeyError( "Env var GCP_SERVICE_ACCOUNT_CERTIFICATE not found!" )
+# Firestore client, created with the first request (see `get_db`).
+_db = None
+_db_lock = threading.Lock()
 
 
-GCP_SERVICE_ACCOUNT_CERTIFICATE_DECODED_BYTES = \
-    base64.b64decode(GCP_SERVICE_ACCOUNT_CERTIFICATE_BASE64)
+def get_db():
+    """Return the Firestore client, Firebase is initialized on first use.
 
-GCP_SERVICE_ACCOUNT_CERTIFICATE_DECODED_STRING = \
-    GCP_SERVICE_ACCOUNT_CERTIFICATE_DECODED_BYTES.decode('utf-8')
+    Decoding the certificate and connecting to Firebase is deferred to the first
+    request, so it does not delay the start of the function. The default Firebase
+    app is reused if it exists (e.g. initialized by the rate limiter of the
+    transform endpoint in the same container).
+    """
+    global _db
+    with _db_lock:
+        if _db is None:
+            import firebase_admin
+            from firebase_admin import credentials, firestore
 
-cred_dict = json.loads(GCP_SERVICE_ACCOUNT_CERTIFICATE_DECODED_STRING, strict=False)
-cred = credentials.Certificate(cred_dict)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+            try:
+                app = firebase_admin.get_app()
+            except ValueError:
+                certificate_base64 = os.getenv("GCP_SERVICE_ACCOUNT_CERTIFICATE")
+                if certificate_base64 is None:
+                    raise KeyError("Env var GCP_SERVICE_ACCOUNT_CERTIFICATE not found!")
+                certificate = base64.b64decode(certificate_base64).decode("utf-8")
+                cred = credentials.Certificate(json.loads(certificate, strict=False))
+                app = firebase_admin.initialize_app(cred)
+            _db = firestore.client(app)
+    return _db
 
 @functions_framework.http
 def check_tokens(request):
     """Check if there are tokens available in the Firestore database."""
+    db = get_db()
     if db is None:
         return jsonify({"error": "No database available"}), 500
 
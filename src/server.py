@@ -0,0 +1,88 @@
+"""Production entry point serving the app with a pre-forking gunicorn server.
+
+The app with the transformer modules and pydantic_xml model classes is imported and
+warmed up in the master before the workers are forked (see `warm_up`). Afterwards
+the objects of the master are frozen for the garbage collector, so its collections
+in the workers do not write to the shared pages and they stay shared copy-on-write.
+State created on first use (e.g. the rate limiter and the result cache) is created
+in each worker. A request may reach any worker and workers are replaced (recycled,
+timed out or crashed), so the jobs are kept in a SQLite file of the server run that
+all workers share (see `share_job_store`).
+
+The server is configured by envs:
+    PORT: Port to bind (8080 by default).
+    WEB_WORKERS: Number of worker processes (number of CPUs by default).
+    WEB_THREADS: Number of request threads per worker.
+    WEB_MAX_REQUESTS: Requests after which a worker is gracefully replaced to bound
+        its memory growth (0 disables the recycling). A jitter of 10 % keeps the
+        workers from restarting at the same time.
+    WEB_TIMEOUT: Seconds a worker may be silent before it is restarted.
+        Unfinished jobs of replaced workers fail with an error (see `jobs.store`).
+    JOB_STORE_PATH: SQLite file of the jobs (a new temporary file by default).
+"""
+
+import gc
+import os
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+
+DEFAULT_THREADS = 4
+DEFAULT_MAX_REQUESTS = 1000
+DEFAULT_TIMEOUT = 120
+
+
+def get_server_options():
+    """Return the gunicorn settings configured by the envs."""
+    max_requests = int(os.getenv("WEB_MAX_REQUESTS", DEFAULT_MAX_REQUESTS))
+    return {
+        "bind": f"0.0.0.0:{os.getenv('PORT', '8080')}",
+        "workers": int(os.getenv("WEB_WORKERS", os.cpu_count() or 1)),
+        "threads": int(os.getenv("WEB_THREADS", DEFAULT_THREADS)),
+        "worker_class": "gthread",
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests // 10,
+        "timeout": int(os.getenv("WEB_TIMEOUT", DEFAULT_TIMEOUT)),
+        "preload_app": True,
+    }
+
+
+def share_job_store():
+    """Keep the jobs in a SQLite file shared by the workers and their replacements.
+
+    Without env JOB_STORE_PATH a new file is created for each server run, so jobs
+    of a previous run are not restored.
+    """
+    if not os.getenv("JOB_STORE_PATH"):
+        directory = tempfile.mkdtemp(prefix="transform-jobs-")
+        os.environ["JOB_STORE_PATH"] = os.path.join(directory, "jobs.sqlite")
+
+
+class TransformerServer(BaseApplication):
+    """Gunicorn application that loads and warms up the app in the master."""
+
+    def __init__(self, options: dict[str, object]):
+        """Initialize the server with gunicorn settings."""
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        """Apply the settings to the gunicorn configuration."""
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """Return the warmed up app (run once in the master with preloading)."""
+        from app import app
+        from transformer.utility.warmup import warm_up
+
+        warm_up()
+        gc.collect()
+        gc.freeze()
+        return app
+
+
+if __name__ == "__main__":
+    options = get_server_options()
+    share_job_store()
+    TransformerServer(options).run()
@@ -0,0 +1 @@
+"""This is the __init__ module for the batch transformation endpoint."""
@@ -0,0 +1,136 @@
+"""Reading the models of a batch transformation request.
+
+A batch is posted either as multipart/form-data, where the name of each part is
+the transformation direction and the file name (if any) identifies the model, or
+as newline-delimited JSON records like
+`{"id": "order", "direction": "bpmntopnml", "model": "<definitions ...>"}`.
+Models without an ID are identified by their position in the batch.
+
+Items that can not be read keep their error, so it is reported with the results of
+the other models. The number of models is limited by the env BATCH_MAX_ITEMS.
+"""
+
+import itertools
+import json
+import os
+from collections.abc import Container, Iterable, Iterator
+from dataclasses import dataclass
+
+import flask
+from werkzeug.datastructures import FileStorage, MultiDict
+
+from exceptions import (
+    InvalidBatchItem,
+    KnownException,
+    TooManyBatchItems,
+    UnsupportedBatchFormat,
+)
+
+NDJSON_MIMETYPES = ["application/x-ndjson", "application/jsonl"]
+MULTIPART_MIMETYPE = "multipart/form-data"
+DEFAULT_MAX_ITEMS = 100
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """Posted model of a batch with its transformation direction.
+
+    Attributes:
+        index: Position of the model in the batch.
+        id: Identifier of the model in the results.
+        direction: Transformation direction of the model.
+        content: Posted model as XML string or bytes.
+        error: Error of an item that could not be read.
+    """
+
+    index: int
+    id: str
+    direction: str = ""
+    content: str | bytes = ""
+    error: KnownException | None = None
+
+
+def get_max_batch_items():
+    """Return the maximum number of models in a batch."""
+    return int(os.getenv("BATCH_MAX_ITEMS", DEFAULT_MAX_ITEMS))
+
+
+def create_batch_item(
+    index: int,
+    id: str | None,
+    direction: object,
+    content: object,
+    directions: Container[str],
+):
+    """Return a batch item, with an error if the direction or model is invalid."""
+    id = id or str(index)
+    if (
+        not isinstance(direction, str)
+        or direction not in directions
+        or not isinstance(content, str | bytes)
+        or not content
+    ):
+        return BatchItem(index, id, error=InvalidBatchItem(index))
+    return BatchItem(index, id, direction, content)
+
+
+def read_ndjson_items(
+    lines: Iterable[bytes], directions: Container[str]
+) -> Iterator[BatchItem]:
+    """Yield the items of newline-delimited JSON records (blank lines are skipped)."""
+    index = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            yield BatchItem(index, str(index), error=InvalidBatchItem(index))
+        else:
+            id = record.get("id")
+            yield create_batch_item(
+                index,
+                None if id is None else str(id),
+                record.get("direction"),
+                record.get("model"),
+                directions,
+            )
+        index += 1
+
+
+def read_multipart_items(
+    files: MultiDict[str, FileStorage],
+    form: MultiDict[str, str],
+    directions: Container[str],
+) -> Iterator[BatchItem]:
+    """Yield the items of the file parts and then of the plain form fields."""
+    parts: Iterator[tuple[str, str | None, str | bytes]] = itertools.chain(
+        ((name, file.filename, file.read()) for name, file in files.items(multi=True)),
+        ((name, None, value) for name, value in form.items(multi=True)),
+    )
+    for index, (direction, filename, content) in enumerate(parts):
+        yield create_batch_item(index, filename, direction, content, directions)
+
+
+def read_batch_items(request: flask.Request, directions: Container[str]):
+    """Return the items of a batch request.
+
+    Raises:
+        UnsupportedBatchFormat: The request is neither multipart nor NDJSON.
+        TooManyBatchItems: The batch has more models than allowed.
+    """
+    items: Iterator[BatchItem]
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = read_ndjson_items(request.stream, directions)
+    elif request.mimetype == MULTIPART_MIMETYPE:
+        items = read_multipart_items(request.files, request.form, directions)
+    else:
+        raise UnsupportedBatchFormat()
+
+    max_items = get_max_batch_items()
+    batch = list(itertools.islice(items, max_items + 1))
+    if len(batch) > max_items:
+        raise TooManyBatchItems(max_items)
+    return batch
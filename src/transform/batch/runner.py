@@ -0,0 +1,71 @@
+"""Transformation of the models of a batch in a bounded process pool.
+
+The models are transformed in the shared process pool of the transformer (see
+`transformer.utility.parallel`) with env BATCH_WORKERS workers, where nested
+subprocesses are handled sequentially. At most two models per worker are submitted
+at once, so a large batch does not queue all of its models in the pool. The
+results are yielded as they complete. With at most one worker the models are
+transformed sequentially in the current process.
+"""
+
+import itertools
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, TypeVar
+
+from transformer.utility.parallel import get_pool
+
+KeyT = TypeVar("KeyT")
+ResultT = TypeVar("ResultT")
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+PENDING_PER_WORKER = 2
+
+
+def get_batch_workers():
+    """Return the number of workers for the models of a batch."""
+    return int(os.getenv("BATCH_WORKERS", DEFAULT_WORKERS))
+
+
+def run_job(func: Callable[..., ResultT], args: tuple[Any, ...]):
+    """Run a job in the current process and return its finished future."""
+    future: Future[ResultT] = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def iter_completed(
+    func: Callable[..., ResultT],
+    jobs: Iterable[tuple[KeyT, tuple[Any, ...]]],
+    workers: int,
+) -> Iterator[tuple[KeyT, Future[ResultT]]]:
+    """Yield the key and finished future of each job in the order of completion.
+
+    The function must be defined at module level to be run in the pool. Pending
+    jobs are cancelled when the iteration is stopped (e.g. by a closed response).
+    """
+    if workers <= 1:
+        for key, args in jobs:
+            yield key, run_job(func, args)
+        return
+
+    pool = get_pool(workers)
+    remaining = iter(jobs)
+    pending: dict[Future[ResultT], KeyT] = {}
+    try:
+        while True:
+            free = workers * PENDING_PER_WORKER - len(pending)
+            for key, args in itertools.islice(remaining, free):
+                pending[pool.submit(func, *args)] = key
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+    finally:
+        for future in pending:
+            future.cancel()
@@ -42,6 +42,17 @@ class KnownException(Exception):
             error_text = f"[{self._id}] {error_text}"
         return error_text
 
+    def __reduce__(self):
+        """Return a picklable form (e.g. to raise errors of worker processes)."""
+        return restore_known_exception, (type(self), self._id, self._message)
+
+
+def restore_known_exception(cls: type[KnownException], id: int, message: str):
+    """Restore a pickled known exception without its specific initializer."""
+    exception = cls.__new__(cls)
+    KnownException.__init__(exception, id, message)
+    return exception
+
 
 class UnexpectedError(KnownException):
     """Exception raised for unexpected errors."""
@@ -154,10 +165,74 @@ class InvalidInputXML(KnownException):
         """Initialize an invalid input XML content exception."""
         super().__init__(11, "Seems like the input XML content is unsupported.")
 
+
 class NoRequestTokensAvailable(KnownException):
     """Exception raised when there are no available Tokens for transformation request."""
 
     def __init__(self) -> None:
         """Initialize an no request tokens available exception."""
         super().__init__(14, "No request tokens available. Please try again later.")
-        
+
+
+class UnsupportedBatchFormat(KnownException):
+    """Exception raised for batch requests that are neither multipart nor NDJSON."""
+
+    def __init__(self) -> None:
+        """Initialize an unsupported batch format exception."""
+        super().__init__(
+            15, "Batches must be posted as multipart/form-data or application/x-ndjson."
+        )
+
+
+class InvalidBatchItem(KnownException):
+    """Exception raised for batch items without a direction or model."""
+
+    def __init__(self, index: int) -> None:
+        """Initialize an invalid batch item exception.
+
+        Args:
+            index (int): The position of the item in the batch.
+        """
+        super().__init__(16, f"Batch item {index} needs a direction and a model.")
+
+
+class TooManyBatchItems(KnownException):
+    """Exception raised for batches with more models than allowed."""
+
+    def __init__(self, limit: int) -> None:
+        """Initialize a too many batch items exception.
+
+        Args:
+            limit (int): The maximum number of models in a batch.
+        """
+        super().__init__(17, f"Batches are limited to {limit} models.")
+
+
+class TooManyJobs(KnownException):
+    """Exception raised when the job store is full with unfinished jobs."""
+
+    def __init__(self) -> None:
+        """Initialize a too many jobs exception."""
+        super().__init__(18, "Too many pending jobs. Please try again later.")
+
+
+class UnknownJob(KnownException):
+    """Exception raised for jobs that do not exist or expired."""
+
+    def __init__(self, job_id: str) -> None:
+        """Initialize an unknown job exception.
+
+        Args:
+            job_id (str): The ID of the requested job.
+        """
+        super().__init__(19, f"Job {job_id} does not exist or expired.")
+
+
+class JobInterrupted(KnownException):
+    """Exception raised for jobs whose worker process stopped before they finished."""
+
+    def __init__(self) -> None:
+        """Initialize a job interrupted exception."""
+        super().__init__(
+            20, "The worker of the job stopped. Please submit the job again."
+        )
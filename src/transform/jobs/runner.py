@@ -0,0 +1,75 @@
+"""Asynchronous transformation jobs on a local worker pool.
+
+Submitted models are transformed by a pool of env JOB_WORKERS threads in the current
+process, so the request returns immediately with the ID of the job. No external
+queue is used: the jobs and their results are kept in the local job store (see
+`jobs.store`) until they expire.
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from jobs.store import Job, JobStore, create_job_store
+from metrics.transformation import create_transformation_metrics, record_error
+from transformation import iter_serialized, parse_model, transform_source
+from transformer.utility.stages import Stage, observe_stages, run_stage
+
+DEFAULT_WORKERS = 2
+
+_store: JobStore | None = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_job_store():
+    """Return the job store of the process (created on first use)."""
+    global _store
+    if _store is None:
+        _store = create_job_store()
+    return _store
+
+
+def set_job_store(store: JobStore | None):
+    """Replace the job store of the process (None for the configured store)."""
+    global _store
+    _store = store
+
+
+def get_job_executor():
+    """Return the worker pool of the jobs (started on first use)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            int(os.getenv("JOB_WORKERS", DEFAULT_WORKERS)),
+            thread_name_prefix="transform-job",
+        )
+    return _executor
+
+
+def run_job(job: Job, store: JobStore, source_key: str, content: str | bytes):
+    """Parse, transform and serialize the model of a job and store the outcome."""
+    metrics = create_transformation_metrics(job.direction)
+    with observe_stages(job):
+        try:
+            source = parse_model(source_key, content, metrics)
+            transformed = transform_source(source, metrics)
+            with run_stage(Stage.Serialize):
+                result = "".join(iter_serialized(transformed, metrics))
+        except Exception as e:
+            record_error(e)
+            job.fail(e, store.clock())
+            return
+    job.finish(result, store.clock())
+
+
+def submit_job(direction: str, source_key: str, content: str | bytes):
+    """Store a new job for a posted model and enqueue its transformation.
+
+    Raises:
+        TooManyJobs: If the job store is full with unfinished jobs.
+    """
+    store = get_job_store()
+    job = Job(uuid.uuid4().hex, direction)
+    store.add(job)
+    get_job_executor().submit(run_job, job, store, source_key, content)
+    return job
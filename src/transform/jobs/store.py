@@ -0,0 +1,367 @@
+"""Local store of asynchronous transformation jobs.
+
+A job records its state, the progress of each stage of the transformation (see
+`transformer.utility.stages`) and the result or error. The store is bounded by the
+number of jobs (env JOB_MAX_ENTRIES). Finished jobs are evicted after a time to
+live (env JOB_TTL in seconds) or, if the store is full, in the order they finished.
+Jobs that are not finished are never evicted, so a full store rejects new jobs.
+
+By default the store is local to the process, jobs are polled from the instance that
+runs them. With env JOB_STORE_PATH the jobs are kept in a SQLite file instead, so
+the worker processes of a server share them (see `SQLiteJobStore`). Unfinished jobs
+of a worker process that stopped (e.g. recycled, timed out or crashed) are failed
+there, so they expire like other finished jobs.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from pathlib import Path
+
+from exceptions import JobInterrupted, TooManyJobs, UnexpectedError, UnknownJob
+from transformer.utility.stages import Stage, StageObserver
+
+DEFAULT_MAX_ENTRIES = 100
+DEFAULT_TTL = 600
+# Stages whose progress is reported (nested stages are part of them).
+JOB_STAGES = [Stage.Parse, Stage.Preprocess, Stage.Transform, Stage.Serialize]
+
+
+class JobState(str, Enum):
+    """State of a job or one of its stages."""
+
+    Pending = "pending"
+    Running = "running"
+    Done = "done"
+    Failed = "failed"
+
+
+@dataclass
+class StageProgress:
+    """Progress of a single stage of a job."""
+
+    state: JobState = JobState.Pending
+    seconds: float | None = None
+
+
+@dataclass
+class Job(StageObserver):
+    """Transformation job with the progress of its stages.
+
+    Attributes:
+        id: Identifier of the job.
+        direction: Transformation direction of the posted model.
+        state: Current state of the job.
+        stages: Progress of each stage of the transformation.
+        result: Serialized transformed model of a finished job.
+        error: Error of a failed job.
+        finished: Time when the job finished (by the clock of the store).
+        owner: ID of the process that runs the job.
+        on_update: Called with the job after each change (e.g. to save it).
+    """
+
+    id: str
+    direction: str
+    state: JobState = JobState.Pending
+    stages: dict[Stage, StageProgress] = field(
+        default_factory=lambda: {stage: StageProgress() for stage in JOB_STAGES}
+    )
+    result: str | None = None
+    error: Exception | None = None
+    finished: float | None = None
+    owner: int = field(default_factory=os.getpid)
+    on_update: Callable[["Job"], None] | None = field(
+        default=None, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __getstate__(self):
+        """Return the picklable state (without lock and update handler)."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["on_update"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        """Restore a pickled job with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def start_stage(self, stage: Stage):
+        """Mark a stage and the job as running."""
+        with self._lock:
+            self.state = JobState.Running
+            if stage in self.stages:
+                self.stages[stage].state = JobState.Running
+        self._notify()
+
+    def finish_stage(self, stage: Stage, seconds: float):
+        """Mark a stage as done."""
+        with self._lock:
+            if stage in self.stages:
+                self.stages[stage] = StageProgress(JobState.Done, seconds)
+        self._notify()
+
+    def finish(self, result: str, now: float):
+        """Mark the job as done with its result."""
+        with self._lock:
+            self.result = result
+            self.state = JobState.Done
+            self.finished = now
+        self._notify()
+
+    def fail(self, error: Exception, now: float):
+        """Mark the job and its running stage as failed."""
+        with self._lock:
+            for progress in self.stages.values():
+                if progress.state == JobState.Running:
+                    progress.state = JobState.Failed
+            self.error = error
+            self.state = JobState.Failed
+            self.finished = now
+        self._notify()
+
+    def _notify(self):
+        """Call the update handler (if any) with the changed job."""
+        if self.on_update is not None:
+            self.on_update(self)
+
+    def is_finished(self):
+        """Return whether the job is done or failed."""
+        return self.finished is not None
+
+    def get_status(self):
+        """Return the state and the progress of each stage as JSON object."""
+        with self._lock:
+            stages = [
+                {"name": stage.value, "state": progress.state.value}
+                | ({} if progress.seconds is None else {"seconds": progress.seconds})
+                for stage, progress in self.stages.items()
+            ]
+            done = sum(p.state == JobState.Done for p in self.stages.values())
+            return {
+                "id": self.id,
+                "direction": self.direction,
+                "state": self.state.value,
+                "progress": done / len(self.stages),
+                "stages": stages,
+            }
+
+
+class JobStore:
+    """Jobs by ID, bounded by their number with time to live of finished jobs."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize an empty store with its bounds and clock."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of stored jobs."""
+        return len(self._jobs)
+
+    def add(self, job: Job):
+        """Store a new job and evict expired or, if full, the oldest finished jobs.
+
+        Raises:
+            TooManyJobs: If the store is full with unfinished jobs.
+        """
+        with self._lock:
+            self._evict_expired()
+            if len(self._jobs) >= self.max_entries:
+                finished = sorted(
+                    (j for j in self._jobs.values() if j.is_finished()),
+                    key=lambda j: j.finished or 0.0,
+                )
+                if not finished:
+                    raise TooManyJobs()
+                del self._jobs[finished[0].id]
+            self._jobs[job.id] = job
+
+    def get(self, id: str):
+        """Return a stored job.
+
+        Raises:
+            UnknownJob: If the job does not exist or was evicted.
+        """
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(id)
+        if job is None:
+            raise UnknownJob(id)
+        return job
+
+    def _evict_expired(self):
+        """Remove the finished jobs whose time to live passed."""
+        expiry = self.clock() - self.ttl
+        for job in list(self._jobs.values()):
+            if job.finished is not None and job.finished <= expiry:
+                del self._jobs[job.id]
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs in a table of a local SQLite file shared by the processes of a server.
+
+    Each change of a job added to the store is written to the file, so every process
+    returns the current state of the jobs run by the others. The clock is the system
+    time, which all processes share. Before each access, the unfinished jobs of owner
+    processes that no longer exist are failed with `JobInterrupted`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the store in a SQLite file (created if missing)."""
+        super().__init__(max_entries, ttl, clock)
+        self.path = Path(path)
+        self._connection = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs "
+                "(id TEXT PRIMARY KEY, finished REAL, owner INTEGER NOT NULL, "
+                "job BLOB NOT NULL)"
+            )
+
+    def __len__(self):
+        """Return the number of stored jobs."""
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        return count
+
+    def add(self, job: Job):
+        """Store a new job and evict expired or, if full, the oldest finished jobs.
+
+        Raises:
+            TooManyJobs: If the store is full with unfinished jobs.
+        """
+        with self._transaction() as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM jobs").fetchone()
+            if count >= self.max_entries:
+                oldest = connection.execute(
+                    "SELECT id FROM jobs WHERE finished IS NOT NULL "
+                    "ORDER BY finished LIMIT 1"
+                ).fetchone()
+                if oldest is None:
+                    raise TooManyJobs()
+                connection.execute("DELETE FROM jobs WHERE id = ?", oldest)
+            connection.execute(
+                "INSERT INTO jobs (id, finished, owner, job) VALUES (?, ?, ?, ?)",
+                (job.id, job.finished, job.owner, dump_job(job)),
+            )
+        job.on_update = self.save
+
+    def get(self, id: str):
+        """Return a copy of a stored job.
+
+        Raises:
+            UnknownJob: If the job does not exist or was evicted.
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT job FROM jobs WHERE id = ?", (id,)
+            ).fetchone()
+        if row is None:
+            raise UnknownJob(id)
+        return pickle.loads(row[0])
+
+    def save(self, job: Job):
+        """Write the current state of a stored job (ignored if it was evicted)."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE jobs SET finished = ?, job = ? WHERE id = ?",
+                (job.finished, dump_job(job), job.id),
+            )
+
+    def close(self):
+        """Close the connection to the file."""
+        self._connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in a write transaction after evicting the expired jobs.
+
+        The unfinished jobs of stopped processes are failed before.
+        """
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "DELETE FROM jobs WHERE finished <= ?",
+                    (self.clock() - self.ttl,),
+                )
+                self._fail_orphans(connection)
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _fail_orphans(self, connection: sqlite3.Connection):
+        """Fail the unfinished jobs whose owner process no longer exists."""
+        owners = connection.execute(
+            "SELECT DISTINCT owner FROM jobs WHERE finished IS NULL"
+        ).fetchall()
+        for (owner,) in owners:
+            if is_process_alive(owner):
+                continue
+            rows = connection.execute(
+                "SELECT job FROM jobs WHERE finished IS NULL AND owner = ?", (owner,)
+            ).fetchall()
+            for (data,) in rows:
+                job: Job = pickle.loads(data)
+                job.fail(JobInterrupted(), self.clock())
+                connection.execute(
+                    "UPDATE jobs SET finished = ?, job = ? WHERE id = ?",
+                    (job.finished, dump_job(job), job.id),
+                )
+
+
+def is_process_alive(pid: int):
+    """Return whether a process of the host exists (it may belong to another user)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def dump_job(job: Job):
+    """Return a pickled job, errors that cannot be pickled become unexpected errors."""
+    try:
+        return pickle.dumps(job)
+    except Exception:
+        return pickle.dumps(replace(job, error=UnexpectedError()))
+
+
+def create_job_store() -> JobStore:
+    """Return a new store configured by the envs (shared with env JOB_STORE_PATH)."""
+    max_entries = int(os.getenv("JOB_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+    ttl = float(os.getenv("JOB_TTL", DEFAULT_TTL))
+    path = os.getenv("JOB_STORE_PATH")
+    if path:
+        return SQLiteJobStore(path, max_entries, ttl)
+    return JobStore(max_entries, ttl)
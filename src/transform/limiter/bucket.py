@@ -0,0 +1,92 @@
+"""Token bucket of the transform endpoint and its in-process backend.
+
+The bucket keeps the semantics of the checkTokens function: each request takes a
+token. An empty bucket is refilled to 99 tokens once the last refill is at least an
+hour ago; the request triggering the refill is served without taking a token.
+Requests are rejected while the bucket is empty within the hour.
+
+The backends only differ in where the state is stored and how the update is made
+atomic, the transition itself is `take_token`.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+
+TOKENS_PER_REFILL = 99
+REFILL_INTERVAL = 60 * 60
+
+
+@dataclass(frozen=True)
+class BucketState:
+    """Remaining tokens and the time of the last refill (seconds since epoch).
+
+    The default state is an empty bucket that was never refilled, so the first
+    request refills it.
+    """
+
+    tokens: int = 0
+    replenished: float = 0.0
+
+
+def take_token(state: BucketState, now: float):
+    """Return whether a request is allowed and the state after the request."""
+    if state.tokens > 0:
+        return True, BucketState(state.tokens - 1, state.replenished)
+    if now - state.replenished >= REFILL_INTERVAL:
+        return True, BucketState(TOKENS_PER_REFILL, now)
+    return False, state
+
+
+def lease_tokens(state: BucketState, capacity: int, block: int, now: float):
+    """Return the number of tokens leased from a bucket and the state after it.
+
+    A block of up to `block` tokens is taken at once. An empty bucket is refilled
+    to its capacity first, if the last refill is at least an hour ago. Unlike
+    `take_token`, the request triggering the refill takes tokens of the refill.
+    """
+    if state.tokens <= 0:
+        if now - state.replenished < REFILL_INTERVAL:
+            return 0, state
+        state = BucketState(capacity, now)
+    leased = min(block, state.tokens)
+    return leased, BucketState(state.tokens - leased, state.replenished)
+
+
+class Limiter(ABC):
+    """Interface of the rate limiter backends.
+
+    Attributes:
+        is_remote: Whether a token is taken by a request to another service.
+    """
+
+    is_remote = False
+
+    @abstractmethod
+    def acquire(self) -> bool:
+        """Take a token for a request and return whether it is allowed."""
+
+    def close(self):
+        """Release the resources of the backend."""
+
+
+class InProcessLimiter(Limiter):
+    """Token bucket in the memory of the current process (shared by threads)."""
+
+    def __init__(
+        self,
+        state: BucketState | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the bucket with a state and a clock (for tests)."""
+        self.state = state or BucketState()
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token for a request and return whether it is allowed."""
+        with self._lock:
+            allowed, self.state = take_token(self.state, self._clock())
+        return allowed
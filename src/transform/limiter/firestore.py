@@ -0,0 +1,122 @@
+"""Token bucket in the Firestore document of the checkTokens function.
+
+The bucket is shared by all instances of the transform endpoint (and the
+checkTokens function). Each request reads and updates the document in a
+transaction, so concurrent instances do not lose updates.
+
+The Firestore client and the transaction decorator are injected, so the backend can
+be used with an in-memory stand-in. By default the client is created on first use
+from the service account certificate in the env GCP_SERVICE_ACCOUNT_CERTIFICATE.
+"""
+
+import base64
+import json
+import os
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any, TypeVar
+
+from exceptions import MissingEnvironmentVariable
+from limiter.bucket import BucketState, Limiter, take_token
+
+COLLECTION = "api-tokens"
+DOCUMENT = "token-document"
+TOKENS_FIELD = "tokens"
+REPLENISHED_FIELD = "tokens_last_replenished"
+
+ResultT = TypeVar("ResultT")
+
+
+def create_firestore_client():
+    """Return a Firestore client of the Firebase app (initialized on first use)."""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    try:
+        app = firebase_admin.get_app()
+    except ValueError:
+        certificate = os.getenv("GCP_SERVICE_ACCOUNT_CERTIFICATE")
+        if certificate is None:
+            raise MissingEnvironmentVariable("GCP_SERVICE_ACCOUNT_CERTIFICATE")
+        certificate_dict = json.loads(
+            base64.b64decode(certificate).decode("utf-8"), strict=False
+        )
+        app = firebase_admin.initialize_app(credentials.Certificate(certificate_dict))
+    return firestore.client(app)
+
+
+def firestore_transactional(func: Callable[..., Any]):
+    """Return a function that runs in a Firestore transaction (with retries)."""
+    from google.cloud import firestore
+
+    return firestore.transactional(func)
+
+
+def to_bucket_state(document: dict[str, Any] | None):
+    """Return the bucket state of a token document (initial if missing)."""
+    if document is None:
+        return BucketState()
+    replenished = document.get(REPLENISHED_FIELD)
+    return BucketState(
+        document.get(TOKENS_FIELD, 0),
+        replenished.timestamp() if replenished is not None else 0.0,
+    )
+
+
+def read_state(document_ref: Any, transaction: Any):
+    """Return the bucket state of a token document read in a transaction."""
+    snapshot = document_ref.get(transaction=transaction)
+    return to_bucket_state(snapshot.to_dict() if snapshot.exists else None)
+
+
+def to_document(state: BucketState):
+    """Return the fields of a token document for a bucket state."""
+    return {
+        TOKENS_FIELD: state.tokens,
+        REPLENISHED_FIELD: datetime.fromtimestamp(state.replenished, UTC),
+    }
+
+
+class FirestoreLimiter(Limiter):
+    """Token bucket in a Firestore document."""
+
+    is_remote = True
+
+    def __init__(
+        self,
+        client: Any = None,
+        transactional: Callable[..., Any] = firestore_transactional,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the bucket with a client, a transaction decorator and a clock.
+
+        Without a client, the client of the Firebase app is created on first use.
+        """
+        self._client = client
+        self._transactional = transactional
+        self._clock = clock
+
+    @property
+    def client(self):
+        """Return the Firestore client (created on first use)."""
+        if self._client is None:
+            self._client = create_firestore_client()
+        return self._client
+
+    def run_transaction(self, func: Callable[[Any], ResultT]) -> ResultT:
+        """Run a function with a new transaction (retried on conflicts)."""
+        return self._transactional(func)(self.client.transaction())
+
+    def acquire(self):
+        """Take a token for a request and return whether it is allowed."""
+        document_ref = self.client.collection(COLLECTION).document(DOCUMENT)
+
+        def take_in_transaction(transaction: Any):
+            state = read_state(document_ref, transaction)
+            allowed, new_state = take_token(state, self._clock())
+            if new_state != state:
+                transaction.set(document_ref, to_document(new_state))
+            return allowed
+
+        return self.run_transaction(take_in_transaction)
@@ -0,0 +1,145 @@
+"""Leasing of token blocks from sharded Firestore counters.
+
+Instead of a transaction on a single document per request, an instance leases a
+block of tokens from one of several shard documents in a single transaction and
+serves the requests locally until the block is used up. The hourly budget of 99
+tokens is split between the shards and each shard is refilled on its own, so
+instances rarely update the same document.
+
+When all shards are empty, requests are rejected locally until the earliest refill
+of a shard. Unused tokens are returned to their shard on `close` (e.g. on
+shutdown), unless the shard was refilled in the meantime.
+"""
+
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import partial
+from typing import Any
+
+from limiter.bucket import (
+    REFILL_INTERVAL,
+    TOKENS_PER_REFILL,
+    BucketState,
+    lease_tokens,
+)
+from limiter.firestore import (
+    COLLECTION,
+    DOCUMENT,
+    FirestoreLimiter,
+    firestore_transactional,
+    read_state,
+    to_document,
+)
+
+DEFAULT_SHARDS = 4
+DEFAULT_BLOCK_SIZE = 10
+
+
+def get_shard_capacity(shard: int, shards: int):
+    """Return the tokens per refill of a shard (the budget split between shards)."""
+    return TOKENS_PER_REFILL // shards + (shard < TOKENS_PER_REFILL % shards)
+
+
+def is_same_refill(replenished: float, other: float):
+    """Return whether two refill times are equal as stored in a document."""
+    return datetime.fromtimestamp(replenished, UTC) == datetime.fromtimestamp(other, UTC)
+
+
+@dataclass
+class Lease:
+    """Tokens leased from a shard and the refill of the shard they belong to."""
+
+    shard: int
+    tokens: int
+    replenished: float
+
+
+class LeasingFirestoreLimiter(FirestoreLimiter):
+    """Token bucket leasing blocks of tokens from sharded Firestore documents."""
+
+    def __init__(
+        self,
+        client: Any = None,
+        transactional: Callable[..., Any] = firestore_transactional,
+        clock: Callable[[], float] = time.time,
+        shards: int | None = None,
+        block_size: int | None = None,
+    ):
+        """Initialize the limiter without a lease.
+
+        The number of shards and the block size default to the envs
+        RATE_LIMITER_SHARDS and RATE_LIMITER_BLOCK_SIZE.
+        """
+        super().__init__(client, transactional, clock)
+        self.shards = shards or int(os.getenv("RATE_LIMITER_SHARDS", DEFAULT_SHARDS))
+        self.block_size = block_size or int(
+            os.getenv("RATE_LIMITER_BLOCK_SIZE", DEFAULT_BLOCK_SIZE)
+        )
+        self.lease: Lease | None = None
+        self._exhausted_until = 0.0
+        # Instances start at different shards to spread the leases.
+        self._next_shard = random.randrange(self.shards)
+        self._lock = threading.Lock()
+
+    def get_shard_ref(self, shard: int):
+        """Return the reference to the document of a shard."""
+        return self.client.collection(COLLECTION).document(f"{DOCUMENT}-{shard}")
+
+    def acquire(self):
+        """Take a token of the lease (leasing a new block if it is used up)."""
+        with self._lock:
+            if self.lease is None or self.lease.tokens == 0:
+                self.lease = self._lease_block()
+            if self.lease is None:
+                return False
+            self.lease.tokens -= 1
+            return True
+
+    def _lease_block(self):
+        """Return a lease from the first shard with tokens (None if all are empty)."""
+        now = self._clock()
+        if now < self._exhausted_until:
+            return None
+        refills: list[float] = []
+        for i in range(self.shards):
+            shard = (self._next_shard + i) % self.shards
+            tokens, replenished = self.run_transaction(
+                partial(self._lease_from_shard, shard, now)
+            )
+            if tokens > 0:
+                self._next_shard = (shard + 1) % self.shards
+                return Lease(shard, tokens, replenished)
+            refills.append(replenished + REFILL_INTERVAL)
+        self._exhausted_until = min(refills)
+        return None
+
+    def _lease_from_shard(self, shard: int, now: float, transaction: Any):
+        """Lease a block from a shard, return the tokens and the refill time."""
+        shard_ref = self.get_shard_ref(shard)
+        state = read_state(shard_ref, transaction)
+        tokens, new_state = lease_tokens(
+            state, get_shard_capacity(shard, self.shards), self.block_size, now
+        )
+        if new_state != state:
+            transaction.set(shard_ref, to_document(new_state))
+        return tokens, new_state.replenished
+
+    def _return_to_shard(self, lease: Lease, transaction: Any):
+        """Return the tokens of a lease, unless the shard was refilled since."""
+        shard_ref = self.get_shard_ref(lease.shard)
+        state = read_state(shard_ref, transaction)
+        if is_same_refill(state.replenished, lease.replenished):
+            new_state = BucketState(state.tokens + lease.tokens, state.replenished)
+            transaction.set(shard_ref, to_document(new_state))
+
+    def close(self):
+        """Return the unused tokens of the lease to its shard."""
+        with self._lock:
+            lease, self.lease = self.lease, None
+        if lease is not None and lease.tokens > 0:
+            self.run_transaction(partial(self._return_to_shard, lease))
@@ -0,0 +1,40 @@
+"""Token check by a request to the checkTokens function.
+
+The requests share a session, so the connections to the function are kept alive
+and reused by the threads checking the tokens.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from exceptions import TokenCheckUnsuccessful
+from limiter.bucket import Limiter
+
+CHECK_TOKEN_URL = "https://europe-west3-woped-422510.cloudfunctions.net/checkTokens"
+# Connections kept alive for concurrent checks.
+POOL_SIZE = 16
+
+
+class RemoteLimiter(Limiter):
+    """Token bucket of the checkTokens function (one request per token)."""
+
+    is_remote = True
+
+    def __init__(self, url: str = CHECK_TOKEN_URL):
+        """Initialize the limiter with the URL of the checkTokens function."""
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def acquire(self):
+        """Take a token for a request and return whether it is allowed."""
+        response = self.session.get(self.url)
+        if response.status_code == 400:
+            raise TokenCheckUnsuccessful()
+        return response.status_code != 429
+
+    def close(self):
+        """Close the kept alive connections."""
+        self.session.close()
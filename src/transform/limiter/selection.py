@@ -0,0 +1,134 @@
+"""Selection of the rate limiter backend of the transform endpoint.
+
+The backend is selected by the env RATE_LIMITER. Without it, requests are only
+limited on Cloud Run (env K_SERVICE), where the Firestore bucket of the checkTokens
+function is used directly instead of a request to the function.
+"""
+
+import atexit
+import os
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from enum import Enum
+
+from exceptions import NoRequestTokensAvailable
+from limiter.bucket import InProcessLimiter, Limiter
+
+
+class LimiterBackend(str, Enum):
+    """Rate limiter backend definition."""
+
+    Disabled = "none"
+    InProcess = "memory"
+    SharedMemory = "shared"
+    Firestore = "firestore"
+    FirestoreLeasing = "firestore-leasing"
+    Remote = "remote"
+
+
+_limiter: Limiter | None = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_limiter_backend():
+    """Return the configured rate limiter backend."""
+    backend = os.getenv("RATE_LIMITER")
+    if backend is not None:
+        return LimiterBackend(backend)
+    if os.getenv("K_SERVICE") is not None:
+        return LimiterBackend.Firestore
+    return LimiterBackend.Disabled
+
+
+def create_limiter(backend: LimiterBackend) -> Limiter | None:
+    """Return a new limiter of a backend (None if disabled)."""
+    if backend == LimiterBackend.InProcess:
+        return InProcessLimiter()
+    if backend == LimiterBackend.SharedMemory:
+        from limiter.shared import SharedMemoryLimiter
+
+        return SharedMemoryLimiter()
+    if backend == LimiterBackend.Firestore:
+        from limiter.firestore import FirestoreLimiter
+
+        return FirestoreLimiter()
+    if backend == LimiterBackend.FirestoreLeasing:
+        from limiter.leasing import LeasingFirestoreLimiter
+
+        return LeasingFirestoreLimiter()
+    if backend == LimiterBackend.Remote:
+        from limiter.remote import RemoteLimiter
+
+        return RemoteLimiter()
+    return None
+
+
+def get_limiter():
+    """Return the limiter of the configured backend (created on first use).
+
+    The limiter is closed on shutdown, e.g. to return leased tokens.
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = create_limiter(get_limiter_backend())
+        if _limiter is not None:
+            atexit.register(_limiter.close)
+    return _limiter
+
+
+def set_limiter(limiter: Limiter | None):
+    """Replace the limiter of the process (None for the configured backend)."""
+    global _limiter
+    _limiter = limiter
+
+
+def check_request_token():
+    """Take a token for the current request.
+
+    Raises:
+        NoRequestTokensAvailable: If the bucket is empty.
+    """
+    limiter = get_limiter()
+    if limiter is not None and not limiter.acquire():
+        raise NoRequestTokensAvailable()
+
+
+def start_token_check() -> Future[None] | None:
+    """Start the token check of the current request.
+
+    Checks of remote limiters run in a thread, so the request can be parsed in the
+    meantime (see `awaiting_token_check`). Local checks are done immediately.
+    """
+    global _executor
+    limiter = get_limiter()
+    if limiter is None or not limiter.is_remote:
+        check_request_token()
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(thread_name_prefix="token-check")
+    return _executor.submit(check_request_token)
+
+
+def wait_for_token_check(check: Future[None] | None):
+    """Wait for a started token check and raise its error."""
+    if check is not None:
+        check.result()
+
+
+@contextmanager
+def awaiting_token_check(check: Future[None] | None) -> Iterator[None]:
+    """Wait for a started token check after the work within the context.
+
+    The work is not started if the check already failed, otherwise its result is
+    discarded if the check fails. Errors of the check take precedence over errors of
+    the work.
+    """
+    if check is not None and check.done():
+        check.result()
+    try:
+        yield
+    except Exception:
+        wait_for_token_check(check)
+        raise
+    wait_for_token_check(check)
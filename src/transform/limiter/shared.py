@@ -0,0 +1,94 @@
+"""Token bucket in shared memory for servers with several worker processes.
+
+The state is stored in a named shared memory block, so all workers of a server
+(forked or spawned) use the same bucket. Updates are serialized by an exclusive
+lock on a file next to the block. A new block is zeroed, which is the initial state
+of the bucket (see `BucketState`).
+"""
+
+import fcntl
+import os
+import struct
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from limiter.bucket import BucketState, Limiter, take_token
+
+# Remaining tokens and time of the last refill.
+STATE_FORMAT = "<qd"
+DEFAULT_NAME = "transform_rate_limiter"
+
+
+def attach_shared_memory(name: str):
+    """Return the shared memory block with a name (created on first use).
+
+    The block is not tracked by the resource tracker of the process. Otherwise the
+    block is removed as soon as the first worker exits.
+    """
+    size = struct.calcsize(STATE_FORMAT)
+    try:
+        memory = shared_memory.SharedMemory(name, create=True, size=size)
+    except FileExistsError:
+        memory = shared_memory.SharedMemory(name)
+    resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore
+    return memory
+
+
+class SharedMemoryLimiter(Limiter):
+    """Token bucket shared by all processes using the same name."""
+
+    def __init__(
+        self,
+        name: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Attach the shared bucket with a name and a clock (for tests).
+
+        The name defaults to the env RATE_LIMITER_SHM_NAME.
+        """
+        name = name or os.getenv("RATE_LIMITER_SHM_NAME", DEFAULT_NAME)
+        self.name = name
+        self._clock = clock
+        self._memory = attach_shared_memory(name)
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a")
+
+    @property
+    def state(self):
+        """Return the current state of the bucket."""
+        with self._locked():
+            return self._read()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive lock of the bucket within the context."""
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        """Return the state stored in the shared memory."""
+        tokens, replenished = struct.unpack_from(STATE_FORMAT, self._memory.buf)
+        return BucketState(tokens, replenished)
+
+    def acquire(self):
+        """Take a token for a request and return whether it is allowed."""
+        with self._locked():
+            allowed, state = take_token(self._read(), self._clock())
+            struct.pack_into(
+                STATE_FORMAT, self._memory.buf, 0, state.tokens, state.replenished
+            )
+        return allowed
+
+    def close(self, unlink: bool = False):
+        """Detach from the bucket and optionally remove the shared memory block."""
+        self._memory.close()
+        if unlink:
+            # Tracked again, since the removal also ends the tracking.
+            resource_tracker.register(self._memory._name, "shared_memory")  # type: ignore
+            self._memory.unlink()
+        self._lock_file.close()
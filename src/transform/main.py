@@ -1,30 +1,61 @@
 """API to transform a given model into a selected direction."""
 
+import itertools
+import json
 import os
+from collections.abc import Iterator
+from concurrent.futures import Future
+from typing import IO
 
 import flask
 import functions_framework
-import requests
 from flask import jsonify, make_response
 
+from batch.items import BatchItem, read_batch_items
+from batch.runner import get_batch_workers, iter_completed
 from exceptions import (
     KnownException,
     MissingEnvironmentVariable,
+    NoRequestTokensAvailable,
     PrivateInternalException,
-    TokenCheckUnsuccessful,
     UnexpectedError,
     UnexpectedQueryParameter,
-    NoRequestTokensAvailable,
+    UnknownJob,
+)
+from jobs.runner import get_job_store, submit_job
+from limiter.selection import (
+    awaiting_token_check,
+    check_request_token,
+    start_token_check,
+    wait_for_token_check,
 )
-from transformer.models.bpmn.bpmn import BPMN
-from transformer.models.pnml.pnml import Pnml
-from transformer.transform_bpmn_to_petrinet.transform import (
-    bpmn_to_workflow_net,
+from metrics.registry import CONTENT_TYPE
+from metrics.transformation import (
+    create_transformation_metrics,
+    get_content_size,
+    get_text_size,
+    record_error,
+    render_metrics,
+)
+from result_cache.cache import create_cache_key, get_result_cache
+from transformation import (
+    iter_serialized,
+    parse_model,
+    transform_model,
+    transform_source,
 )
-from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
-from transformer.utility.utility import clean_xml_string
 
-CHECK_TOKEN_URL = "https://europe-west3-woped-422510.cloudfunctions.net/checkTokens"
+RAW_XML_MIMETYPES = ["application/xml", "text/xml", "application/octet-stream"]
+RESPONSE_FORMATS = ["json", "xml"]
+XML_MIMETYPES = ["application/xml", "text/xml"]
+RESPONSE_MIMETYPES = ["application/json", *XML_MIMETYPES]
+# Source model type (form field) and response key of each transformation direction.
+TRANSFORM_DIRECTIONS = {
+    "bpmntopnml": ("bpmn", "pnml"),
+    "pnmltobpmn": ("pnml", "bpmn"),
+}
+# Batch item with its cache key and the arguments of its transformation.
+BatchJob = tuple[tuple[BatchItem, str | None], tuple[str, str | bytes]]
 
 is_force_std_xml_active = os.getenv("FORCE_STD_XML")
 if is_force_std_xml_active is None:
@@ -40,60 +71,365 @@ def post_transform(request: flask.Request):
 
     Args:
         request: A request with a parameter "direction" as transformation direction
-        and a form with the xml model "bpmn" or "pnml".
+        and a form with the xml model "bpmn" or "pnml" (or the model as raw
+        application/xml or application/octet-stream body). The optional parameter
+        "format" (or the Accept header) selects a JSON or streamed XML response.
+    """
+    try:
+        token_check = start_token_check()
+
+        if request.method == "OPTIONS":
+            wait_for_token_check(token_check)
+            # Handle CORS preflight request
+            return create_preflight_response()
+
+        return handle_transformation(request, token_check)
+    except Exception as e:
+        return report_exception(e), 400
+
+
+@functions_framework.http
+def post_transform_batch(request: flask.Request):
+    """HTTP based batch transformation API.
+
+    Args:
+        request: A multipart/form-data or application/x-ndjson request with models
+        tagged by their transformation direction (see `batch.items`). The results
+        are streamed as newline-delimited JSON records in the order the models are
+        transformed, failed models have a record with the error description.
     """
     try:
-        if os.getenv("K_SERVICE") is not None:
-            response = requests.get(CHECK_TOKEN_URL)
-            if response.status_code == 400:
-                raise TokenCheckUnsuccessful()
-            if response.status_code == 429:
-                raise NoRequestTokensAvailable()
+        token_check = start_token_check()
+
+        if request.method == "OPTIONS":
+            wait_for_token_check(token_check)
+            return create_preflight_response()
+
+        return handle_batch_transformation(request, token_check)
+    except Exception as e:
+        return report_exception(e), 400
+
+
+@functions_framework.http
+def transform_jobs(request: flask.Request):
+    """HTTP based asynchronous transformation API.
+
+    Args:
+        request: A POST request with a model like for `post_transform` submits a
+        job and returns its status with the job ID. GET requests with the path
+        "/<id>" poll the state and progress per stage of a job, with the path
+        "/<id>/result" they fetch the transformed model (in the response format
+        selected like for `post_transform`).
 
+    The jobs run on local threads after the response, so the endpoint is only served
+    by the container (see `app.py`) and not deployed as a Cloud Function.
+    """
+    try:
         if request.method == "OPTIONS":
             # Handle CORS preflight request
-            response = make_response()
-            response.headers["Access-Control-Allow-Origin"] = "*"
-            response.headers["Access-Control-Allow-Methods"] = "POST,OPTIONS"
-            response.headers["Access-Control-Allow-Headers"] = (
-                "Content-Type,Authorization"
-            )
-            return response
-
-        return handle_transformation(request)
-    except KnownException as e:
+            return create_preflight_response("GET,POST,OPTIONS")
+        if request.method == "POST":
+            return submit_transformation_job(request)
+        job_id, is_result_requested = parse_job_path(request.path)
+        if is_result_requested:
+            return fetch_transformation_job(request, job_id)
+        return poll_transformation_job(job_id)
+    except Exception as e:
+        return report_exception(e), 400
+
+
+@functions_framework.http
+def get_metrics(request: flask.Request):
+    """HTTP based metrics of the transformations of this process.
+
+    Returns the stage latencies, model sizes and counts and the error counts (see
+    `metrics.transformation`) in the Prometheus text format.
+    """
+    return flask.Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+def report_exception(e: Exception):
+    """Log and count an exception and return its description for the end user."""
+    record_error(e)
+    if isinstance(e, KnownException):
         # Exception with description for the end user.
         print("Known excpetion:\n", str(e))
-        return str(e), 400
-    except PrivateInternalException as e:
+    elif isinstance(e, PrivateInternalException):
         # Internal exception with a generic description to the end user.
         print("Internal exception:\n", str(e))
-        return str(e), 400
-    except Exception as e:
+    else:
         # Not handled exception should be handled in the future.
         print("Unkown exception:\n", str(e))
-        return str(UnexpectedError()), 400
+    return describe_exception(e)
 
 
-def handle_transformation(request: flask.Request):
-    """Handle the transformation."""
-    transform_direction = request.args.get("direction")
-    if transform_direction is None:
-        raise UnexpectedQueryParameter("direction")
+def describe_exception(e: Exception):
+    """Return the description of an exception for the end user."""
+    if isinstance(e, KnownException | PrivateInternalException):
+        return str(e)
+    return str(UnexpectedError())
 
-    if transform_direction == "bpmntopnml":
-        bpmn_xml_content = request.form["bpmn"]
-        bpmn = BPMN.from_xml(bpmn_xml_content)
-        transformed_pnml = bpmn_to_workflow_net(bpmn)
-        response = jsonify({"pnml": clean_xml_string(transformed_pnml.to_string())})
-        response.headers["Access-Control-Allow-Origin"] = "*"
-        return response
-    elif transform_direction == "pnmltobpmn":
-        pnml_xml_content = request.form["pnml"]
-        pnml = Pnml.from_xml_str(pnml_xml_content)
-        transformed_bpmn = pnml_to_bpmn(pnml)
-        response = jsonify({"bpmn": clean_xml_string(transformed_bpmn.to_string())})
-        response.headers["Access-Control-Allow-Origin"] = "*"
+
+def create_preflight_response(methods: str = "POST,OPTIONS"):
+    """Return the response to a CORS preflight request."""
+    response = make_response()
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Allow-Methods"] = methods
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+    return response
+
+
+def handle_transformation(
+    request: flask.Request, token_check: Future[None] | None = None
+):
+    """Handle the transformation.
+
+    The posted model is parsed while a started token check is pending, the model is
+    only transformed after a successful check. With the result cache enabled (see
+    `result_cache.cache`), results of identical requests are served without parsing
+    the model.
+    """
+    cache = get_result_cache()
+    with awaiting_token_check(token_check):
+        transform_direction = get_transform_direction(request)
+        metrics = create_transformation_metrics(transform_direction)
+        source_key, response_key = TRANSFORM_DIRECTIONS[transform_direction]
+        xml_content = get_xml_content(request, source_key)
+
+        cached: str | None = None
+        if cache is not None:
+            if not isinstance(xml_content, str):
+                xml_content = xml_content.read()
+            cache_key = create_cache_key(transform_direction, xml_content)
+            cached = cache.get(cache_key)
+        if cached is None:
+            source = parse_model(source_key, xml_content, metrics)
+
+    chunks: Iterator[str]
+    if cached is not None:
+        chunks = iter([cached])
+    else:
+        chunks = iter_serialized(transform_source(source, metrics), metrics)
+        if cache is not None:
+            chunks = cache.iter_and_put(cache_key, chunks)
+    return create_transformation_response(request, response_key, chunks)
+
+
+def submit_transformation_job(request: flask.Request):
+    """Submit a job for the posted model and return its status.
+
+    The model is read while the token check is pending and transformed by the local
+    job workers after the request.
+    """
+    token_check = start_token_check()
+    with awaiting_token_check(token_check):
+        transform_direction = get_transform_direction(request)
+        source_key, _ = TRANSFORM_DIRECTIONS[transform_direction]
+        xml_content = get_xml_content(request, source_key)
+        if not isinstance(xml_content, str):
+            xml_content = xml_content.read()
+    job = submit_job(transform_direction, source_key, xml_content)
+
+    response = jsonify(job.get_status())
+    response.status_code = 202
+    response.headers["Location"] = f"{request.base_url.rstrip('/')}/{job.id}"
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+def poll_transformation_job(job_id: str):
+    """Return the state and progress per stage of a job (with its error if failed)."""
+    job = get_job_store().get(job_id)
+    status = job.get_status()
+    if job.error is not None:
+        status["error"] = describe_exception(job.error)
+    response = jsonify(status)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+def fetch_transformation_job(request: flask.Request, job_id: str):
+    """Return the transformed model of a job.
+
+    Unfinished jobs return their status with the status code 202, failed jobs their
+    error like a failed transformation.
+    """
+    job = get_job_store().get(job_id)
+    if job.error is not None:
+        # The error was already counted when the job failed.
+        return describe_exception(job.error), 400
+    if job.result is None:
+        response = poll_transformation_job(job_id)
+        response.status_code = 202
         return response
+    _, response_key = TRANSFORM_DIRECTIONS[job.direction]
+    return create_transformation_response(request, response_key, iter([job.result]))
+
+
+def parse_job_path(path: str):
+    """Return the job ID of a path and whether the result of the job is requested.
+
+    Raises:
+        UnknownJob: If the path does not contain a job ID.
+    """
+    segments = [segment for segment in path.split("/") if segment]
+    is_result_requested = bool(segments) and segments[-1] == "result"
+    if is_result_requested:
+        segments.pop()
+    if not segments:
+        raise UnknownJob("")
+    return segments[-1], is_result_requested
+
+
+def handle_batch_transformation(
+    request: flask.Request, token_check: Future[None] | None = None
+):
+    """Handle the transformation of a batch.
+
+    The models are read while a started token check is pending, the token of the
+    request is used by the first transformed model. The results are streamed while
+    the models are transformed.
+    """
+    with awaiting_token_check(token_check):
+        items = read_batch_items(request, TRANSFORM_DIRECTIONS)
+    response = flask.Response(iter_batch_records(items), mimetype="application/x-ndjson")
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+def iter_batch_records(items: list[BatchItem]):
+    """Yield the result record of each batch item in the order of completion.
+
+    Invalid items and results of the result cache are yielded first, the other
+    models are transformed in the batch worker pool. Each transformed model takes a
+    request token (see `iter_token_jobs`), the models without a token are yielded
+    last. Only the sizes of the models transformed in the pool are recorded as
+    metrics (see `metrics.transformation`).
+    """
+    cache = get_result_cache()
+    jobs: list[BatchJob] = []
+    for item in items:
+        if item.error is not None:
+            yield create_batch_record(item, error=item.error)
+            continue
+        cache_key: str | None = None
+        if cache is not None:
+            cache_key = create_cache_key(item.direction, item.content)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                yield create_batch_record(item, cached)
+                continue
+        source_key, _ = TRANSFORM_DIRECTIONS[item.direction]
+        jobs.append(((item, cache_key), (source_key, item.content)))
+
+    rejected: list[BatchItem] = []
+    for (item, cache_key), future in iter_completed(
+        transform_model, iter_token_jobs(jobs, rejected), get_batch_workers()
+    ):
+        try:
+            transformed = future.result()
+        except Exception as e:
+            yield create_batch_record(item, error=e)
+            continue
+        if cache is not None and cache_key is not None:
+            cache.put(cache_key, transformed)
+        metrics = create_transformation_metrics(item.direction)
+        if metrics is not None:
+            metrics.record_size("input", get_content_size(item.content))
+            metrics.record_size("output", get_text_size(transformed))
+        yield create_batch_record(item, transformed)
+    for item in rejected:
+        yield create_batch_record(item, error=NoRequestTokensAvailable())
+
+
+def iter_token_jobs(
+    jobs: list[BatchJob], rejected: list[BatchItem]
+) -> Iterator[BatchJob]:
+    """Yield the jobs of a batch that got a request token before their submission.
+
+    The first job uses the token of the batch request. Once the bucket is empty,
+    the items of the remaining jobs are added to `rejected` without taking tokens.
+    """
+    for index, job in enumerate(jobs):
+        if index > 0:
+            try:
+                check_request_token()
+            except NoRequestTokensAvailable:
+                rejected.extend(item for (item, _), _ in jobs[index:])
+                return
+        yield job
+
+
+def create_batch_record(
+    item: BatchItem, transformed: str | None = None, error: Exception | None = None
+):
+    """Return the NDJSON record of the transformed model or error of a batch item."""
+    record: dict[str, str | int] = {
+        "index": item.index,
+        "id": item.id,
+        "direction": item.direction,
+    }
+    if error is not None:
+        record["error"] = report_exception(error)
     else:
+        _, response_key = TRANSFORM_DIRECTIONS[item.direction]
+        record[response_key] = transformed or ""
+    return json.dumps(record) + "\n"
+
+
+def get_transform_direction(request: flask.Request):
+    """Return the transformation direction of the query parameters."""
+    transform_direction = request.args.get("direction")
+    if transform_direction not in TRANSFORM_DIRECTIONS:
         raise UnexpectedQueryParameter("direction")
+    return transform_direction
+
+
+def get_xml_content(request: flask.Request, form_key: str) -> str | IO[bytes]:
+    """Return the posted model as binary input stream or as form field.
+
+    Raw XML bodies are passed as bytes to the parser, form-encoded requests keep
+    the model in the form field named like the source model type.
+    """
+    if request.mimetype in RAW_XML_MIMETYPES:
+        return request.stream
+    return request.form[form_key]
+
+
+def is_xml_response_requested(request: flask.Request):
+    """Return whether the transformed model should be streamed as plain XML.
+
+    The query parameter "format" (json or xml) takes precedence over the Accept
+    header. JSON stays the default (e.g. for "*/*").
+    """
+    response_format = request.args.get("format")
+    if response_format is not None:
+        if response_format not in RESPONSE_FORMATS:
+            raise UnexpectedQueryParameter("format")
+        return response_format == "xml"
+    best_match = request.accept_mimetypes.best_match(RESPONSE_MIMETYPES)
+    return best_match in XML_MIMETYPES
+
+
+def create_transformation_response(
+    request: flask.Request, response_key: str, chunks: Iterator[str]
+):
+    """Return the transformed model as JSON or streamed XML response."""
+    if is_xml_response_requested(request):
+        response = create_xml_stream_response(chunks)
+    else:
+        response = jsonify({response_key: "".join(chunks)})
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+def create_xml_stream_response(chunks: Iterator[str]):
+    """Return a chunked response that streams the model while it is serialized.
+
+    The first chunk is created before responding, so errors in the setup of the
+    serialization still result in an error response.
+    """
+    first_chunk = next(chunks)
+    return flask.Response(
+        itertools.chain([first_chunk], chunks), mimetype="application/xml"
+    )
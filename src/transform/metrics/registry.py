@@ -0,0 +1,189 @@
+"""Counters and histograms in the Prometheus text exposition format.
+
+The metrics keep their values per combination of label values in memory. Recording
+a value only updates a few numbers under a lock, the text format is only rendered
+when the metrics are scraped (see `MetricsRegistry.render`). Counts that other
+components already keep are read on scrape (see `CallbackCounter`).
+"""
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_value(value: float):
+    """Return a sample value in the text format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label_value(value: str):
+    """Return a label value with escaped backslashes, quotes and line breaks."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]):
+    """Return the label set of a sample (empty without labels)."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+class Metric(ABC):
+    """Metric with a name, help text and label names."""
+
+    kind: str
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """Initialize the metric without any samples."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterator[str]:
+        """Yield the lines of the metric in the text format."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.render_samples()
+
+    @abstractmethod
+    def render_samples(self) -> Iterator[str]:
+        """Yield the sample lines of the metric."""
+
+
+class Counter(Metric):
+    """Monotonically increasing count per label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """Initialize the counter without any samples."""
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        """Increase the count of the label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str):
+        """Return the count of the label values."""
+        return self._values.get(label_values, 0)
+
+    def render_samples(self):
+        """Yield the count of each label values."""
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}{labels} {format_value(value)}"
+
+
+class CallbackCounter(Metric):
+    """Counts kept elsewhere (e.g. by a cache), collected when they are scraped."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str],
+        collect: Callable[[], Iterable[tuple[tuple[str, ...], float]]],
+    ):
+        """Initialize the counter with a function returning (label values, count)."""
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def render_samples(self):
+        """Yield the collected count of each label values."""
+        for label_values, value in self.collect():
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}{labels} {format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets per label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str],
+        buckets: Sequence[float],
+    ):
+        """Initialize the histogram with the sorted upper bounds of its buckets."""
+        super().__init__(name, documentation, labels)
+        self.buckets = sorted(buckets)
+        # Per label values the (non-cumulative) bucket counts and the sum.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        """Add a value to the distribution of the label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = (
+                    [0] * (len(self.buckets) + 1),
+                    [0.0],
+                )
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def get_count(self, *label_values: str):
+        """Return the number of observed values of the label values."""
+        entry = self._values.get(label_values)
+        return 0 if entry is None else sum(entry[0])
+
+    def render_samples(self):
+        """Yield the buckets, sum and count of each label values."""
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+        bounds = [*self.buckets, math.inf]
+        bucket_labels = (*self.labels, "le")
+        for label_values, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = format_labels(
+                    bucket_labels, (*label_values, format_value(bound))
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Metrics rendered together in the text format."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric):
+        """Add a metric and return it."""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return all metrics in the text format."""
+        lines = [line for metric in self.metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,240 @@
+"""Metrics of the transformations of the endpoints.
+
+A transformation records the wall time of its stages (see
+`transformer.utility.stages`) and of each preprocessing pass that ran, the byte
+sizes of the posted and the transformed model, the number of nodes and arcs (flows)
+of both models including their subprocesses and pages, and failed requests by
+exception class. Recording only updates in-memory counters, the Prometheus text
+format is rendered when the metrics are scraped (see `render_metrics`). Env
+METRICS=false disables the recording. The lookups of the result cache are read
+from its statistics on scrape.
+
+The metrics are kept per process. Models of a batch transformed in the worker
+processes record their sizes and errors, but not their stages and passes.
+"""
+
+import os
+import time
+from collections.abc import Iterable, Iterator
+from typing import IO, TYPE_CHECKING
+
+from metrics.registry import CallbackCounter, Counter, Histogram, MetricsRegistry
+from result_cache.cache import get_result_cache
+from transformer.utility.stages import Stage, StageObserver, observe_stages
+
+if TYPE_CHECKING:
+    from transformer.models.bpmn.bpmn import BPMN
+    from transformer.models.pnml.pnml import Pnml
+    from transformer.utility.passes import PassStats
+
+SECONDS_BUCKETS = [
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+]
+BYTES_BUCKETS = [1024 * 4**i for i in range(9)]
+COUNT_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000]
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "transformer_stage_seconds",
+        "Wall time of the stages of a transformation.",
+        ("direction", "stage"),
+        SECONDS_BUCKETS,
+    )
+)
+PASS_SECONDS = REGISTRY.register(
+    Histogram(
+        "transformer_pass_seconds",
+        "Wall time of the preprocessing passes that ran on a (sub)model.",
+        ("direction", "pass"),
+        SECONDS_BUCKETS,
+    )
+)
+MODEL_BYTES = REGISTRY.register(
+    Histogram(
+        "transformer_model_bytes",
+        "Size of the posted (input) and transformed (output) models.",
+        ("direction", "side"),
+        BYTES_BUCKETS,
+    )
+)
+MODEL_NODES = REGISTRY.register(
+    Histogram(
+        "transformer_model_nodes",
+        "Number of nodes of the parsed (input) and transformed (output) models.",
+        ("direction", "side"),
+        COUNT_BUCKETS,
+    )
+)
+MODEL_ARCS = REGISTRY.register(
+    Histogram(
+        "transformer_model_arcs",
+        "Number of arcs or flows of the parsed (input) and transformed (output) "
+        "models.",
+        ("direction", "side"),
+        COUNT_BUCKETS,
+    )
+)
+ERRORS = REGISTRY.register(
+    Counter(
+        "transformer_errors_total",
+        "Failed transformations and requests by exception class.",
+        ("exception",),
+    )
+)
+
+
+def collect_cache_lookups():
+    """Return the lookups of the result cache by result (none if it is disabled)."""
+    cache = get_result_cache()
+    if cache is None:
+        return []
+    stats = cache.stats
+    return [
+        (("memory_hit",), stats.hits - stats.disk_hits),
+        (("disk_hit",), stats.disk_hits),
+        (("miss",), stats.misses),
+    ]
+
+
+CACHE_LOOKUPS = REGISTRY.register(
+    CallbackCounter(
+        "transformer_result_cache_lookups_total",
+        "Lookups of the result cache by result.",
+        ("result",),
+        collect_cache_lookups,
+    )
+)
+
+
+def is_metrics_enabled():
+    """Return whether metrics are recorded (env METRICS, enabled by default)."""
+    return os.getenv("METRICS", "true").lower() not in ("false", "0")
+
+
+def render_metrics():
+    """Return the metrics of the process in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+def record_error(e: Exception):
+    """Count an exception of a failed transformation or request."""
+    if is_metrics_enabled():
+        ERRORS.inc(type(e).__name__)
+
+
+def get_text_size(text: str):
+    """Return the UTF-8 byte size of a text.
+
+    ASCII texts (flagged by the interpreter) are measured without encoding them.
+    """
+    return len(text) if text.isascii() else len(text.encode())
+
+
+def get_content_size(content: str | bytes | IO[bytes]):
+    """Return the byte size of a posted model (the read bytes of a stream)."""
+    if isinstance(content, str):
+        return get_text_size(content)
+    if isinstance(content, bytes):
+        return len(content)
+    try:
+        return content.tell()
+    except (AttributeError, OSError):
+        return None
+
+
+def count_model(model: "BPMN | Pnml"):
+    """Return the number of nodes and arcs of a model including its submodels.
+
+    The counts are taken from the sizes of the graphs and edge sets, the nodes are
+    not visited.
+    """
+    from transformer.models.bpmn.bpmn import BPMN
+
+    nodes = arcs = 0
+    if isinstance(model, BPMN):
+        processes = [model.process]
+        while processes:
+            process = processes.pop()
+            nodes += process.graph.node_count
+            arcs += len(process.flows)
+            processes.extend(process.subprocesses)
+    else:
+        nets = [model.net]
+        while nets:
+            net = nets.pop()
+            nodes += net.graph.node_count
+            arcs += len(net.arcs)
+            nets.extend(page.net for page in net.pages)
+    return nodes, arcs
+
+
+class TransformationMetrics(StageObserver):
+    """Recorder of the metrics of a transformation in one direction."""
+
+    def __init__(self, direction: str):
+        """Initialize the recorder of a transformation direction."""
+        self.direction = direction
+
+    def start_stage(self, stage: Stage):
+        """Ignore the start of a stage."""
+
+    def finish_stage(self, stage: Stage, seconds: float):
+        """Record the wall time of a stage."""
+        STAGE_SECONDS.observe(seconds, self.direction, stage.value)
+
+    def record_passes(self, stats: Iterable["PassStats"]):
+        """Record the wall time of the passes that ran."""
+        for s in stats:
+            if not s.skipped:
+                PASS_SECONDS.observe(s.seconds, self.direction, s.name)
+
+    def record_size(self, side: str, size: int | None):
+        """Record the byte size of the input or output model (if known)."""
+        if size is not None:
+            MODEL_BYTES.observe(size, self.direction, side)
+
+    def record_model(self, side: str, model: "BPMN | Pnml"):
+        """Record the number of nodes and arcs of the input or output model."""
+        nodes, arcs = count_model(model)
+        MODEL_NODES.observe(nodes, self.direction, side)
+        MODEL_ARCS.observe(arcs, self.direction, side)
+
+    def iter_serialized(self, chunks: Iterator[str]):
+        """Yield the chunks of a serialization and record its stage and size.
+
+        Only the time spent creating the chunks counts for the serialize stage (not
+        the time the consumer of a stream takes in between).
+        """
+        seconds, size = 0.0, 0
+        while True:
+            start = time.perf_counter()
+            with observe_stages(self):
+                chunk = next(chunks, None)
+            seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            size += get_text_size(chunk)
+            yield chunk
+        self.finish_stage(Stage.Serialize, seconds)
+        self.record_size("output", size)
+
+
+def create_transformation_metrics(direction: str):
+    """Return the recorder of a transformation (None if metrics are disabled)."""
+    if not is_metrics_enabled():
+        return None
+    return TransformationMetrics(direction)
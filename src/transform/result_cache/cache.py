@@ -0,0 +1,132 @@
+"""Content-addressed cache of transformation results.
+
+The results are keyed by a hash of the transformation direction and the posted
+model bytes, so identical requests are served without parsing the model. Line
+endings and trailing whitespace of the model are normalized for the key, they do
+not change the parsed model.
+
+The cache has an in-memory LRU tier bounded by the size of the results (env
+RESULT_CACHE_BYTES, disabled by default) and an optional on-disk tier in a local
+directory or SQLite file (env RESULT_CACHE_PATH). Results of the disk tier are
+moved into the memory tier when they are used.
+
+The cache is opt-in: the key needs the complete posted model, so a cached endpoint
+reads the model before parsing it instead of streaming it to the parser, and keeps
+the streamed result until it is complete.
+"""
+
+import hashlib
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from result_cache.stores import MemoryStore, ResultStore, create_disk_store
+
+DEFAULT_MAX_BYTES = 0
+# Increase when the output of a transformation changes (invalidates disk tiers).
+CACHE_VERSION = 1
+
+
+@dataclass
+class CacheStats:
+    """Counters of the cache lookups."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+
+def normalize_content(content: bytes):
+    """Return the model bytes with normalized line endings and trailing whitespace."""
+    return content.replace(b"\r\n", b"\n").rstrip()
+
+
+def create_cache_key(direction: str, content: str | bytes):
+    """Return the key of a transformation of the posted model (UTF-8 if a string)."""
+    if isinstance(content, str):
+        content = content.encode()
+    digest = hashlib.sha256(f"{CACHE_VERSION}:{direction}:".encode())
+    digest.update(normalize_content(content))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache of serialized transformation results with hit and miss counters."""
+
+    def __init__(self, memory: MemoryStore, disk: ResultStore | None = None):
+        """Initialize the cache with its memory tier and an optional disk tier."""
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached result of a key (None if missing)."""
+        value = self.memory.get(key)
+        is_disk_hit = False
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                is_disk_hit = True
+                self.memory.put(key, value)
+        with self._lock:
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                self.stats.disk_hits += is_disk_hit
+        return value.decode() if value is not None else None
+
+    def put(self, key: str, result: str):
+        """Store the result of a key in all tiers."""
+        value = result.encode()
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def iter_and_put(self, key: str, chunks: Iterator[str]):
+        """Yield the chunks of a result and store the result once it is complete.
+
+        Without a disk tier, results larger than the memory tier are not kept while
+        they are streamed (the memory tier would not store them).
+        """
+        parts: list[str] | None = []
+        length = 0
+        for chunk in chunks:
+            yield chunk
+            if parts is None:
+                continue
+            parts.append(chunk)
+            # The length in characters is a lower bound of the UTF-8 size.
+            length += len(chunk)
+            if self.disk is None and length > self.memory.max_bytes:
+                parts = None
+        if parts is not None:
+            self.put(key, "".join(parts))
+
+
+_cache: ResultCache | None = None
+
+
+def create_result_cache() -> ResultCache | None:
+    """Return a new cache configured by the envs (None if disabled)."""
+    max_bytes = int(os.getenv("RESULT_CACHE_BYTES", DEFAULT_MAX_BYTES))
+    if max_bytes <= 0:
+        return None
+    path = os.getenv("RESULT_CACHE_PATH")
+    return ResultCache(MemoryStore(max_bytes), create_disk_store(path) if path else None)
+
+
+def get_result_cache():
+    """Return the cache of the process (created on first use, None if disabled)."""
+    global _cache
+    if _cache is None:
+        _cache = create_result_cache()
+    return _cache
+
+
+def set_result_cache(cache: ResultCache | None):
+    """Replace the cache of the process (None for the configured cache)."""
+    global _cache
+    _cache = cache
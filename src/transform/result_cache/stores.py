@@ -0,0 +1,126 @@
+"""Stores of the result cache: an in-memory LRU and on-disk tiers."""
+
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+
+
+class ResultStore(ABC):
+    """Interface of the stores mapping cache keys to serialized results."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the value of a key (None if missing)."""
+
+    @abstractmethod
+    def put(self, key: str, value: bytes):
+        """Store the value of a key."""
+
+
+class MemoryStore(ResultStore):
+    """Least recently used entries in memory, bounded by the size of the values."""
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty store with the maximum total size of the values."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of entries."""
+        return len(self._entries)
+
+    def get(self, key: str):
+        """Return the value of a key (None if missing) and mark it as used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes):
+        """Store the value of a key and evict the least recently used entries.
+
+        Values larger than the store are not stored.
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DirectoryStore(ResultStore):
+    """Entries as files of a local directory (one file per key)."""
+
+    def __init__(self, path: str | Path):
+        """Initialize the store in a directory (created if missing)."""
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str):
+        """Return the value of a key (None if missing)."""
+        try:
+            return (self.path / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: bytes):
+        """Store the value of a key, replacing the file atomically."""
+        fd, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(value)
+        os.replace(temp_path, self.path / key)
+
+
+class SQLiteStore(ResultStore):
+    """Entries in a table of a local SQLite file."""
+
+    def __init__(self, path: str | Path):
+        """Initialize the store in a SQLite file (created if missing)."""
+        self.path = Path(path)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    def get(self, key: str):
+        """Return the value of a key (None if missing)."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, key: str, value: bytes):
+        """Store the value of a key."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def close(self):
+        """Close the connection to the file."""
+        self._connection.close()
+
+
+def create_disk_store(path: str) -> ResultStore:
+    """Return a SQLite store for paths with a .sqlite or .db suffix, else a directory."""
+    if Path(path).suffix in (".sqlite", ".sqlite3", ".db"):
+        return SQLiteStore(path)
+    return DirectoryStore(path)
@@ -0,0 +1,55 @@
+"""Benchmark of the gateway reduction of the petri net to BPMN transformation.
+
+Chain-shaped nets (place -> transition -> place ...) are transformed to a chain of
+XOR-gateways and tasks, all gateways are unnecessary. The time per place should stay
+constant with growing chains (linear scaling).
+
+Usage (from src/transform): python -m tests.benchmark.gateway_reduction [PLACES...]
+"""
+
+import sys
+import time
+
+from transformer.models.bpmn.bpmn import EndEvent, Process, StartEvent, Task, XorGateway
+from transformer.transform_petrinet_to_bpmn.transform import (
+    remove_unnecessary_gateways,
+)
+
+DEFAULT_SIZES = [10_000, 20_000, 40_000]
+
+
+def create_chain(places: int):
+    """Return a process like the transformation of a chain net with n places."""
+    process = Process(id="chain")
+    previous = process.add_node(StartEvent(id="start"))
+    for i in range(places):
+        gateway = XorGateway(id=f"p{i}")
+        task = Task(id=f"t{i}", name=f"t{i}")
+        process.add_flow(previous, gateway)
+        process.add_flow(gateway, task)
+        previous = task
+    process.add_flow(previous, EndEvent(id="end"))
+    return process
+
+
+def measure(places: int):
+    """Return the seconds to reduce the gateways of a chain with n places."""
+    process = create_chain(places)
+    start = time.perf_counter()
+    remove_unnecessary_gateways(process)
+    duration = time.perf_counter() - start
+    if process.xor_gws:
+        raise AssertionError("Unnecessary gateways left.")
+    return duration
+
+
+def main(sizes: list[int]):
+    """Print the reduction time (total and per place) for each chain size."""
+    print(f"{'places':>10} {'seconds':>10} {'us/place':>10}")
+    for places in sizes:
+        duration = measure(places)
+        print(f"{places:>10} {duration:>10.3f} {duration / places * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
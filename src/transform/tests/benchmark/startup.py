@@ -0,0 +1,122 @@
+"""Benchmark of the cold start of the transform endpoint.
+
+Each run starts a new interpreter that imports the endpoint module, answers a
+preflight request and then transforms the e2e payload. The transformer is imported
+with the first transformation, so the import of the endpoint stays small (checked
+by `tests.unit.test_startup`). The fastest time of the runs is compared to the
+budgets, the benchmark fails if one is exceeded.
+
+Usage (from src/transform): python -m tests.benchmark.startup [RUNS]
+"""
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Budgets in seconds, with headroom for slower machines.
+IMPORT_BUDGET = 0.8
+FIRST_RESPONSE_BUDGET = 0.8
+FIRST_TRANSFORMATION_BUDGET = 3.0
+
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import flask
+import main
+
+imported = time.perf_counter()
+is_transformer_imported = "transformer.models.bpmn.bpmn" in sys.modules
+app = flask.Flask(__name__)
+with app.test_request_context("/", method="OPTIONS"):
+    app.make_response(main.post_transform(flask.request))
+responded = time.perf_counter()
+with open("tests/assets/diagrams/bpmn/e2e_payload.xml", "rb") as file:
+    payload = file.read()
+with app.test_request_context(
+    "/?direction=bpmntopnml",
+    method="POST",
+    data=payload,
+    content_type="application/xml",
+):
+    response = app.make_response(main.post_transform(flask.request))
+    if response.status_code != 200:
+        raise AssertionError(response.get_data(as_text=True))
+transformed = time.perf_counter()
+print(json.dumps([
+    imported - start,
+    responded - start,
+    transformed - start,
+    is_transformer_imported,
+]))
+"""
+
+
+@dataclass(frozen=True)
+class StartupTimes:
+    """Seconds from the start of the import of the endpoint module.
+
+    Attributes:
+        imported: Until the endpoint module is imported.
+        first_response: Until a preflight request is answered.
+        first_transformation: Until a first model is transformed.
+        is_transformer_imported: Whether the import loaded the transformer.
+    """
+
+    imported: float
+    first_response: float
+    first_transformation: float
+    is_transformer_imported: bool
+
+
+def measure():
+    """Return the startup times of the endpoint in a new interpreter."""
+    env = os.environ | {"FORCE_STD_XML": "true", "RATE_LIMITER": "none"}
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return StartupTimes(*json.loads(output.splitlines()[-1]))
+
+
+def get_exceeded_budgets(runs: list[StartupTimes]):
+    """Return the names of the budgets exceeded by the fastest of the runs."""
+    budgets = {
+        "import": (IMPORT_BUDGET, [times.imported for times in runs]),
+        "response": (FIRST_RESPONSE_BUDGET, [times.first_response for times in runs]),
+        "transform": (
+            FIRST_TRANSFORMATION_BUDGET,
+            [times.first_transformation for times in runs],
+        ),
+    }
+    return [
+        name for name, (budget, seconds) in budgets.items() if min(seconds) >= budget
+    ]
+
+
+def main(runs: int):
+    """Print the startup times of each run and return whether they are in budget."""
+    print(f"{'import':>10} {'response':>10} {'transform':>10}")
+    measured = []
+    for _ in range(runs):
+        times = measure()
+        measured.append(times)
+        print(
+            f"{times.imported:>10.3f} {times.first_response:>10.3f} "
+            f"{times.first_transformation:>10.3f}"
+        )
+    exceeded = get_exceeded_budgets(measured)
+    if exceeded:
+        print(f"Over budget: {', '.join(exceeded)}")
+    return not exceeded
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 5) else 1)
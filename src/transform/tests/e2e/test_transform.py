@@ -95,6 +95,36 @@ class TestE2EPostTransform(unittest.TestCase):
 
         self.assertEqual( normalized_expected_xml, normalized_actual_xml )
 
+    def test_bpmn_to_pnml_xml_stream(self):
+        """Tests transform endpoint for bpmntopnml direction with XML response."""
+        PAYLOAD_BPMN_FILE_PATH =\
+            'tests/assets/diagrams/bpmn/e2e_payload.xml'
+        with open( PAYLOAD_BPMN_FILE_PATH, encoding='utf-8') as file:
+            payload_content = file.read()
+
+        EXPECTED_PNML_FILE_PATH =\
+            'tests/assets/diagrams/pnml/e2e_expected_response.xml'
+        with open( EXPECTED_PNML_FILE_PATH, encoding='utf-8') as file:
+            expected_response = file.read()
+
+        payload = {"bpmn": payload_content}
+
+        response = requests.post(
+            f'{self.url}?direction=bpmntopnml&format=xml',
+            data = payload,
+            timeout=self.REQUEST_TIMEOUT,
+            headers=self.shared_haeaders,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response.headers["Content-Type"].startswith("application/xml")
+        )
+
+        normalized_expected_xml = self.__normalize_xml( expected_response )
+        normalized_actual_xml   = self.__normalize_xml( response.text     )
+
+        self.assertEqual( normalized_expected_xml, normalized_actual_xml )
+
     def test_invalid_direction(self):
         """Tests transform endpoint for an invalid direction."""
         PAYLOAD_PNML_FILE_PATH =\
@@ -0,0 +1 @@
+"""In-memory and local stand-ins for external services used in tests."""
@@ -0,0 +1,122 @@
+"""In-memory stand-in for the used subset of the Firestore client.
+
+Transactions buffer their writes and apply them on commit. Transactional functions
+run under a lock of the client, so they are serialized like conflicting Firestore
+transactions.
+"""
+
+import copy
+import threading
+from collections.abc import Callable
+from typing import Any
+
+
+class DocumentSnapshot:
+    """Snapshot of a document at the time of the read."""
+
+    def __init__(self, data: dict[str, Any] | None):
+        """Initialize the snapshot with the data of the document (None if missing)."""
+        self._data = copy.deepcopy(data)
+
+    @property
+    def exists(self):
+        """Return whether the document existed."""
+        return self._data is not None
+
+    def to_dict(self):
+        """Return the data of the document (None if missing)."""
+        return copy.deepcopy(self._data)
+
+
+class DocumentReference:
+    """Reference to a document of a collection."""
+
+    def __init__(self, client: "InMemoryFirestore", path: tuple[str, str]):
+        """Initialize the reference with the client and the document path."""
+        self._client = client
+        self.path = path
+
+    def get(self, transaction: "Transaction | None" = None):
+        """Return a snapshot of the document."""
+        return DocumentSnapshot(self._client.documents.get(self.path))
+
+    def set(self, data: dict[str, Any]):
+        """Replace the document."""
+        self._client.documents[self.path] = copy.deepcopy(data)
+
+    def update(self, data: dict[str, Any]):
+        """Update fields of an existing document."""
+        if self.path not in self._client.documents:
+            raise KeyError(f"Document {self.path} not found")
+        self._client.documents[self.path].update(copy.deepcopy(data))
+
+
+class CollectionReference:
+    """Reference to a collection."""
+
+    def __init__(self, client: "InMemoryFirestore", name: str):
+        """Initialize the reference with the client and the collection name."""
+        self._client = client
+        self.name = name
+
+    def document(self, id: str):
+        """Return the reference to a document of the collection."""
+        return DocumentReference(self._client, (self.name, id))
+
+
+class Transaction:
+    """Transaction buffering its writes until the commit."""
+
+    def __init__(self, client: "InMemoryFirestore"):
+        """Initialize an empty transaction of a client."""
+        self._client = client
+        self._writes: list[Callable[[], None]] = []
+
+    def set(self, reference: DocumentReference, data: dict[str, Any]):
+        """Replace a document on commit."""
+        self._writes.append(lambda: reference.set(data))
+
+    def update(self, reference: DocumentReference, data: dict[str, Any]):
+        """Update fields of a document on commit."""
+        self._writes.append(lambda: reference.update(data))
+
+    def commit(self):
+        """Apply the buffered writes."""
+        for write in self._writes:
+            write()
+        self._client.commits += 1
+        self._writes.clear()
+
+
+class InMemoryFirestore:
+    """Firestore client storing the documents in a dictionary.
+
+    Attributes:
+        documents: The data of the documents by (collection, document ID).
+        commits: The number of committed transactions.
+    """
+
+    def __init__(self):
+        """Initialize an empty database."""
+        self.documents: dict[tuple[str, str], dict[str, Any]] = {}
+        self.commits = 0
+        self.lock = threading.RLock()
+
+    def collection(self, name: str):
+        """Return the reference to a collection."""
+        return CollectionReference(self, name)
+
+    def transaction(self):
+        """Return a new transaction."""
+        return Transaction(self)
+
+    def transactional(self, func: Callable[..., Any]):
+        """Return a function running in a transaction (`firestore.transactional`)."""
+
+        def run(transaction: Transaction, *args: Any, **kwargs: Any):
+            with self.lock:
+                result = func(transaction, *args, **kwargs)
+                transaction.commit()
+            return result
+
+        return run
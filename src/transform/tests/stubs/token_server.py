@@ -0,0 +1,64 @@
+"""Local stand-in for the checkTokens function."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class TokenServer:
+    """HTTP server answering token checks with a configurable status code.
+
+    Attributes:
+        status: The status code of the responses.
+        release: Responses are delayed until the event is set (or a timeout).
+        released: Whether each response was sent after the release (not a timeout).
+        connections: The number of accepted connections.
+    """
+
+    def __init__(self, status: int = 200, release_timeout: float = 2.0):
+        """Start the server on a free local port."""
+        self.status = status
+        self.release = threading.Event()
+        self.release.set()
+        self.release_timeout = release_timeout
+        self.released: list[bool] = []
+        self.connections = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        """Return the URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/checkTokens"
+
+    def _create_handler(self):
+        """Return the request handler class of the server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                server.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                server.released.append(server.release.wait(server.release_timeout))
+                body = b"{}"
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
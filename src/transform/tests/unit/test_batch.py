@@ -0,0 +1,165 @@
+"""Unit tests for the batch transformation endpoint."""
+
+import io
+import json
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import flask
+from tests.unit.test_parallel import get_tokens
+
+from exceptions import (
+    InvalidBatchItem,
+    NoRequestTokensAvailable,
+    TooManyBatchItems,
+    UnsupportedBatchFormat,
+)
+from limiter.bucket import BucketState, InProcessLimiter
+from limiter.selection import set_limiter
+from main import post_transform_batch
+from result_cache.cache import ResultCache, set_result_cache
+from result_cache.stores import MemoryStore
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+
+app = flask.Flask(__name__)
+
+
+class TestPostTransformBatch(unittest.TestCase):
+    """Tests the request formats, results and errors of the batch endpoint."""
+
+    def setUp(self):
+        """Use a new result cache and load the e2e payload and its transformation."""
+        self.cache = ResultCache(MemoryStore(1024 * 1024))
+        set_result_cache(self.cache)
+        self.bpmn = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+        self.expected_pnml = bpmn_to_workflow_net(BPMN.from_xml(self.bpmn)).to_string()
+
+    def tearDown(self):
+        """Reset the cache to the configured one."""
+        set_result_cache(None)
+
+    def post(self, data: dict | bytes, content_type: str | None = None):
+        """Return the response of a batch request."""
+        with app.test_request_context(
+            "/", method="POST", data=data, content_type=content_type
+        ):
+            return app.make_response(post_transform_batch(flask.request))
+
+    def post_records(self, data: dict | bytes, content_type: str | None = None):
+        """Return the result records of a batch request ordered by position."""
+        response = self.post(data, content_type)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        records = [json.loads(line) for line in response.get_data().splitlines()]
+        return sorted(records, key=lambda record: record["index"])
+
+    def create_ndjson(self, *records: object):
+        """Return newline-delimited JSON of records (strings are taken as lines)."""
+        lines = [r if isinstance(r, str) else json.dumps(r) for r in records]
+        return "\n".join(lines).encode()
+
+    def test_ndjson(self):
+        """Tests whether models and invalid records have a result in order."""
+        data = self.create_ndjson(
+            {"id": "first", "direction": "bpmntopnml", "model": self.bpmn},
+            "",
+            {"direction": "pnmltobpmn", "model": self.expected_pnml},
+            {"direction": "unknown", "model": self.bpmn},
+            "{invalid",
+        )
+        records = self.post_records(data, "application/x-ndjson")
+
+        self.assertEqual([r["id"] for r in records], ["first", "1", "2", "3"])
+        self.assertEqual(records[0]["pnml"], self.expected_pnml)
+        self.assertIn(":definitions", records[1]["bpmn"])
+        for index in 2, 3:
+            self.assertEqual(records[index]["error"], str(InvalidBatchItem(index)))
+
+    def test_multipart(self):
+        """Tests whether each file part is transformed in the part's direction."""
+        data = {
+            "bpmntopnml": [
+                (io.BytesIO(self.bpmn.encode()), "a.bpmn"),
+                (io.BytesIO(b"<definitions>"), "b.bpmn"),
+            ],
+            "pnmltobpmn": (io.BytesIO(self.expected_pnml.encode()), "c.pnml"),
+        }
+        records = self.post_records(data)
+
+        self.assertEqual([r["id"] for r in records], ["a.bpmn", "b.bpmn", "c.pnml"])
+        self.assertEqual(records[0]["pnml"], self.expected_pnml)
+        self.assertIn("error", records[1])
+        self.assertIn("bpmn", records[2])
+
+    def test_worker_pool(self):
+        """Tests whether the models are transformed in the pool like sequentially."""
+        data = self.create_ndjson(
+            *[
+                {"direction": direction, "model": model}
+                for direction, model in [
+                    ("bpmntopnml", self.bpmn),
+                    ("bpmntopnml", "<definitions>"),
+                    ("pnmltobpmn", self.expected_pnml),
+                ]
+                * 3
+            ]
+        )
+        with mock.patch.dict(os.environ, {"RESULT_CACHE_BYTES": "0"}):
+            set_result_cache(None)
+            with mock.patch.dict(os.environ, {"BATCH_WORKERS": "0"}):
+                sequential = self.post_records(data, "application/x-ndjson")
+            with mock.patch.dict(os.environ, {"BATCH_WORKERS": "2"}):
+                parallel = self.post_records(data, "application/x-ndjson")
+
+        # The order of set elements in the XML differs between processes.
+        self.assertEqual(len(parallel), 9)
+        for records in sequential, parallel:
+            for record in records:
+                for key in "pnml", "bpmn":
+                    if key in record:
+                        record[key] = get_tokens(record[key])
+        self.assertEqual(sequential, parallel)
+
+    def test_result_cache(self):
+        """Tests whether results of the cache are returned without transformation."""
+        data = self.create_ndjson({"direction": "bpmntopnml", "model": self.bpmn})
+        first = self.post_records(data, "application/x-ndjson")
+        second = self.post_records(data, "application/x-ndjson")
+
+        self.assertEqual(first, second)
+        self.assertEqual((self.cache.stats.hits, self.cache.stats.misses), (1, 1))
+
+    def test_request_tokens(self):
+        """Tests whether each transformed model takes a token until none are left."""
+        data = self.create_ndjson(
+            *[{"direction": "bpmntopnml", "model": self.bpmn}] * 4,
+            {"direction": "unknown", "model": self.bpmn},
+        )
+        limiter = InProcessLimiter(BucketState(2, 0.0), clock=lambda: 1.0)
+        set_limiter(limiter)
+        try:
+            records = self.post_records(data, "application/x-ndjson")
+        finally:
+            set_limiter(None)
+
+        self.assertEqual(limiter.state.tokens, 0)
+        for record in records[:2]:
+            self.assertEqual(get_tokens(record["pnml"]), get_tokens(self.expected_pnml))
+        for record in records[2:4]:
+            self.assertEqual(record["error"], str(NoRequestTokensAvailable()))
+        self.assertEqual(records[4]["error"], str(InvalidBatchItem(4)))
+
+    def test_request_errors(self):
+        """Tests whether unsupported formats and too large batches are rejected."""
+        response = self.post(self.bpmn.encode(), "application/xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_data(as_text=True), str(UnsupportedBatchFormat()))
+
+        data = self.create_ndjson(*[{"direction": "bpmntopnml"}] * 3)
+        with mock.patch.dict(os.environ, {"BATCH_MAX_ITEMS": "2"}):
+            response = self.post(data, "application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_data(as_text=True), str(TooManyBatchItems(2)))
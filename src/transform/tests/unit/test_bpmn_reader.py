@@ -0,0 +1,51 @@
+"""Unit tests for the streaming BPMN reader."""
+
+import unittest
+from pathlib import Path
+
+from defusedxml.ElementTree import fromstring
+
+from exceptions import InvalidInputXML, NotSupportedBPMNElement
+from transformer.models.bpmn.bpmn import BPMN
+
+
+class TestStreamingBPMNReader(unittest.TestCase):
+    """Tests whether the single pass reader matches the tree based parsing."""
+
+    def test_equal_to_tree_parsing(self):
+        """Tests whether both readers create the same BPMN (also from bytes)."""
+        for path in [
+            "tests/assets/multiplesubprocesses.bpmn",
+            "tests/assets/diagrams/bpmn/e2e_payload.xml",
+        ]:
+            content = Path(path).read_text()
+            expected = BPMN.from_xml_tree(fromstring(content))
+            with self.subTest(path):
+                self.assertEqual(BPMN.from_xml(content), expected)
+                self.assertEqual(BPMN.from_xml(content.encode()), expected)
+
+    def test_reject_unsupported_element(self):
+        """Tests whether unsupported elements are rejected while reading."""
+        content = Path("tests/assets/diagrams/bpmn/Insurance.bpmn").read_text()
+        with self.assertRaises(NotSupportedBPMNElement):
+            BPMN.from_xml(content)
+
+    def test_invalid_xml(self):
+        """Tests whether malformed or incomplete documents are rejected."""
+        for content in [
+            "<definitions",
+            '<definitions xmlns="http://www.omg.org/spec/BPMN/20100524/MODEL"/>',
+        ]:
+            with self.subTest(content), self.assertRaises(InvalidInputXML):
+                BPMN.from_xml(content)
+
+    def test_wrong_root(self):
+        """Tests whether documents with another root than definitions are rejected."""
+        content = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+        start = content.index("<bpmn:process")
+        end = content.index("</bpmn:process>") + len("</bpmn:process>")
+        namespace = 'xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL"'
+        for root in ["bpmn:process", "bpmn:collaboration", "root"]:
+            wrapped = f"<{root} {namespace}>{content[start:end]}</{root}>"
+            with self.subTest(root), self.assertRaises(InvalidInputXML):
+                BPMN.from_xml(wrapped)
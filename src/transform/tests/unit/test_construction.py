@@ -0,0 +1,58 @@
+"""Unit tests for the trusted construction of the models."""
+
+import unittest
+from pathlib import Path
+
+from exceptions import InvalidInputXML
+
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.models.pnml.base import Name
+from transformer.models.pnml.pnml import Pnml
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
+from transformer.utility.construction import (
+    ConstructionMode,
+    construction_mode,
+    trusted_construct,
+)
+
+
+class TestTrustedConstruction(unittest.TestCase):
+    """Tests whether trusted construction equals the validated construction."""
+
+    def test_trusted_construct(self):
+        """Tests whether defaults are filled like the validation does."""
+        self.assertEqual(trusted_construct(Name, title="a"), Name(title="a"))
+        self.assertEqual(trusted_construct(Name), Name())
+
+    def test_verify_pnml_reader(self):
+        """Tests whether the trusted reader creates the validated nets."""
+        for path in Path("tests/assets").rglob("*.pnml"):
+            content = path.read_text()
+            with self.subTest(str(path)):
+                with construction_mode(ConstructionMode.Verify):
+                    trusted = Pnml.from_xml_str(content)
+                self.assertEqual(trusted, Pnml.from_xml_str(content))
+
+    def test_missing_required_attributes(self):
+        """Tests whether the trusted reader rejects elements without required IDs."""
+        for element in [
+            "<place><name><text>p</text></name></place>",
+            "<transition />",
+            '<place id="p" /><transition id="t" /><arc id="a" source="p" />',
+            '<place id="p" /><transition id="t" /><arc id="a" target="t" />',
+        ]:
+            content = f'<pnml><net id="net">{element}</net></pnml>'
+            with self.subTest(element), construction_mode(ConstructionMode.Trusted):
+                with self.assertRaises(InvalidInputXML):
+                    Pnml.from_xml_str(content)
+
+    def test_verify_transformation(self):
+        """Tests whether transformations yield the same models in trusted mode."""
+        content = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+        expected_net = bpmn_to_workflow_net(BPMN.from_xml(content))
+        with construction_mode(ConstructionMode.Verify):
+            net = bpmn_to_workflow_net(BPMN.from_xml(content))
+            bpmn = pnml_to_bpmn(net)
+        self.assertEqual(net, expected_net)
+        self.assertEqual(bpmn, pnml_to_bpmn(expected_net))
@@ -0,0 +1,90 @@
+"""Unit tests for the structural fingerprints of BPMN and PNML models."""
+
+import unittest
+
+from transformer.equality.bpmn import compare_bpmn
+from transformer.equality.fingerprint import get_fingerprint, get_subtree_fingerprints
+from transformer.models.bpmn.bpmn import BPMN, Process, Task
+from transformer.models.pnml.graphics import Coordinates, PositionGraphics
+from transformer.models.pnml.pnml import Pnml
+
+BPMN_PATH = "tests/assets/multiplesubprocesses.bpmn"
+PNML_PATH = "tests/assets/multiplesubprocesses.pnml"
+
+
+def find_subprocess(process: Process, id: str) -> Process | None:
+    """Return a nested subprocess by ID."""
+    for subprocess in process.subprocesses:
+        if subprocess.id == id:
+            return subprocess
+        nested = find_subprocess(subprocess, id)
+        if nested is not None:
+            return nested
+    return None
+
+
+class TestFingerprint(unittest.TestCase):
+    """Tests whether fingerprints are canonical and cover the hierarchy."""
+
+    def test_serialization_roundtrip(self):
+        """Tests whether reparsed models (other set order) keep the fingerprint."""
+        bpmn = BPMN.from_file(BPMN_PATH)
+        reparsed_bpmn = BPMN.from_xml(bpmn.to_string())
+        self.assertEqual(get_fingerprint(bpmn), get_fingerprint(reparsed_bpmn))
+        self.assertTrue(*compare_bpmn(bpmn, reparsed_bpmn))
+
+        pnml = Pnml.from_file(PNML_PATH)
+        reparsed_pnml = Pnml.from_xml_str(pnml.to_string())
+        self.assertEqual(get_fingerprint(pnml), get_fingerprint(reparsed_pnml))
+        self.assertEqual(
+            get_subtree_fingerprints(pnml.net),
+            get_subtree_fingerprints(reparsed_pnml.net),
+        )
+
+    def test_flow_references_ignored(self):
+        """Tests whether serializing a built model does not change its fingerprint.
+
+        The incoming and outgoing references of the nodes are only set when the
+        model is serialized.
+        """
+        bpmn = BPMN.generate_empty_bpmn("process")
+        tasks = [Task(id=f"task{i}", name=f"task{i}") for i in range(3)]
+        for source, target in zip(tasks, tasks[1:]):
+            bpmn.process.add_flow(source, target)
+        fingerprint = get_fingerprint(bpmn)
+        xml = bpmn.to_string()
+
+        self.assertEqual(get_fingerprint(bpmn), fingerprint)
+        self.assertEqual(get_fingerprint(BPMN.from_xml(xml)), fingerprint)
+
+    def test_insertion_order(self):
+        """Tests whether the order of adding elements does not matter."""
+        tasks = [Task(id=f"task{i}", name=f"task{i}") for i in range(4)]
+        flows = list(zip(tasks, tasks[1:]))
+        processes = [Process(id="process"), Process(id="process")]
+        for process, ordered_flows in zip(processes, [flows, flows[::-1]]):
+            for source, target in ordered_flows:
+                process.add_flow(source.model_copy(), target.model_copy())
+        self.assertEqual(*map(get_fingerprint, processes))
+
+    def test_nested_change(self):
+        """Tests whether a change only changes the digests of its ancestors."""
+        bpmn = BPMN.from_file(BPMN_PATH)
+        before = get_subtree_fingerprints(bpmn.process)
+        subprocess = find_subprocess(bpmn.process, "Activity_1sf2h89")
+        assert subprocess is not None
+        next(iter(subprocess.start_events)).name = "changed"
+        after = get_subtree_fingerprints(bpmn.process)
+
+        changed = {id for id in before if before[id] != after[id]}
+        self.assertEqual(changed, {"Process_1", "Activity_0i1of0z", "Activity_1sf2h89"})
+
+    def test_graphics_ignored(self):
+        """Tests whether positions are not part of the fingerprint."""
+        pnml = Pnml.from_file(PNML_PATH)
+        fingerprint = get_fingerprint(pnml)
+        for place in pnml.net.places:
+            place.graphics = PositionGraphics(position=Coordinates(x=1, y=2))
+        self.assertEqual(get_fingerprint(pnml), fingerprint)
+        next(iter(pnml.net.places)).id = "renamed"
+        self.assertNotEqual(get_fingerprint(pnml), fingerprint)
@@ -0,0 +1,40 @@
+"""Unit tests for the gateway reduction of the petri net to BPMN transformation."""
+
+import unittest
+
+from tests.benchmark.gateway_reduction import create_chain
+
+from transformer.models.bpmn.bpmn import EndEvent, Process, StartEvent, Task, XorGateway
+from transformer.transform_petrinet_to_bpmn.transform import (
+    remove_unnecessary_gateways,
+)
+
+
+class TestRemoveUnnecessaryGateways(unittest.TestCase):
+    """Tests the worklist based removal of gateways with in and out degree 1."""
+
+    def test_chain(self):
+        """Tests whether all gateways of a chain are bridged."""
+        process = create_chain(100)
+        remove_unnecessary_gateways(process)
+        self.assertEqual(process.xor_gws, set())
+        self.assertEqual(len(process.flows), 101)
+        self.assertEqual(process.get_outgoing("t0")[0].targetRef, "t1")
+
+    def test_neighbours_rechecked(self):
+        """Tests whether a gateway is removed once a removal lowered its degree."""
+        process = Process(id="process")
+        start, end, task = StartEvent(id="s"), EndEvent(id="e"), Task(id="t")
+        split, inner = XorGateway(id="x1"), XorGateway(id="x2")
+        process.add_flow(start, split)
+        process.add_flow(split, task)
+        process.add_flow(split, inner)
+        process.add_flow(inner, task)
+        process.add_flow(task, end)
+
+        remove_unnecessary_gateways(process)
+        self.assertEqual(process.xor_gws, set())
+        self.assertEqual(
+            {(f.sourceRef, f.targetRef) for f in process.flows},
+            {("s", "t"), ("t", "e")},
+        )
@@ -0,0 +1,142 @@
+"""Unit tests for the graph core of the models."""
+
+import unittest
+
+from transformer.models.bpmn.bpmn import AndGateway, Process, Task, XorGateway
+from transformer.models.pnml.pnml import Net, Place, Transition
+from transformer.utility.graph import Graph
+
+
+class TestGraph(unittest.TestCase):
+    """Tests the integer indexed graph core."""
+
+    def test_adjacency(self):
+        """Tests adjacency lookups, degrees and edge removal."""
+        graph: Graph[str, str] = Graph()
+        graph.add_node("a", "A")
+        graph.add_node("b", "B")
+        self.assertTrue(graph.add_edge("ab", "a", "b", "AB"))
+        self.assertFalse(graph.add_edge("ab", "a", "b", "AB"))
+        self.assertTrue(graph.add_edge("ba", "b", "a", "BA"))
+        self.assertEqual(graph.get_outgoing("a"), ["AB"])
+        self.assertEqual(graph.get_incoming("a"), ["BA"])
+        self.assertEqual(graph.get_in_degree("b"), 1)
+        self.assertEqual(graph.get_out_degree("unknown"), 0)
+
+        self.assertEqual(graph.remove_edge("ab"), "AB")
+        self.assertEqual(graph.get_outgoing("a"), [])
+        self.assertTrue(graph.add_edge("ab2", "a", "b", "AB2"))
+        self.assertEqual(graph.get_incoming("b"), ["AB2"])
+        self.assertEqual(list(graph.nodes()), ["A", "B"])
+
+    def test_node_view(self):
+        """Tests whether node views are cached until a node is added or removed."""
+        graph: Graph[str, str] = Graph()
+        graph.add_node("a", "A")
+        view = graph.node_view()
+        graph.add_edge("aa", "a", "a", "AA")
+        graph.add_node("a", "A")
+        self.assertIs(graph.node_view(), view)
+
+        generation = graph.generation
+        graph.add_node("b", "B")
+        self.assertEqual(graph.node_view(), ("A", "B"))
+        graph.remove_node("a")
+        self.assertEqual(graph.node_view(), ("B",))
+        self.assertEqual(graph.generation, generation + 2)
+        self.assertEqual(graph.node_count, 1)
+
+    def test_remove_node(self):
+        """Tests whether edges of a removed node stay at their other end."""
+        graph: Graph[str, str] = Graph()
+        graph.add_node("a", "A")
+        graph.add_node("b", "B")
+        graph.add_edge("ab", "a", "b", "AB")
+        self.assertEqual(graph.remove_node("b"), (["AB"], []))
+        self.assertFalse(graph.has_node("b"))
+        self.assertEqual(graph.get_outgoing("a"), ["AB"])
+        self.assertEqual(graph.remove_edge("ab"), "AB")
+        self.assertEqual(graph.get_out_degree("a"), 0)
+
+    def test_reconnect_edge(self):
+        """Tests whether edges are moved in place unless the new key exists."""
+        graph: Graph[str, str] = Graph()
+        graph.add_edge("ab", "a", "b", "AB")
+        graph.add_edge("cb", "c", "b", "CB")
+        self.assertFalse(graph.reconnect_edge("ab", "cb", "c", "b"))
+        self.assertTrue(graph.reconnect_edge("ab", "ac", "a", "c"))
+        self.assertEqual(graph.get_edge("ac"), "AB")
+        self.assertFalse(graph.has_edge("ab"))
+        self.assertEqual(graph.get_incoming("b"), ["CB"])
+        self.assertEqual(graph.get_incoming("c"), ["AB"])
+
+
+class TestNetGraph(unittest.TestCase):
+    """Tests the net operations based on the graph core."""
+
+    def setUp(self):
+        """Create a net with a place connected to a transition."""
+        self.net = Net(id="net")
+        self.place = self.net.add_element(Place.create(id="p"))
+        self.transition = self.net.add_element(Transition.create(id="t"))
+        self.net.add_arc(self.place, self.transition)
+
+    def test_remove_arc_by_copy(self):
+        """Tests whether arcs can be removed by an equal copy."""
+        (arc,) = self.net.get_outgoing("p")
+        self.net.remove_arc(arc.model_copy())
+        self.assertEqual(self.net.arcs, set())
+        self.assertEqual(self.net.get_in_degree(self.transition), 0)
+
+    def test_remove_element(self):
+        """Tests whether arcs of a removed element are detached but kept."""
+        self.net.remove_element(self.transition)
+        (arc,) = self.net.get_outgoing("p")
+        self.assertEqual(arc.target, "")
+        self.assertIn(arc, self.net.arcs)
+        self.net.remove_arc(arc)
+        self.assertEqual(self.net.arcs, set())
+
+    def test_change_id(self):
+        """Tests whether changing an ID reconnects the arcs."""
+        self.net.change_id("t", "t2")
+        self.assertIsNone(self.net.get_node_or_none("t"))
+        self.assertEqual(self.net.get_in_degree(self.transition), 1)
+        self.assertEqual([a.target for a in self.net.get_outgoing("p")], ["t2"])
+
+
+class TestProcessGraph(unittest.TestCase):
+    """Tests the process operations based on the graph core."""
+
+    def setUp(self):
+        """Create a process with a task between two gateways."""
+        self.process = Process(id="process")
+        self.split = XorGateway(id="split")
+        self.task = Task(id="task")
+        self.join = XorGateway(id="join")
+        self.process.add_flow(self.split, self.task, id="f1")
+        self.process.add_flow(self.task, self.join, id="f2")
+
+    def test_type_index(self):
+        """Tests whether nodes are partitioned by their exact type."""
+        self.assertEqual(self.process.tasks, {self.task})
+        self.assertEqual(
+            {n.id for n in self.process.get_nodes_by_type(XorGateway)}, {"split", "join"}
+        )
+        self.assertEqual(self.process.get_nodes_by_type(AndGateway), ())
+
+    def test_change_node_id(self):
+        """Tests whether changing an ID reconnects the flows."""
+        self.process.change_node_id(self.task, "task2")
+        self.assertFalse(self.process.is_node_existing("task"))
+        self.assertEqual(self.process.get_flow("f1").targetRef, "task2")
+        self.assertEqual(self.process.get_flow_source_by_id("f2").id, "task2")
+        self.assertEqual(self.process.get_in_degree(self.join), 1)
+
+    def test_flow_references(self):
+        """Tests whether the node flow IDs are only set from the graph."""
+        self.assertEqual(self.task.incoming, set())
+        self.process.remove_flow(self.process.get_flow("f2"))
+        self.process.set_flow_references()
+        self.assertEqual((self.task.incoming, self.task.outgoing), ({"f1"}, set()))
+        self.assertEqual(self.join.incoming, set())
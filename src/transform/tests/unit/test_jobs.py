@@ -0,0 +1,310 @@
+"""Unit tests for the asynchronous transformation jobs."""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import flask
+from tests.unit.test_parallel import get_tokens
+
+from exceptions import InvalidInputXML, JobInterrupted, TooManyJobs, UnknownJob
+from jobs.runner import set_job_store
+from jobs.store import JOB_STAGES, Job, JobState, JobStore, SQLiteJobStore
+from main import transform_jobs
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+from transformer.utility.stages import Stage, StageObserver, observe_stages
+
+app = flask.Flask(__name__)
+
+
+def request_job(path: str, method: str = "GET", data: str | None = None):
+    """Return the status code and the data of a request to the job endpoint."""
+    with app.test_request_context(
+        path,
+        method=method,
+        data=data,
+        content_type=None if data is None else "application/xml",
+    ):
+        response = app.make_response(transform_jobs(flask.request))
+        return response.status_code, response.get_data(as_text=True)
+
+
+def poll_job(store_path: str, job_id: str):
+    """Poll a job of a shared store until it finished and return its result.
+
+    Runs in another process like a request that reaches another server worker.
+    """
+    set_job_store(SQLiteJobStore(store_path, 10, 60))
+    for _ in range(500):
+        _, status = request_job(f"/{job_id}")
+        if json.loads(status)["state"] in ("done", "failed"):
+            return request_job(f"/{job_id}/result?format=xml")
+        time.sleep(0.01)
+    return 0, status
+
+
+def abandon_job(store_path: str, job_id: str):
+    """Start transforming a job of a shared store and exit the process.
+
+    Runs in another process like a server worker that stops during a job.
+    """
+    store = SQLiteJobStore(store_path, 10, 60)
+    job = Job(job_id, "bpmntopnml")
+    store.add(job)
+    job.start_stage(Stage.Transform)
+    os._exit(1)
+
+
+class StageRecorder(StageObserver):
+    """Observer that records the notifications of the stages."""
+
+    def __init__(self):
+        """Initialize an empty record."""
+        self.events: list[tuple[str, Stage]] = []
+
+    def start_stage(self, stage: Stage):
+        """Record the start of a stage."""
+        self.events.append(("start", stage))
+
+    def finish_stage(self, stage: Stage, seconds: float):
+        """Record the end of a stage."""
+        self.events.append(("finish", stage))
+
+
+class TestJobStore(unittest.TestCase):
+    """Tests the bounds and the time to live of the job store."""
+
+    def setUp(self):
+        """Create a store of two jobs with a controlled clock."""
+        self.now = 0.0
+        self.store = JobStore(2, 10, clock=lambda: self.now)
+
+    def test_ttl(self):
+        """Tests whether finished jobs expire and unfinished jobs are kept."""
+        finished, pending = Job("finished", "bpmntopnml"), Job("pending", "bpmntopnml")
+        self.store.add(finished)
+        self.store.add(pending)
+        finished.finish("result", self.now)
+        self.now = 10
+
+        with self.assertRaises(UnknownJob):
+            self.store.get("finished")
+        self.assertIs(self.store.get("pending"), pending)
+
+    def test_full(self):
+        """Tests whether a full store evicts finished jobs before rejecting jobs."""
+        first, second = Job("first", "bpmntopnml"), Job("second", "bpmntopnml")
+        self.store.add(first)
+        self.store.add(second)
+        second.fail(InvalidInputXML(), self.now)
+        self.store.add(Job("third", "bpmntopnml"))
+
+        self.assertEqual(len(self.store), 2)
+        with self.assertRaises(UnknownJob):
+            self.store.get("second")
+        with self.assertRaises(TooManyJobs):
+            self.store.add(Job("fourth", "bpmntopnml"))
+
+
+class TestSQLiteJobStore(unittest.TestCase):
+    """Tests sharing the jobs of a SQLite store between processes."""
+
+    def setUp(self):
+        """Create a store of two jobs in a temporary file with a controlled clock."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "jobs.sqlite"
+        self.now = 0.0
+        self.store = self.open_store()
+
+    def open_store(self):
+        """Return a new connection to the store (like another worker)."""
+        store = SQLiteJobStore(self.path, 2, 10, clock=lambda: self.now)
+        self.addCleanup(store.close)
+        return store
+
+    def test_shared_updates(self):
+        """Tests whether other connections see the changes of a job."""
+        other = self.open_store()
+        job = Job("job", "bpmntopnml")
+        self.store.add(job)
+        job.start_stage(Stage.Parse)
+        self.assertEqual(other.get("job").state, JobState.Running)
+
+        job.fail(InvalidInputXML(), self.now)
+        failed = other.get("job")
+        self.assertEqual(failed.stages[Stage.Parse].state, JobState.Failed)
+        self.assertEqual(str(failed.error), str(InvalidInputXML()))
+
+    def test_bounds(self):
+        """Tests whether the shared store evicts like the local store."""
+        other = self.open_store()
+        first, second = Job("first", "bpmntopnml"), Job("second", "bpmntopnml")
+        self.store.add(first)
+        other.add(second)
+        second.finish("result", self.now)
+        self.store.add(Job("third", "bpmntopnml"))
+
+        self.assertEqual(len(other), 2)
+        with self.assertRaises(UnknownJob):
+            other.get("second")
+        with self.assertRaises(TooManyJobs):
+            other.add(Job("fourth", "bpmntopnml"))
+        self.now = 10
+        first.finish("result", self.now)
+        self.now = 20
+        with self.assertRaises(UnknownJob):
+            other.get("first")
+
+    def test_orphaned_jobs(self):
+        """Tests whether running jobs of a stopped process fail and are evicted."""
+        process = subprocess.Popen([sys.executable, "-c", ""])
+        process.wait()
+        orphan = Job("orphan", "bpmntopnml", owner=process.pid)
+        self.store.add(orphan)
+        orphan.start_stage(Stage.Parse)
+        self.store.add(Job("running", "bpmntopnml"))
+
+        other = self.open_store()
+        failed = other.get("orphan")
+        self.assertEqual(failed.state, JobState.Failed)
+        self.assertEqual(failed.stages[Stage.Parse].state, JobState.Failed)
+        self.assertEqual(str(failed.error), str(JobInterrupted()))
+        self.assertEqual(other.get("running").state, JobState.Pending)
+        other.add(Job("third", "bpmntopnml"))
+        with self.assertRaises(UnknownJob):
+            other.get("orphan")
+
+
+class TestTransformJobs(unittest.TestCase):
+    """Tests submitting, polling and fetching transformation jobs."""
+
+    def setUp(self):
+        """Use a new job store and load the e2e payload and its transformation."""
+        set_job_store(JobStore(10, 60))
+        self.bpmn = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+        self.expected_pnml = bpmn_to_workflow_net(BPMN.from_xml(self.bpmn)).to_string()
+
+    def tearDown(self):
+        """Reset the job store to the configured one."""
+        set_job_store(None)
+
+    def request(self, path: str, method: str = "GET", data: str | None = None):
+        """Return the response of a request to the job endpoint."""
+        with app.test_request_context(
+            path,
+            method=method,
+            data=data,
+            content_type=None if data is None else "application/xml",
+        ):
+            return app.make_response(transform_jobs(flask.request))
+
+    def test_poll_other_worker(self):
+        """Tests whether a job of a shared store is polled from another process."""
+        with tempfile.TemporaryDirectory() as directory:
+            store_path = str(Path(directory) / "jobs.sqlite")
+            store = SQLiteJobStore(store_path, 10, 60)
+            set_job_store(store)
+            response = self.request("/?direction=bpmntopnml", "POST", self.bpmn)
+            job_id = response.json["id"]
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                status_code, result = executor.submit(
+                    poll_job, store_path, job_id
+                ).result()
+            store.close()
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(get_tokens(result), get_tokens(self.expected_pnml))
+
+    def test_stopped_worker(self):
+        """Tests whether a job of a worker that stopped during the job fails."""
+        with tempfile.TemporaryDirectory() as directory:
+            store_path = str(Path(directory) / "jobs.sqlite")
+            worker = multiprocessing.get_context("spawn").Process(
+                target=abandon_job, args=(store_path, "abandoned")
+            )
+            worker.start()
+            worker.join()
+            store = SQLiteJobStore(store_path, 10, 60)
+            set_job_store(store)
+            status = self.request("/abandoned").json
+            response = self.request("/abandoned/result")
+            store.close()
+
+        self.assertEqual(worker.exitcode, 1)
+        self.assertEqual(status["state"], JobState.Failed.value)
+        self.assertEqual(status["stages"][2]["state"], JobState.Failed.value)
+        self.assertEqual(status["error"], str(JobInterrupted()))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_data(as_text=True), str(JobInterrupted()))
+
+    def run_job(self, model: str):
+        """Submit a job and return its ID and status once it finished."""
+        response = self.request("/?direction=bpmntopnml", "POST", model)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json["id"]
+        self.assertTrue(response.headers["Location"].endswith(f"/{job_id}"))
+        for _ in range(500):
+            status = self.request(f"/{job_id}").json
+            if status["state"] in ("done", "failed"):
+                return job_id, status
+            time.sleep(0.01)
+        self.fail("Job did not finish.")
+
+    def test_job(self):
+        """Tests whether a job reports its stages and returns the transformation."""
+        job_id, status = self.run_job(self.bpmn)
+
+        self.assertEqual(status["progress"], 1)
+        self.assertEqual(
+            [s["name"] for s in status["stages"]], [s.value for s in JOB_STAGES]
+        )
+        self.assertTrue(all(s["state"] == "done" for s in status["stages"]))
+        self.assertEqual(
+            self.request(f"/{job_id}/result").json, {"pnml": self.expected_pnml}
+        )
+        response = self.request(f"/{job_id}/result?format=xml")
+        self.assertEqual(response.get_data(as_text=True), self.expected_pnml)
+
+    def test_failed_job(self):
+        """Tests whether a failed job reports the failed stage and its error."""
+        job_id, status = self.run_job("<definitions>")
+
+        self.assertEqual(status["stages"][0]["state"], JobState.Failed.value)
+        self.assertEqual(status["stages"][1]["state"], JobState.Pending.value)
+        self.assertEqual(status["error"], str(InvalidInputXML()))
+        response = self.request(f"/{job_id}/result")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_data(as_text=True), str(InvalidInputXML()))
+
+    def test_unknown_job(self):
+        """Tests whether unknown jobs are rejected."""
+        for path in ["/unknown", "/unknown/result", "/"]:
+            with self.subTest(path):
+                response = self.request(path)
+                self.assertEqual(response.status_code, 400)
+
+    def test_stage_notifications(self):
+        """Tests whether the transformation reports its stages in order."""
+        recorder = StageRecorder()
+        with observe_stages(recorder):
+            bpmn_to_workflow_net(BPMN.from_xml(self.bpmn))
+
+        self.assertEqual(
+            recorder.events,
+            [
+                ("start", Stage.Preprocess),
+                ("finish", Stage.Preprocess),
+                ("start", Stage.Transform),
+                ("finish", Stage.Transform),
+            ],
+        )
@@ -0,0 +1,277 @@
+"""Unit tests for the rate limiter backends of the transform endpoint."""
+
+import io
+import multiprocessing
+import os
+import threading
+import unittest
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+import flask
+
+from exceptions import NoRequestTokensAvailable, TokenCheckUnsuccessful
+from limiter.bucket import (
+    REFILL_INTERVAL,
+    TOKENS_PER_REFILL,
+    BucketState,
+    InProcessLimiter,
+    Limiter,
+)
+from limiter.firestore import COLLECTION, DOCUMENT, FirestoreLimiter
+from limiter.leasing import LeasingFirestoreLimiter, get_shard_capacity
+from limiter.remote import RemoteLimiter
+from limiter.selection import set_limiter
+from limiter.shared import SharedMemoryLimiter
+from main import post_transform
+from tests.stubs.firestore import InMemoryFirestore
+from tests.stubs.token_server import TokenServer
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        """Initialize the clock with a time."""
+        self.now = now
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+def acquire_many(limiter: Limiter, requests: int, threads: int = 8):
+    """Return the number of allowed requests acquired concurrently."""
+    with ThreadPoolExecutor(threads) as executor:
+        return sum(executor.map(lambda _: limiter.acquire(), range(requests)))
+
+
+def acquire_shared(name: str, requests: int):
+    """Return the number of allowed requests of a shared bucket in a new process."""
+    limiter = SharedMemoryLimiter(name)
+    try:
+        return sum(limiter.acquire() for _ in range(requests))
+    finally:
+        limiter.close()
+
+
+class TestLimiter(unittest.TestCase):
+    """Tests the refill semantics of the backends."""
+
+    def assert_refill_semantics(self, limiter: Limiter, clock: Clock):
+        """Assert the semantics of the checkTokens function for a new bucket."""
+        allowed = [limiter.acquire() for _ in range(TOKENS_PER_REFILL + 2)]
+        # The refill serves the first request without taking a token.
+        self.assertEqual(allowed, [True] * (TOKENS_PER_REFILL + 1) + [False])
+        clock.now += REFILL_INTERVAL - 1
+        self.assertFalse(limiter.acquire())
+        clock.now += 1
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+
+    def test_in_process(self):
+        """Tests the in-process bucket."""
+        clock = Clock()
+        self.assert_refill_semantics(InProcessLimiter(clock=clock), clock)
+        limiter = InProcessLimiter(clock=clock)
+        self.assertEqual(acquire_many(limiter, 150), TOKENS_PER_REFILL + 1)
+
+    def test_shared_memory(self):
+        """Tests whether the bucket is shared by instances and processes."""
+        name = f"test_limiter_{os.getpid()}"
+        clock = Clock()
+        limiter = SharedMemoryLimiter(name, clock=clock)
+        try:
+            self.assert_refill_semantics(limiter, clock)
+        finally:
+            limiter.close(unlink=True)
+
+        limiter = SharedMemoryLimiter(name)
+        try:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(2) as pool:
+                allowed = pool.starmap(acquire_shared, [(name, 60), (name, 60)])
+            self.assertEqual(sum(allowed), TOKENS_PER_REFILL + 1)
+            self.assertEqual(limiter.state.tokens, 0)
+        finally:
+            limiter.close(unlink=True)
+
+    def test_firestore(self):
+        """Tests the Firestore bucket against an in-memory stand-in."""
+        clock = Clock()
+        client = InMemoryFirestore()
+        limiter = FirestoreLimiter(client, client.transactional, clock)
+        self.assert_refill_semantics(limiter, clock)
+
+        document = client.documents[COLLECTION, DOCUMENT]
+        self.assertEqual(document["tokens"], TOKENS_PER_REFILL - 1)
+        self.assertEqual(
+            document["tokens_last_replenished"],
+            datetime.fromtimestamp(clock.now, UTC),
+        )
+
+    def test_firestore_concurrent(self):
+        """Tests whether concurrent requests take each token of the document once."""
+        client = InMemoryFirestore()
+        client.documents[COLLECTION, DOCUMENT] = {
+            "tokens": 50,
+            "tokens_last_replenished": datetime.now(UTC),
+        }
+        limiter = FirestoreLimiter(client, client.transactional)
+        self.assertEqual(acquire_many(limiter, 80), 50)
+        self.assertEqual(client.documents[COLLECTION, DOCUMENT]["tokens"], 0)
+
+
+def get_shard_tokens(client: InMemoryFirestore, shards: int):
+    """Return the remaining tokens of each shard."""
+    return [
+        client.documents.get((COLLECTION, f"{DOCUMENT}-{i}"), {}).get("tokens", 0)
+        for i in range(shards)
+    ]
+
+
+class TestLeasingLimiter(unittest.TestCase):
+    """Tests the leasing of token blocks from sharded counters."""
+
+    def create_limiters(self, count: int, clock: Clock):
+        """Return limiters of several instances sharing an in-memory Firestore."""
+        client = InMemoryFirestore()
+        limiters = [
+            LeasingFirestoreLimiter(client, client.transactional, clock, 3, 10)
+            for _ in range(count)
+        ]
+        return client, limiters
+
+    def test_hourly_budget(self):
+        """Tests whether the instances share the budget with few transactions."""
+        clock = Clock()
+        client, limiters = self.create_limiters(2, clock)
+        allowed = [limiters[i % 2].acquire() for i in range(150)]
+
+        self.assertEqual(sum(allowed), TOKENS_PER_REFILL)
+        self.assertEqual(get_shard_tokens(client, 3), [0, 0, 0])
+        # Four blocks per shard, some reads of empty shards.
+        commits = client.commits
+        self.assertLess(commits, 25)
+        # Empty shards are not read again until the next refill.
+        self.assertFalse(limiters[0].acquire())
+        self.assertEqual(client.commits, commits)
+
+        clock.now += REFILL_INTERVAL
+        self.assertEqual(sum(limiters[0].acquire() for _ in range(150)), 99)
+
+    def test_concurrent(self):
+        """Tests whether concurrent requests of several instances keep the budget."""
+        client, limiters = self.create_limiters(3, Clock())
+        with ThreadPoolExecutor(8) as executor:
+            allowed = executor.map(lambda i: limiters[i % 3].acquire(), range(300))
+            self.assertEqual(sum(allowed), TOKENS_PER_REFILL)
+
+    def test_return_on_close(self):
+        """Tests whether unused tokens are returned unless the shard was refilled."""
+        clock = Clock()
+        client, (limiter,) = self.create_limiters(1, clock)
+        limiter.acquire()
+        capacity = get_shard_capacity(limiter.lease.shard, 3)  # type: ignore
+        limiter.close()
+        self.assertEqual(sum(get_shard_tokens(client, 3)), capacity - 1)
+
+        limiter.acquire()
+        shard = limiter.lease.shard  # type: ignore
+        shard_ref = limiter.get_shard_ref(shard)
+        clock.now += REFILL_INTERVAL
+        shard_ref.set({**shard_ref.get().to_dict(), "tokens": 0})
+        # Refill the shard of the lease from another instance.
+        other = LeasingFirestoreLimiter(client, client.transactional, clock, 3, 100)
+        other._next_shard = shard
+        other.acquire()
+        tokens = get_shard_tokens(client, 3)
+        limiter.close()
+        self.assertEqual(get_shard_tokens(client, 3), tokens)
+
+
+class TestPostTransformLimit(unittest.TestCase):
+    """Tests the rate limit of the transform endpoint."""
+
+    def tearDown(self):
+        """Reset the limiter to the configured backend."""
+        set_limiter(None)
+
+    def test_no_tokens(self):
+        """Tests whether requests are rejected while the bucket is empty."""
+        set_limiter(InProcessLimiter(BucketState(0, 0.0), clock=lambda: 1.0))
+        with flask.Flask(__name__).test_request_context(
+            "/?direction=bpmntopnml", method="POST"
+        ):
+            response, status = post_transform(flask.request)
+        self.assertEqual(status, 400)
+        self.assertEqual(response, str(NoRequestTokensAvailable()))
+
+
+class ReadSignalingStream(io.BytesIO):
+    """Stream that sets an event once it was read completely."""
+
+    def __init__(self, data: bytes, event: threading.Event):
+        """Initialize the stream with its data and the event."""
+        super().__init__(data)
+        self.event = event
+
+    def readinto(self, buffer):  # type: ignore
+        """Read from the stream and set the event at its end."""
+        size = super().readinto(buffer)
+        if self.tell() == len(self.getbuffer()):
+            self.event.set()
+        return size
+
+
+class TestRemoteTokenCheck(unittest.TestCase):
+    """Tests the token check by requests to a local checkTokens stand-in."""
+
+    def setUp(self):
+        """Start the stand-in and use it as limiter."""
+        self.server = TokenServer()
+        self.limiter = RemoteLimiter(self.server.url)
+        set_limiter(self.limiter)
+        self.bpmn = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_bytes()
+
+    def tearDown(self):
+        """Stop the stand-in and reset the limiter."""
+        set_limiter(None)
+        self.limiter.close()
+        self.server.close()
+
+    def post(self, data: bytes):
+        """Return the response and status of a raw bpmn to pnml request."""
+        self.server.release.clear()
+        with flask.Flask(__name__).test_request_context(
+            "/?direction=bpmntopnml",
+            method="POST",
+            input_stream=ReadSignalingStream(data, self.server.release),
+            content_type="application/xml",
+            content_length=len(data),
+        ):
+            response = post_transform(flask.request)
+        if isinstance(response, tuple):
+            return response
+        return response.get_data(as_text=True), response.status_code
+
+    def test_overlap_with_parsing(self):
+        """Tests whether the check is pending while the model is parsed."""
+        for _ in range(3):
+            _, status = self.post(self.bpmn)
+            self.assertEqual(status, 200)
+        # The stand-in responds only after the model was read by the parser.
+        self.assertEqual(self.server.released, [True] * 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_failed_check(self):
+        """Tests whether errors of the check take precedence over the model."""
+        for status, exception in [
+            (429, NoRequestTokensAvailable()),
+            (400, TokenCheckUnsuccessful()),
+        ]:
+            self.server.status = status
+            for data in [self.bpmn, b"<invalid"]:
+                with self.subTest(status=status, data=data[:10]):
+                    self.assertEqual(self.post(data), (str(exception), 400))
@@ -0,0 +1,88 @@
+"""Unit tests for the transform endpoint."""
+
+import unittest
+from pathlib import Path
+
+import flask
+
+from main import post_transform
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+
+app = flask.Flask(__name__)
+
+
+class TestPostTransform(unittest.TestCase):
+    """Tests the request and response formats of the transform endpoint."""
+
+    def setUp(self):
+        """Load the e2e payload and its expected transformation."""
+        self.bpmn = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+        self.expected_pnml = bpmn_to_workflow_net(BPMN.from_xml(self.bpmn)).to_string()
+
+    def post(
+        self,
+        query: str,
+        headers: dict[str, str] | None = None,
+        data: dict[str, str] | bytes | None = None,
+        content_type: str | None = None,
+    ):
+        """Return the response of a bpmn to pnml transformation request."""
+        with app.test_request_context(
+            f"/?direction=bpmntopnml{query}",
+            method="POST",
+            data={"bpmn": self.bpmn} if data is None else data,
+            headers=headers,
+            content_type=content_type,
+        ):
+            return app.make_response(post_transform(flask.request))
+
+    def test_json_response(self):
+        """Tests whether JSON stays the default response."""
+        for headers in [None, {"Accept": "*/*"}, {"Accept": "application/json"}]:
+            with self.subTest(headers):
+                response = self.post("", headers)
+                self.assertEqual(response.mimetype, "application/json")
+                self.assertEqual(response.json, {"pnml": self.expected_pnml})
+
+    def test_xml_stream_response(self):
+        """Tests whether the XML is streamed by query parameter or Accept header."""
+        for query, headers in [
+            ("&format=xml", None),
+            ("", {"Accept": "application/xml"}),
+            ("", {"Accept": "text/xml, application/json;q=0.5"}),
+        ]:
+            with self.subTest(query=query, headers=headers):
+                response = self.post(query, headers)
+                self.assertTrue(response.is_streamed)
+                self.assertEqual(response.mimetype, "application/xml")
+                self.assertEqual(response.get_data(as_text=True), self.expected_pnml)
+
+    def test_invalid_format(self):
+        """Tests whether an unknown response format is rejected."""
+        response = self.post("&format=yaml")
+        self.assertEqual(response.status_code, 400)
+
+    def test_raw_xml_body(self):
+        """Tests whether raw XML bodies are accepted besides the form field."""
+        for content_type in ["application/xml", "application/octet-stream"]:
+            with self.subTest(content_type):
+                response = self.post(
+                    "", data=self.bpmn.encode(), content_type=content_type
+                )
+                self.assertEqual(response.json, {"pnml": self.expected_pnml})
+
+    def test_raw_pnml_body(self):
+        """Tests whether a raw PNML body is transformed like the form field."""
+        pnml = self.expected_pnml.encode()
+        responses = []
+        for data, content_type in [(pnml, "application/xml"), ({"pnml": pnml}, None)]:
+            with app.test_request_context(
+                "/?direction=pnmltobpmn",
+                method="POST",
+                data=data,
+                content_type=content_type,
+            ):
+                responses.append(app.make_response(post_transform(flask.request)))
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].json, responses[1].json)
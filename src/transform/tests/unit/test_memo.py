@@ -0,0 +1,70 @@
+"""Unit tests for the memoization of transformed subprocesses and pages."""
+
+import pickle
+import unittest
+
+from tests.unit.test_parallel import create_hierarchy, create_subprocess, get_tokens
+
+from transformer.models.pnml.pnml import Pnml
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
+from transformer.utility.memo import (
+    MemoStats,
+    SubprocessMemo,
+    create_memo_key,
+    subprocess_memo,
+)
+
+
+def transform():
+    """Transform the hierarchy to a net and back, return both XML strings."""
+    pnml_xml = bpmn_to_workflow_net(create_hierarchy()).to_string()
+    bpmn_xml = pnml_to_bpmn(Pnml.from_xml_str(pnml_xml)).to_string()
+    return pnml_xml, bpmn_xml
+
+
+class TestSubprocessMemo(unittest.TestCase):
+    """Tests the lookup, keys and eviction of memoized results."""
+
+    def test_identical_output(self):
+        """Tests whether memoized results equal the transformation without memo."""
+        with subprocess_memo(None):
+            expected = transform()
+        memo = SubprocessMemo(10_000_000)
+        with subprocess_memo(memo):
+            first = transform()
+            misses = memo.stats.misses
+            second = transform()
+
+        # Three sibling subprocesses per direction, nested ones are part of them.
+        self.assertEqual(memo.stats, MemoStats(hits=6, misses=misses))
+        for result in first, second:
+            for xml, expected_xml in zip(result, expected):
+                self.assertEqual(get_tokens(xml), get_tokens(expected_xml))
+
+    def test_key_context(self):
+        """Tests whether the key depends on the model and the context."""
+        key = create_memo_key(create_subprocess("sub", []), "in", "out")
+
+        self.assertEqual(key, create_memo_key(create_subprocess("sub", []), "in", "out"))
+        self.assertNotEqual(key, create_memo_key(create_subprocess("sub", []), "in"))
+        self.assertNotEqual(
+            key, create_memo_key(create_subprocess("other", []), "in", "out")
+        )
+
+    def test_eviction(self):
+        """Tests whether the least recently used results are evicted by size."""
+        size = len(pickle.dumps(["a"] * 10))
+        memo = SubprocessMemo(2 * size)
+        memo.put("a", ["a"] * 10)
+        memo.put("b", ["b"] * 10)
+        memo.get("a")
+        memo.put("c", ["c"] * 10)
+
+        self.assertEqual(memo.get("a"), ["a"] * 10)
+        self.assertIsNone(memo.get("b"))
+        self.assertEqual(memo.get("c"), ["c"] * 10)
+        self.assertEqual(memo.size, 2 * size)
+
+        result = memo.get("a")
+        self.assertIsNot(result, memo.get("a"))
@@ -0,0 +1,72 @@
+"""Unit tests for merging event triggers with their following transition."""
+
+import unittest
+
+from transformer.models.pnml.pnml import Net, Place, Transition
+from transformer.transform_bpmn_to_petrinet.transform import merge_single_triggers
+
+
+def create_net(*arcs: str):
+    """Create a net from arcs like "p1 t1" (element type by first letter)."""
+    net = Net(id="net")
+    for arc in arcs:
+        source, target = (
+            net.get_node_or_none(id)
+            or net.add_element((Place if id[0] == "p" else Transition).create(id=id))
+            for id in arc.split()
+        )
+        net.add_arc(source, target)
+    return net
+
+
+def get_arcs(net: Net):
+    """Return the arcs of a net as (ID, source, target)."""
+    return sorted(arc.get_key() for arc in net.arcs)
+
+
+class TestMergeSingleTriggers(unittest.TestCase):
+    """Tests the merge of triggers with the transition after them."""
+
+    def test_merge(self):
+        """Tests whether the incoming arc of a trigger is reconnected in place."""
+        net = create_net("p0 time", "time p1", "p1 t1", "t1 p2")
+        net.get_element("time").mark_as_workflow_time()
+        (arc,) = net.get_incoming("time")
+        merge_single_triggers(net)
+
+        self.assertIsNone(net.get_node_or_none("time"))
+        self.assertIsNone(net.get_node_or_none("p1"))
+        self.assertTrue(net.get_element("t1").is_workflow_time())
+        self.assertEqual(
+            net.workflow_index.get_event_triggers(), [net.get_element("t1")]
+        )
+        self.assertEqual(net.get_incoming("t1"), [arc])
+        self.assertEqual(get_arcs(net), [("p0TOt1", "p0", "t1"), ("t1TOp2", "t1", "p2")])
+
+    def test_skip(self):
+        """Tests whether triggers before joins and other triggers are not merged."""
+        join = create_net("p0 time", "time p1", "p1 t1", "p2 t1")
+        join.get_element("time").mark_as_workflow_time()
+        chained = create_net("p0 time", "time p1", "p1 message", "message p2")
+        chained.get_element("time").mark_as_workflow_time()
+        chained.get_element("message").mark_as_workflow_message()
+        for net in join, chained:
+            arcs = get_arcs(net)
+            merge_single_triggers(net)
+            self.assertEqual(get_arcs(net), arcs)
+
+    def test_long_sequence(self):
+        """Tests whether many triggers are merged with their following transition."""
+        triggers = 2000
+        arcs = []
+        for i in range(triggers):
+            arcs += [f"p{i}a trigger{i}", f"trigger{i} p{i}b", f"p{i}b t{i}"]
+            arcs.append(f"t{i} p{i + 1}a")
+        net = create_net(*arcs)
+        for i in range(triggers):
+            net.get_element(f"trigger{i}").mark_as_workflow_message()
+        merge_single_triggers(net)
+
+        self.assertEqual(len(net.transitions), triggers)
+        self.assertEqual(len(net.workflow_index.get_event_triggers()), triggers)
+        self.assertEqual(len(net.arcs), 2 * triggers)
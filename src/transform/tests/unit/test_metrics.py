@@ -0,0 +1,192 @@
+"""Unit tests for the metrics of the transformations."""
+
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import flask
+from tests.unit.test_parallel import create_hierarchy
+
+from exceptions import InvalidInputXML
+from main import get_metrics, post_transform
+from metrics.registry import CallbackCounter, Counter, Histogram, MetricsRegistry
+from metrics.transformation import (
+    ERRORS,
+    MODEL_ARCS,
+    MODEL_BYTES,
+    MODEL_NODES,
+    PASS_SECONDS,
+    STAGE_SECONDS,
+    count_model,
+    get_text_size,
+)
+from result_cache.cache import ResultCache, set_result_cache
+from result_cache.stores import MemoryStore
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.transform_bpmn_to_petrinet.transform import (
+    PREPROCESSING_PASSES,
+    bpmn_to_workflow_net,
+)
+from transformer.utility.memo import subprocess_memo
+from transformer.utility.stages import Stage
+
+app = flask.Flask(__name__)
+
+
+def get_pass_count(direction: str):
+    """Return the number of recorded runs of the BPMN preprocessing passes."""
+    return sum(PASS_SECONDS.get_count(direction, p.name) for p in PREPROCESSING_PASSES)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Tests the text format of counters and histograms."""
+
+    def test_render(self):
+        """Tests whether the samples are rendered with cumulative buckets."""
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("errors", "Errors.", ("exception",)))
+        histogram = registry.register(
+            Histogram("seconds", "Seconds.", ("stage",), [0.5, 1])
+        )
+        registry.register(
+            CallbackCounter("lookups", "Lookups.", ("result",), lambda: [(("hit",), 3)])
+        )
+        counter.inc('a"b')
+        counter.inc('a"b')
+        for value in 0.25, 1, 2:
+            histogram.observe(value, "parse")
+
+        self.assertEqual(
+            registry.render().splitlines(),
+            [
+                "# HELP errors Errors.",
+                "# TYPE errors counter",
+                'errors{exception="a\\"b"} 2',
+                "# HELP seconds Seconds.",
+                "# TYPE seconds histogram",
+                'seconds_bucket{stage="parse",le="0.5"} 1',
+                'seconds_bucket{stage="parse",le="1"} 2',
+                'seconds_bucket{stage="parse",le="+Inf"} 3',
+                'seconds_sum{stage="parse"} 3.25',
+                'seconds_count{stage="parse"} 3',
+                "# HELP lookups Lookups.",
+                "# TYPE lookups counter",
+                'lookups{result="hit"} 3',
+            ],
+        )
+
+
+class TestTransformationMetrics(unittest.TestCase):
+    """Tests the metrics recorded by the transform endpoint."""
+
+    def setUp(self):
+        """Enable metrics, disable the result cache and load the e2e payload."""
+        patcher = mock.patch.dict(
+            os.environ, {"METRICS": "true", "RESULT_CACHE_BYTES": "0"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        set_result_cache(None)
+        self.addCleanup(set_result_cache, None)
+        self.bpmn = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+
+    def post(self, model: str, query: str = "direction=bpmntopnml"):
+        """Return the response of a transformation of a raw XML model."""
+        with app.test_request_context(
+            f"/?{query}", method="POST", data=model, content_type="application/xml"
+        ):
+            response = app.make_response(post_transform(flask.request))
+            response.get_data()
+            return response
+
+    def test_transformation(self):
+        """Tests whether a transformation records its stages, passes and models."""
+        direction = "bpmntopnml"
+        stages = [Stage.Parse, Stage.Preprocess, Stage.Transform, Stage.Serialize]
+        before = [STAGE_SECONDS.get_count(direction, s.value) for s in stages]
+        passes = get_pass_count(direction)
+        sizes = [MODEL_BYTES.get_count(direction, s) for s in ["input", "output"]]
+        # The e2e payload has no gateways, so its preprocessing passes are skipped.
+        with subprocess_memo(None):
+            model = create_hierarchy().to_string()
+            response = self.post(model, f"direction={direction}&format=xml")
+
+        self.assertEqual(response.status_code, 200)
+        for stage, count in zip(stages, before):
+            self.assertEqual(STAGE_SECONDS.get_count(direction, stage.value), count + 1)
+        self.assertGreater(get_pass_count(direction), passes)
+        self.assertEqual(
+            [MODEL_BYTES.get_count(direction, s) for s in ["input", "output"]],
+            [count + 1 for count in sizes],
+        )
+
+        response = self.post(response.get_data(as_text=True), "direction=pnmltobpmn")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(
+            STAGE_SECONDS.get_count("pnmltobpmn", Stage.SetGraphics.value), 0
+        )
+        for histogram in MODEL_NODES, MODEL_ARCS:
+            self.assertGreater(histogram.get_count("pnmltobpmn", "output"), 0)
+
+    def test_errors(self):
+        """Tests whether failed requests are counted by exception class."""
+        errors = ERRORS.get(InvalidInputXML.__name__)
+        response = self.post("<definitions>")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ERRORS.get(InvalidInputXML.__name__), errors + 1)
+
+    def test_scrape(self):
+        """Tests whether the endpoint returns the recorded metrics as text."""
+        self.post(self.bpmn)
+        with app.test_request_context("/metrics"):
+            response = app.make_response(get_metrics(flask.request))
+
+        self.assertEqual(response.mimetype, "text/plain")
+        text = response.get_data(as_text=True)
+        for name in [
+            'transformer_stage_seconds_count{direction="bpmntopnml",stage="parse"}',
+            "# TYPE transformer_model_bytes histogram",
+            "# TYPE transformer_errors_total counter",
+        ]:
+            self.assertIn(name, text)
+
+    def test_cache_lookups(self):
+        """Tests whether the lookups of the result cache are scraped."""
+        set_result_cache(ResultCache(MemoryStore(1024 * 1024)))
+        for _ in range(2):
+            self.post(self.bpmn)
+        with app.test_request_context("/metrics"):
+            text = get_metrics(flask.request).get_data(as_text=True)
+
+        for result, count in [("memory_hit", 1), ("disk_hit", 0), ("miss", 1)]:
+            self.assertIn(
+                f'transformer_result_cache_lookups_total{{result="{result}"}} {count}',
+                text,
+            )
+
+    def test_count_model(self):
+        """Tests whether the nodes and arcs of subprocesses and pages are counted."""
+        bpmn = BPMN.from_xml(self.bpmn)
+        pnml = bpmn_to_workflow_net(BPMN.from_xml(self.bpmn))
+
+        for model, process in [(bpmn, bpmn.process), (pnml, pnml.net)]:
+            nodes, arcs = count_model(model)
+            self.assertEqual(process.graph.node_count, len(process.graph.node_view()))
+            self.assertGreaterEqual(nodes, process.graph.node_count)
+            self.assertGreater(arcs, 0)
+
+    def test_text_size(self):
+        """Tests whether text sizes are UTF-8 byte sizes."""
+        for text in ["<task name='a'/>", "<task name='ä€'/>", ""]:
+            with self.subTest(text):
+                self.assertEqual(get_text_size(text), len(text.encode()))
+
+    def test_disabled(self):
+        """Tests whether no metrics are recorded if they are disabled."""
+        count = STAGE_SECONDS.get_count("bpmntopnml", Stage.Parse.value)
+        with mock.patch.dict(os.environ, {"METRICS": "false"}):
+            self.post(self.bpmn)
+
+        self.assertEqual(STAGE_SECONDS.get_count("bpmntopnml", Stage.Parse.value), count)
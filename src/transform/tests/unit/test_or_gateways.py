@@ -0,0 +1,98 @@
+"""Unit tests for the matching of OR-splits and OR-joins."""
+
+import unittest
+
+from exceptions import ORGatewayDetectionIssue
+from transformer.models.bpmn.base import GenericBPMNNode
+from transformer.models.bpmn.bpmn import (
+    EndEvent,
+    OrGateway,
+    Process,
+    StartEvent,
+    Task,
+    XorGateway,
+)
+from transformer.transform_bpmn_to_petrinet.preprocess_bpmn.or_gateways import (
+    find_matching_gateways,
+)
+
+node_types: dict[str, type[GenericBPMNNode]] = {
+    "s": StartEvent,
+    "e": EndEvent,
+    "t": Task,
+    "o": OrGateway,
+    "x": XorGateway,
+}
+
+
+def create_process(*flows: str):
+    """Create a process from flows like "o1 t1" (node type by first letter)."""
+    process = Process(id="process")
+    nodes: dict[str, GenericBPMNNode] = {}
+    for flow in flows:
+        source, target = (
+            nodes.setdefault(id, node_types[id[0]](id=id)) for id in flow.split()
+        )
+        process.add_flow(source, target)
+    return process
+
+
+def get_matches(process: Process):
+    """Return the matched (split, join, outgoing split flow, incoming join flow)."""
+    gateways = process.get_nodes_by_type(OrGateway)
+    return sorted(
+        (m.split.id, m.join.id, m.flow_out_split.id, m.flow_in_join.id)
+        for m in find_matching_gateways(process, gateways)
+    )
+
+
+class TestMatchingGateways(unittest.TestCase):
+    """Tests the matching of OR-split branches with their OR-join."""
+
+    def test_nested(self):
+        """Tests whether inner OR-blocks are skipped on a branch."""
+        process = create_process(
+            "s o1", "o1 t1", "o1 o3", "o3 t3", "o3 t4", "t3 o4", "t4 o4", "o4 o2",
+            "t1 o2", "o2 e",
+        )  # fmt: skip
+        self.assertEqual(
+            get_matches(process),
+            [
+                ("o1", "o2", "o1TOo3", "o4TOo2"),
+                ("o1", "o2", "o1TOt1", "t1TOo2"),
+                ("o3", "o4", "o3TOt3", "t3TOo4"),
+                ("o3", "o4", "o3TOt4", "t4TOo4"),
+            ],
+        )
+
+    def test_loops(self):
+        """Tests whether structured loops inside and around OR-blocks are matched."""
+        inner_loop = create_process(
+            "s o1", "o1 x1", "x1 t1", "t1 x2", "x2 x1", "x2 o2", "o1 t2", "t2 o2",
+            "o2 e",
+        )  # fmt: skip
+        self.assertEqual(
+            get_matches(inner_loop),
+            [("o1", "o2", "o1TOt2", "t2TOo2"), ("o1", "o2", "o1TOx1", "x2TOo2")],
+        )
+        outer_loop = create_process(
+            "s x1", "x1 o1", "o1 t1", "o1 t2", "t1 o2", "t2 o2", "o2 x2", "x2 x1",
+            "x2 e",
+        )  # fmt: skip
+        self.assertEqual(len(get_matches(outer_loop)), 2)
+
+    def test_unmatched_split(self):
+        """Tests whether a split without join is rejected."""
+        process = create_process("s o1", "o1 e1", "o1 e2")
+        with self.assertRaises(ORGatewayDetectionIssue):
+            get_matches(process)
+
+    def test_long_sequence(self):
+        """Tests whether long sequences of OR-blocks are matched without recursion."""
+        blocks = 2000
+        flows = ["s o0"]
+        for i in range(blocks):
+            flows += [f"o{i} t{i}", f"o{i} o{i + 1}", f"t{i} o{i + 1}"]
+        flows.append(f"o{blocks} e")
+        matches = get_matches(create_process(*flows))
+        self.assertEqual(len(matches), 2 * blocks)
@@ -0,0 +1,108 @@
+"""Unit tests for the parallel transformation of subprocesses and pages."""
+
+import re
+import unittest
+
+from tests.testgeneration.bpmn.utility import create_bpmn
+
+from exceptions import ORGatewayDetectionIssue
+from transformer.equality.bpmn import compare_bpmn
+from transformer.equality.petrinet import compare_pnml
+from transformer.models.bpmn.base import GenericBPMNNode
+from transformer.models.bpmn.bpmn import (
+    BPMN,
+    EndEvent,
+    OrGateway,
+    StartEvent,
+    Task,
+)
+from transformer.models.pnml.pnml import Pnml
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
+from transformer.utility.memo import subprocess_memo
+from transformer.utility.parallel import subprocess_workers
+from transformer.utility.passes import PassStats
+
+
+def create_subprocess(id: str, children: list[GenericBPMNNode]):
+    """Create a subprocess with an OR-block, children are on the second branch."""
+    if not children:
+        children = [Task(id=f"{id}_other", name="other")]
+    split, join = OrGateway(id=f"{id}_split"), OrGateway(id=f"{id}_join")
+    bpmn = create_bpmn(
+        id,
+        [
+            [
+                StartEvent(id=f"{id}_start"),
+                split,
+                Task(id=f"{id}_task", name="task"),
+                join,
+                EndEvent(id=f"{id}_end"),
+            ],
+            [split, *children, join],
+        ],
+    )
+    bpmn.process.isExecutable = False
+    return bpmn.process
+
+
+def create_hierarchy(join_last: bool = True):
+    """Create a BPMN with three sibling subprocesses, the first with two children."""
+    children = [create_subprocess(f"child{i}", []) for i in range(2)]
+    subprocesses = [
+        create_subprocess("sub0", children),
+        create_subprocess("sub1", []),
+        create_subprocess("sub2", []),
+    ]
+    if not join_last:
+        last = subprocesses[-1]
+        last.remove_node_with_connecting_flows(last.get_node("sub2_join"))
+        last.add_flow(last.get_node("sub2_task"), EndEvent(id="sub2_end2"))
+    nodes: list[GenericBPMNNode] = [StartEvent(id="start"), *subprocesses]
+    return create_bpmn("process", [[*nodes, EndEvent(id="end")]])
+
+
+def get_tokens(xml: str):
+    """Return the sorted tokens of a XML string (independent of the set order)."""
+    return sorted(re.findall(r"[^\s<>]+", xml))
+
+
+def get_summary(stats: list[PassStats]):
+    """Return the sorted (pass name, model ID, skipped) of statistics."""
+    return sorted((s.name, s.model_id or "", s.skipped) for s in stats)
+
+
+class TestParallelTransformation(unittest.TestCase):
+    """Tests whether the parallel transformation equals the sequential one."""
+
+    def transform(self, workers: int, bpmn: BPMN):
+        """Transform a BPMN to a net and back with a number of workers."""
+        bpmn_stats: list[PassStats] = []
+        pnml_stats: list[PassStats] = []
+        with subprocess_workers(workers), subprocess_memo(None):
+            pnml = bpmn_to_workflow_net(bpmn, bpmn_stats)
+            pnml_xml = pnml.to_string()
+            bpmn = pnml_to_bpmn(Pnml.from_xml_str(pnml_xml), pnml_stats)
+        return pnml, bpmn, bpmn_stats, pnml_stats
+
+    def test_identical_output(self):
+        """Tests whether both directions produce identical models and statistics."""
+        sequential = self.transform(0, create_hierarchy())
+        parallel = self.transform(2, create_hierarchy())
+
+        self.assertEqual(len(sequential[0].net.pages), 3)
+        self.assertTrue(*compare_pnml(sequential[0].net, parallel[0].net))
+        self.assertEqual(
+            get_tokens(sequential[0].to_string()), get_tokens(parallel[0].to_string())
+        )
+        self.assertTrue(*compare_bpmn(sequential[1], parallel[1]))
+        self.assertEqual(
+            get_tokens(sequential[1].to_string()), get_tokens(parallel[1].to_string())
+        )
+        for sequential_stats, parallel_stats in zip(sequential[2:], parallel[2:]):
+            self.assertEqual(get_summary(sequential_stats), get_summary(parallel_stats))
+
+    def test_worker_exception(self):
+        """Tests whether known exceptions of the workers are raised."""
+        with subprocess_workers(2), self.assertRaises(ORGatewayDetectionIssue):
+            bpmn_to_workflow_net(create_hierarchy(join_last=False))
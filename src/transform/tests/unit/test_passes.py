@@ -0,0 +1,92 @@
+"""Unit tests for the preprocessing pass manager."""
+
+import unittest
+
+from transformer.models.bpmn.bpmn import OrGateway, Process, Task
+from transformer.models.pnml.pnml import Net, Place, Pnml, Transition
+from transformer.transform_bpmn_to_petrinet.transform import (
+    PREPROCESSING_PASSES,
+    apply_preprocessing,
+)
+from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
+from transformer.utility.memo import subprocess_memo
+from transformer.utility.passes import Pass, PassModel, PassStats, run_passes
+
+LIST_PASS_MODEL: PassModel[list[int], int] = PassModel(
+    get_id=lambda model: None,
+    get_children=lambda model: [],
+    get_elements=lambda model: model,
+    count=lambda model: (len(model), 0),
+)
+
+
+def get_runs(stats: list[PassStats]):
+    """Return the (pass name, model ID) of the passes that were not skipped."""
+    return [(s.name, s.model_id) for s in stats if not s.skipped]
+
+
+class TestRunPasses(unittest.TestCase):
+    """Tests the skipping, input detection and statistics of passes."""
+
+    def test_fused_element_inputs(self):
+        """Tests whether element inputs of consecutive passes share a traversal."""
+        visited: list[int] = []
+
+        def needs_odd(model: list[int], element: int):
+            visited.append(element)
+            return element % 2 == 1
+
+        def append_odd(model: list[int]):
+            model.append(3)
+
+        def append_even(model: list[int]):
+            model.append(4)
+
+        model = [2, 4, 6]
+        passes: list[Pass[list[int], int]] = [
+            Pass(append_odd, needs_element=needs_odd),
+            Pass(append_odd, needs_element=needs_odd),
+            Pass(append_even, needs=lambda model: True),
+        ]
+        stats = run_passes(model, passes, LIST_PASS_MODEL)
+
+        self.assertEqual(visited, [2, 2, 4, 4, 6, 6])
+        self.assertEqual(model, [2, 4, 6, 4])
+        self.assertEqual([s.skipped for s in stats], [True, True, False])
+        self.assertEqual(stats[2].elements_delta, 1)
+
+    def test_pnml_to_bpmn(self):
+        """Tests whether only passes with inputs run on the net and its pages."""
+        net = Net(id="net")
+        source = net.add_element(Transition.create(id="source"))
+        net.add_arc(source, net.add_element(Place.create(id="sink")))
+        stats: list[PassStats] = []
+        pnml_to_bpmn(Pnml(net=net), stats)
+
+        self.assertEqual(
+            get_runs(stats), [("add_places_at_dangling_transitions", "net")]
+        )
+        self.assertEqual((stats[0].elements_delta, stats[0].connections_delta), (1, 1))
+        self.assertEqual(len(stats), 4)
+
+    def test_bpmn_to_pnml(self):
+        """Tests whether passes run for the OR gateways of a subprocess only."""
+        process = Process(id="process")
+        subprocess = process.add_node(Process(id="subprocess"))
+        split, join = OrGateway(id="split"), OrGateway(id="join")
+        for i in range(2):
+            task = Task(id=f"task{i}", name=f"task{i}")
+            subprocess.add_flow(split, task)
+            subprocess.add_flow(task, join)
+        with subprocess_memo(None):
+            stats = apply_preprocessing(process, PREPROCESSING_PASSES)
+
+        self.assertEqual(
+            get_runs(stats),
+            [
+                ("replace_inclusive_gateways", "subprocess"),
+                ("preprocess_gateways", "subprocess"),
+                ("insert_temp_between_adjacent_mapped_transition", "subprocess"),
+                ("insert_temp_between_adjacent_mapped_transition", "process"),
+            ],
+        )
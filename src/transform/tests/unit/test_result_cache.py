@@ -0,0 +1,124 @@
+"""Unit tests for the cache of transformation results."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import flask
+
+from main import post_transform
+from result_cache.cache import (
+    CacheStats,
+    ResultCache,
+    create_cache_key,
+    create_result_cache,
+    set_result_cache,
+)
+from result_cache.stores import DirectoryStore, MemoryStore, SQLiteStore
+
+app = flask.Flask(__name__)
+
+
+class TestStores(unittest.TestCase):
+    """Tests the memory and disk tiers."""
+
+    def test_memory_lru(self):
+        """Tests whether the least recently used entries are evicted by size."""
+        store = MemoryStore(10)
+        store.put("a", b"aaaa")
+        store.put("b", b"bbbb")
+        store.get("a")
+        store.put("c", b"cccc")
+        store.put("d", b"d" * 11)
+
+        self.assertEqual((store.get("a"), store.get("b")), (b"aaaa", None))
+        self.assertIsNone(store.get("d"))
+        self.assertEqual((len(store), store.size), (2, 8))
+
+    def test_disk_stores(self):
+        """Tests whether the disk stores keep their entries between instances."""
+        with tempfile.TemporaryDirectory() as directory:
+            for create_store in [
+                lambda: DirectoryStore(Path(directory, "results")),
+                lambda: SQLiteStore(Path(directory, "results.sqlite")),
+            ]:
+                store = create_store()
+                store.put("key", b"value")
+                store.put("key", b"other")
+                self.assertIsNone(store.get("missing"))
+                self.assertEqual(create_store().get("key"), b"other")
+
+
+class TestResultCache(unittest.TestCase):
+    """Tests the keys and tiers of the cache and the cached endpoint."""
+
+    def setUp(self):
+        """Use a new cache for each test."""
+        self.cache = ResultCache(MemoryStore(1024 * 1024))
+        set_result_cache(self.cache)
+        self.bpmn = Path("tests/assets/diagrams/bpmn/e2e_payload.xml").read_text()
+
+    def tearDown(self):
+        """Reset the cache to the configured one."""
+        set_result_cache(None)
+
+    def post(self, data: dict[str, str] | bytes, content_type: str | None = None):
+        """Return the response of a bpmn to pnml transformation request."""
+        with app.test_request_context(
+            "/?direction=bpmntopnml",
+            method="POST",
+            data=data,
+            content_type=content_type,
+        ):
+            return app.make_response(post_transform(flask.request))
+
+    def test_cache_key(self):
+        """Tests whether the key depends on the direction and normalized content."""
+        key = create_cache_key("bpmntopnml", "<a/>\n")
+        self.assertEqual(create_cache_key("bpmntopnml", b"<a/>\r\n  "), key)
+        self.assertNotEqual(create_cache_key("pnmltobpmn", "<a/>"), key)
+        self.assertNotEqual(create_cache_key("bpmntopnml", "<b/>"), key)
+
+    def test_disk_tier(self):
+        """Tests whether results of the disk tier are moved into memory."""
+        with tempfile.TemporaryDirectory() as directory:
+            disk = DirectoryStore(directory)
+            disk.put("key", b"result")
+            cache = ResultCache(MemoryStore(100), disk)
+            self.assertEqual([cache.get("key"), cache.get("key")], ["result"] * 2)
+            self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.stats, CacheStats(hits=2, disk_hits=1, misses=1))
+
+    def test_disabled_by_default(self):
+        """Tests whether the cache is only created if its size is configured."""
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIsNone(create_result_cache())
+        with mock.patch.dict(os.environ, {"RESULT_CACHE_BYTES": "100"}):
+            self.assertIsNotNone(create_result_cache())
+
+    def test_large_results_not_buffered(self):
+        """Tests whether results larger than the memory tier are streamed only."""
+        cache = ResultCache(MemoryStore(10))
+        chunks = ["<pnml>", "<net/>", "</pnml>"]
+        self.assertEqual(list(cache.iter_and_put("large", iter(chunks))), chunks)
+        self.assertEqual(list(cache.iter_and_put("small", iter(["<a/>"]))), ["<a/>"])
+
+        self.assertIsNone(cache.get("large"))
+        self.assertEqual(cache.get("small"), "<a/>")
+
+    def test_identical_requests(self):
+        """Tests whether raw and form requests of the same model share the result."""
+        first = self.post({"bpmn": self.bpmn})
+        second = self.post(self.bpmn.encode(), "application/xml")
+
+        self.assertEqual(first.json, second.json)
+        self.assertEqual(self.cache.stats, CacheStats(hits=1, misses=1))
+
+    def test_served_without_parsing(self):
+        """Tests whether a cached result is returned without parsing the model."""
+        invalid = b"<invalid"
+        self.cache.put(create_cache_key("bpmntopnml", invalid), "<pnml/>")
+        response = self.post(invalid, "application/xml")
+        self.assertEqual(response.json, {"pnml": "<pnml/>"})
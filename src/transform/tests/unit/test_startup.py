@@ -0,0 +1,17 @@
+"""Unit tests for the lazy imports of the transform endpoint."""
+
+import unittest
+
+from tests.benchmark.startup import measure
+
+
+class TestStartup(unittest.TestCase):
+    """Tests the lazy imports of the endpoint.
+
+    The startup times depend on the machine, their budgets are checked by the
+    benchmark (see `tests.benchmark.startup`).
+    """
+
+    def test_lazy_transformer(self):
+        """Tests whether the endpoint is imported without the transformer."""
+        self.assertFalse(measure().is_transformer_imported)
@@ -0,0 +1,22 @@
+"""Unit tests for the warm-up of the transformer."""
+
+import unittest
+
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.utility import parallel
+from transformer.utility.parallel import subprocess_workers
+from transformer.utility.warmup import warm_up
+
+
+class TestWarmUp(unittest.TestCase):
+    """Tests the round trip of the warm-up diagram."""
+
+    def test_round_trip(self):
+        """Tests whether the diagram is transformed without starting a pool."""
+        pools = dict(parallel._pools)
+        with subprocess_workers(2):
+            bpmn = BPMN.from_xml(warm_up())
+
+        self.assertEqual(parallel._pools, pools)
+        self.assertEqual({node.id for node in bpmn.process.subprocesses}, {"subprocess"})
+        self.assertEqual(len(bpmn.process.tasks), 1)
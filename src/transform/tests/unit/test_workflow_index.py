@@ -0,0 +1,68 @@
+"""Unit tests for the workflow annotation index of nets."""
+
+import copy
+import unittest
+
+from transformer.models.pnml.pnml import Net, Place, Transition
+from transformer.models.pnml.workflow import TriggerType, WorkflowBranchingType
+
+
+class TestWorkflowIndex(unittest.TestCase):
+    """Tests whether the index follows added, removed and re-marked elements."""
+
+    def setUp(self):
+        """Create a net with a time trigger and an unmarked transition."""
+        self.net = Net(id="net")
+        self.trigger = self.net.add_element(
+            Transition.create(id="trigger").mark_as_workflow_time()
+        )
+        self.task = self.net.add_element(Transition.create(id="task"))
+
+    def test_add_and_remove(self):
+        """Tests whether marked elements are indexed while they are in the net."""
+        index = self.net.workflow_index
+        self.assertEqual(index.get_event_triggers(), [self.trigger])
+        self.assertEqual(index.get_event_triggers(TriggerType.Message), [])
+        self.net.remove_element(self.trigger)
+        self.assertEqual(index.get_event_triggers(), [])
+
+        # marking a removed element does not change the index anymore
+        self.trigger.mark_as_workflow_message()
+        self.assertEqual(index.get_event_triggers(), [])
+
+    def test_re_mark(self):
+        """Tests whether marking elements of the net updates the index."""
+        index = self.net.workflow_index
+        self.task.mark_as_workflow_resource("role", "orga")
+        self.task.mark_as_workflow_subprocess()
+        self.trigger.mark_as_workflow_message()
+        self.assertEqual(index.get_resources(), [self.task])
+        self.assertEqual(index.get_resources_by_role("role", "orga"), [self.task])
+        self.assertEqual(index.get_subprocesses(), [self.task])
+        self.assertEqual(index.get_event_triggers(TriggerType.Time), [])
+        self.assertEqual(index.get_event_triggers(TriggerType.Message), [self.trigger])
+
+        self.trigger.remove_toolspecific()
+        self.assertEqual(index.get_event_triggers(), [])
+
+    def test_operators(self):
+        """Tests whether operator elements are grouped by operator ID."""
+        split = Place.create(id="split").mark_as_workflow_operator(
+            WorkflowBranchingType.XorJoinSplit, "op"
+        )
+        self.net.add_element(split)
+        self.task.mark_as_workflow_operator(WorkflowBranchingType.XorJoinSplit, "op")
+        self.assertEqual(
+            self.net.workflow_index.get_operators(), {"op": [split, self.task]}
+        )
+
+    def test_read_and_copy(self):
+        """Tests whether read and copied nets have an equal index of their elements."""
+        read_net = Net(transitions={self.trigger.model_copy(), self.task.model_copy()})
+        self.assertEqual(read_net.workflow_index, self.net.workflow_index)
+
+        copied_net = copy.deepcopy(self.net)
+        copied_trigger = copied_net.get_element("trigger")
+        copied_trigger.remove_toolspecific()
+        self.assertEqual(copied_net.workflow_index.get_event_triggers(), [])
+        self.assertEqual(self.net.workflow_index.get_event_triggers(), [self.trigger])
@@ -0,0 +1,88 @@
+"""Parsing and transformation of posted models for the endpoints.
+
+The transformer is imported on first use, so it does not delay the cold start of
+the endpoints (e.g. preflight requests, polls of jobs or results of the result
+cache do not need it).
+
+Given the metrics of a transformation (see `metrics.transformation`), the helpers
+record the stages, passes, sizes and counts of the models they handle.
+"""
+
+from collections.abc import Iterator
+from contextlib import nullcontext
+from typing import IO, TYPE_CHECKING
+
+from metrics.transformation import TransformationMetrics, get_content_size
+from transformer.utility.stages import Stage, observe_stages, run_stage
+
+if TYPE_CHECKING:
+    from transformer.models.bpmn.bpmn import BPMN
+    from transformer.models.pnml.pnml import Pnml
+
+
+def parse_model(
+    source_key: str,
+    content: str | bytes | IO[bytes],
+    metrics: TransformationMetrics | None = None,
+) -> "BPMN | Pnml":
+    """Return the posted BPMN ("bpmn") or PNML ("pnml") model."""
+    from transformer.models.bpmn.bpmn import BPMN
+    from transformer.models.pnml.pnml import Pnml
+
+    with nullcontext() if metrics is None else observe_stages(metrics):
+        with run_stage(Stage.Parse):
+            if source_key == "bpmn":
+                source = BPMN.from_xml(content)
+            else:
+                source = Pnml.from_xml_str(content)
+    if metrics is not None:
+        metrics.record_size("input", get_content_size(content))
+        metrics.record_model("input", source)
+    return source
+
+
+def transform_source(
+    source: "BPMN | Pnml", metrics: TransformationMetrics | None = None
+) -> "Pnml | BPMN":
+    """Return the workflow net of a BPMN or the BPMN of a petri net."""
+    from transformer.models.bpmn.bpmn import BPMN
+    from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+    from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
+    from transformer.utility.passes import PassStats, record_pass_stats
+
+    if metrics is None:
+        if isinstance(source, BPMN):
+            return bpmn_to_workflow_net(source)
+        return pnml_to_bpmn(source)
+
+    stats: list[PassStats] = []
+    with observe_stages(metrics):
+        if isinstance(source, BPMN):
+            transformed = bpmn_to_workflow_net(source, stats)
+        else:
+            transformed = pnml_to_bpmn(source, stats)
+    # Outer collectors of the context still receive the statistics.
+    record_pass_stats(stats)
+    metrics.record_passes(stats)
+    metrics.record_model("output", transformed)
+    return transformed
+
+
+def iter_serialized(
+    transformed: "Pnml | BPMN", metrics: TransformationMetrics | None = None
+) -> Iterator[str]:
+    """Return the chunks of the serialization of a transformed model."""
+    chunks = transformed.iter_string()
+    if metrics is None:
+        return chunks
+    return metrics.iter_serialized(chunks)
+
+
+def transform_model(
+    source_key: str,
+    content: str | bytes,
+    metrics: TransformationMetrics | None = None,
+):
+    """Return the serialized transformation of a posted BPMN or PNML model."""
+    transformed = transform_source(parse_model(source_key, content, metrics), metrics)
+    return "".join(iter_serialized(transformed, metrics))
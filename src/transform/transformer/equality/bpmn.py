@@ -11,7 +11,7 @@ from transformer.models.bpmn.bpmn import (
 )
 
 
-def bpmn_element_to_comp_value(e: GenericBPMNNode | Flow):
+def bpmn_element_to_comp_value(bpmn: Process, e: GenericBPMNNode | Flow):
     """Returns a concatenation of a by in/source and out/target comparable BPMN node."""
     if isinstance(e, LaneSet):
         return to_comp_string(
@@ -21,7 +21,12 @@ def bpmn_element_to_comp_value(e: GenericBPMNNode | Flow):
             ]
         )
     elif isinstance(e, GenericBPMNNode):
-        return to_comp_string(e.id, e.name, sorted(e.outgoing), sorted(e.incoming))
+        return to_comp_string(
+            e.id,
+            e.name,
+            sorted(f.id for f in bpmn.get_outgoing(e.id)),
+            sorted(f.id for f in bpmn.get_incoming(e.id)),
+        )
     elif isinstance(e, Flow):
         return to_comp_string(e.name, e.sourceRef, e.targetRef)
     else:
@@ -31,8 +36,8 @@ def bpmn_element_to_comp_value(e: GenericBPMNNode | Flow):
 def bpmn_type_map(bpmn: Process):
     """Returns a by type grouped dictionary of the bpmn elements."""
     return create_type_dict(
-        [*bpmn._flatten_node_typ_map(), *bpmn.flows, *bpmn.lane_sets],
-        bpmn_element_to_comp_value,
+        [*bpmn.get_nodes(), *bpmn.flows, *bpmn.lane_sets],
+        lambda e: bpmn_element_to_comp_value(bpmn, e),
     )
 
 
@@ -0,0 +1,140 @@
+"""Canonical structural fingerprints of BPMN and PNML models.
+
+The fingerprint is a Merkle hash: each element is hashed from its type and field
+values, where nested models are replaced by their digest and the digests in set
+fields (e.g. the nodes of a process or the places of a net) are sorted. The digest
+of a process or net therefore covers its subprocesses or pages and does not depend
+on the iteration order of sets. Graphics (positions and diagrams) are not part of
+the structure and private helper structures are ignored. The incoming and outgoing
+references of BPMN nodes are derived from the flows of their process when it is
+serialized, so they are ignored as well (the flows already cover the adjacency).
+
+Equal fingerprints imply equality by `compare_bpmn` or `compare_pnml`, so stored
+fingerprints (e.g. of expected results) are compared in constant time.
+"""
+
+import hashlib
+import json
+from enum import Enum
+from functools import cache
+from typing import Any
+
+from pydantic import BaseModel
+
+from transformer.models.bpmn.base import GenericBPMNNode
+from transformer.models.bpmn.bpmn import BPMN, Process
+from transformer.models.bpmn.bpmn_graphics import BPMNDiagram
+from transformer.models.pnml.graphics import OffsetGraphics, PositionGraphics
+from transformer.models.pnml.pnml import Net, Pnml
+
+GRAPHICS_TYPES = {PositionGraphics, OffsetGraphics, BPMNDiagram}
+PRIMITIVE_TYPES = {str, int, float, bool, type(None)}
+# Fields derived from other fields (stale until the model is serialized).
+DERIVED_FIELDS = {GenericBPMNNode: frozenset({"incoming", "outgoing"})}
+
+
+def hash_canonical(value: Any):
+    """Return the hex digest of a canonical JSON value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@cache
+def get_canonical_fields(model_type: type[BaseModel]):
+    """Return the names of the fields of a model type that are hashed."""
+    derived = frozenset().union(
+        *(
+            fields
+            for base, fields in DERIVED_FIELDS.items()
+            if issubclass(model_type, base)
+        )
+    )
+    return [name for name in model_type.model_fields if name not in derived]
+
+
+class Fingerprinter:
+    """Computes the digests of models, each model is hashed once.
+
+    The digests are kept by object identity, so the models must not change while
+    the instance is used.
+    """
+
+    def __init__(self):
+        """Initialize without digests."""
+        self._digests: dict[int, str] = {}
+
+    def get_digest(self, model: BaseModel) -> str:
+        """Return the digest of a model from its type and its fields."""
+        digest = self._digests.get(id(model))
+        if digest is None:
+            digest = hash_canonical(self.to_canonical(model))
+            self._digests[id(model)] = digest
+        return digest
+
+    def to_canonical(self, value: Any) -> Any:
+        """Return a JSON value of a field value.
+
+        Models in sets (e.g. nodes, subprocesses and pages) are replaced by their
+        digest, other nested models are kept inline with their type and fields.
+        """
+        value_type = type(value)
+        if value_type in PRIMITIVE_TYPES:
+            return value
+        if isinstance(value, BaseModel):
+            if value_type in GRAPHICS_TYPES:
+                return None
+            return [
+                value_type.__qualname__,
+                [
+                    self.to_canonical(getattr(value, name))
+                    for name in get_canonical_fields(value_type)
+                ],
+            ]
+        if isinstance(value, set | frozenset):
+            return sorted(
+                self.get_digest(v) if isinstance(v, BaseModel) else v for v in value
+            )
+        if isinstance(value, list | tuple):
+            return [self.to_canonical(v) for v in value]
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+
+def get_fingerprint(model: BPMN | Process | Pnml | Net):
+    """Return the fingerprint of a model including all subprocesses or pages."""
+    return Fingerprinter().get_digest(model)
+
+
+def get_subtree_fingerprints(model: Process | Net):
+    """Return the fingerprints of a process or net and all nested ones by ID.
+
+    Pages are identified by the ID of the page (or of its net), like in
+    `get_all_nets_by_id`. Each subtree is hashed once.
+    """
+    fingerprinter = Fingerprinter()
+    fingerprints: dict[str, str] = {}
+    if isinstance(model, Process):
+        _add_process_fingerprints(model, fingerprinter, fingerprints)
+    else:
+        fingerprints[model.id or ""] = fingerprinter.get_digest(model)
+        _add_page_fingerprints(model, fingerprinter, fingerprints)
+    return fingerprints
+
+
+def _add_process_fingerprints(
+    process: Process, fingerprinter: Fingerprinter, fingerprints: dict[str, str]
+):
+    """Add the fingerprints of a process and its subprocesses (recursive)."""
+    fingerprints[process.id] = fingerprinter.get_digest(process)
+    for subprocess in process.subprocesses:
+        _add_process_fingerprints(subprocess, fingerprinter, fingerprints)
+
+
+def _add_page_fingerprints(
+    net: Net, fingerprinter: Fingerprinter, fingerprints: dict[str, str]
+):
+    """Add the fingerprints of the pages of a net (recursive)."""
+    for page in net.pages:
+        fingerprints[page.id or page.net.id or ""] = fingerprinter.get_digest(page.net)
+        _add_page_fingerprints(page.net, fingerprinter, fingerprints)
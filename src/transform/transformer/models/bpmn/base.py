@@ -24,14 +24,6 @@ class GenericBPMNNode(BPMNNamespace):
     incoming: set[str] = element("incoming", default_factory=set)
     outgoing: set[str] = element("outgoing", default_factory=set)
 
-    def get_in_degree(self):
-        """Returns incoming degree of this instance."""
-        return len(self.incoming)
-
-    def get_out_degree(self):
-        """Returns outgoing degree of this instance."""
-        return len(self.outgoing)
-
 
 class Gateway(GenericBPMNNode):
     """Gateway extension of BPMN node."""
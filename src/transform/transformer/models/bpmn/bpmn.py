@@ -1,11 +1,15 @@
 """BPMN objects and handling."""
 
+from collections.abc import Iterator
+from io import BytesIO, StringIO
 from pathlib import Path
-from typing import cast
+from typing import IO, Any, cast
+from xml.etree.ElementTree import Element
 
-from defusedxml.ElementTree import fromstring
+from defusedxml.ElementTree import iterparse
 from pydantic import PrivateAttr
-from pydantic_xml import attr, element
+from pydantic_xml import BaseXmlModel, attr, element
+from pydantic_xml.element.native import XmlElement
 
 from exceptions import (
     InternalTransformationException,
@@ -17,6 +21,7 @@ from transformer.models.bpmn.base import (
     BPMNNamespace,
     Gateway,
     GenericBPMNNode,
+    ns_map,
 )
 from transformer.models.bpmn.bpmn_graphics import (
     BPMNDiagram,
@@ -27,7 +32,10 @@ from transformer.models.bpmn.bpmn_graphics import (
     DCBounds,
     DIWaypoint,
 )
+from transformer.utility.graph import Graph
+from transformer.utility.stages import Stage, run_stage
 from transformer.utility.utility import create_arc_name, get_tag_name
+from transformer.utility.xml_writer import iter_xml, to_xml_string, write_xml
 
 supported_elements = {
     "exclusiveGateway",
@@ -213,21 +221,44 @@ class Process(GenericBPMNNode):
     _type_map: dict[type[GenericBPMNNode], set[GenericBPMNNode]] = PrivateAttr(
         default_factory=dict
     )
-
-    _temp_node_id_to_incoming: dict[str, set[Flow]] = PrivateAttr(default_factory=dict)
-    _temp_node_id_to_outgoing: dict[str, set[Flow]] = PrivateAttr(default_factory=dict)
-    _temp_nodes: dict[str, GenericBPMNNode] = PrivateAttr(default_factory=dict)
-    _temp_flows: dict[str, Flow] = PrivateAttr(default_factory=dict)
+    _graph: Graph[GenericBPMNNode, Flow] = PrivateAttr(default_factory=Graph)
 
     # Holds the name of the ID of the usertask and participant (lane name)
     # Also holds the IDs of the usertasks within subprocesses
     _participant_mapping: dict[str, str] = PrivateAttr(default_factory=dict)
 
+    @property
+    def graph(self) -> Graph[GenericBPMNNode, Flow]:
+        """Return the graph core (node and flow indices) of the process.
+
+        The graph is the only adjacency structure of the process, the incoming and
+        outgoing flow IDs of the nodes are set from it before serialization.
+        """
+        return self.__pydantic_private__["_graph"]  # type: ignore
+
     def __init__(self, **data):
         """Process instance constructor."""
         super().__init__(**data)
         self._init_reference_structures()
 
+    def __getstate__(self):
+        """Return the state for pickling without the helper structures.
+
+        The helper structures are rebuilt from the fields when unpickled, so
+        temporary helper nodes (not part of the fields) are not kept. The
+        participant mapping is kept.
+        """
+        private = {"_participant_mapping": self._participant_mapping}
+        return {**super().__getstate__(), "__pydantic_private__": private}
+
+    def __setstate__(self, state: dict[Any, Any]):
+        """Restore a pickled process and rebuild the helper structures."""
+        participant_mapping = state["__pydantic_private__"]["_participant_mapping"]
+        super().__setstate__({**state, "__pydantic_private__": None})
+        self.model_post_init(None)
+        self._participant_mapping = participant_mapping
+        self._init_reference_structures()
+
     def _init_reference_structures(self):
         """Instance initializer."""
         self._type_map = cast(
@@ -246,72 +277,73 @@ class Process(GenericBPMNNode):
                 GenericBPMNNode: set(),
             },
         )
-        self._temp_node_id_to_incoming: dict[str, set[Flow]] = {}
-        self._temp_node_id_to_outgoing: dict[str, set[Flow]] = {}
-        self._temp_nodes: dict[str, GenericBPMNNode] = {}
-        self._temp_flows: dict[str, Flow] = {}
-
-        for node in self._flatten_node_typ_map():
-            self._temp_nodes[node.id] = node
+        graph = self.graph
+        for nodes in self._type_map.values():
+            for node in nodes:
+                graph.add_node(node.id, node)
 
         for flow in self.flows:
-            self._temp_flows[flow.id] = flow
-            self._update_flow_incoming_outgoing(flow)
-
-    def _flatten_node_typ_map(self):
-        """Flatten nodes."""
-        r: list[GenericBPMNNode] = []
-        [r.extend(x) for x in self._type_map.values()]
-        return r
-
-    def _update_flow_incoming_outgoing(self, flow: Flow):
-        """Update source / target reference of instance."""
-        if flow.targetRef not in self._temp_node_id_to_incoming:
-            self._temp_node_id_to_incoming[flow.targetRef] = set([flow])
-        else:
-            self._temp_node_id_to_incoming[flow.targetRef].add(flow)
+            graph.add_edge(flow.id, flow.sourceRef, flow.targetRef, flow)
 
-        if flow.sourceRef not in self._temp_node_id_to_outgoing:
-            self._temp_node_id_to_outgoing[flow.sourceRef] = set([flow])
-        else:
-            self._temp_node_id_to_outgoing[flow.sourceRef].add(flow)
+    def get_nodes(self):
+        """Return all nodes in insertion order.
 
-    def _update_actual_incoming_outgoing(self, flow: Flow):
-        """Update underlying source / target of instance."""
-        self.flows.add(flow)
-        source = self._temp_nodes[flow.sourceRef]
-        target = self._temp_nodes[flow.targetRef]
-        source.outgoing.add(flow.id)
-        target.incoming.add(flow.id)
+        The returned view is cached until the next node is added or removed.
+        """
+        return self.graph.node_view()
+
+    def get_nodes_by_type(self, *node_types: type[GenericBPMNNode]):
+        """Return the nodes of the given exact types from the per type node index."""
+        type_map = self._type_map
+        return self.graph.get_view(
+            node_types,
+            lambda: (node for node_type in node_types for node in type_map[node_type]),
+        )
+
+    def set_flow_references(self):
+        """Set the incoming/outgoing flow IDs of all (sub)process nodes."""
+        graph = self.graph
+        for node in graph.nodes():
+            node.incoming = {flow.id for flow in graph.get_incoming(node.id)}
+            node.outgoing = {flow.id for flow in graph.get_outgoing(node.id)}
+            if isinstance(node, Process):
+                node.set_flow_references()
 
     def get_incoming(self, id: str):
         """Return the incoming flows of a element by id."""
-        return self._temp_node_id_to_incoming[id]
+        return self.graph.get_incoming(id)
 
     def get_outgoing(self, id: str):
         """Return the outgoing flows of a element by id."""
-        return self._temp_node_id_to_outgoing[id]
+        return self.graph.get_outgoing(id)
+
+    def get_in_degree(self, node: GenericBPMNNode):
+        """Return degree of incoming flows."""
+        return self.graph.get_in_degree(node.id)
+
+    def get_out_degree(self, node: GenericBPMNNode):
+        """Return degree of outgoing flows."""
+        return self.graph.get_out_degree(node.id)
 
     def get_node(self, id: str):
         """Return a node by id."""
-        return self._temp_nodes[id]
+        node = self.graph.get_node(id)
+        if node is None:
+            raise KeyError(id)
+        return node
 
     def is_node_existing(self, id: str):
         """Returns whether node with a id is existing in process."""
-        return id in self._temp_nodes
+        return self.graph.has_node(id)
+
+    def is_flow_existing(self, id: str):
+        """Returns whether flow with a id is existing in process."""
+        return self.graph.has_edge(id)
 
     def change_node_id(self, node: GenericBPMNNode, new_id: str):
         """Change node id and update connected flows."""
-        incoming_flows = self._temp_node_id_to_incoming.get(node.id, [])
-        incoming_flows_id_map = [
-            (f.id, f.sourceRef, new_id, f.name) for f in incoming_flows
-        ]
-
-        outgoing_flows = self._temp_node_id_to_outgoing.get(node.id, [])
-        outgoing_flows_id_map = [
-            (f.id, new_id, f.targetRef, f.name) for f in outgoing_flows
-        ]
-
+        incoming_flows = self.get_incoming(node.id)
+        outgoing_flows = self.get_outgoing(node.id)
         for f in [*incoming_flows, *outgoing_flows]:
             self.remove_flow(f)
         self.remove_node(node)
@@ -320,16 +352,10 @@ class Process(GenericBPMNNode):
         new_node.id = new_id
 
         self.add_node(new_node)
-        for id, source_id, target_id, name in [
-            *outgoing_flows_id_map,
-            *incoming_flows_id_map,
-        ]:
-            self.add_flow(
-                source=self._temp_nodes[source_id],
-                target=self._temp_nodes[target_id],
-                id=id,
-                name=name,
-            )
+        for f in outgoing_flows:
+            self.add_flow(new_node, self.get_node(f.targetRef), f.id, f.name)
+        for f in incoming_flows:
+            self.add_flow(self.get_node(f.sourceRef), new_node, f.id, f.name)
 
     def add_flow(
         self,
@@ -342,7 +368,7 @@ class Process(GenericBPMNNode):
         if id is None:
             id = create_arc_name(source.id, target.id)
 
-        if id in self._temp_flows:
+        if self.graph.has_edge(id):
             raise InternalTransformationException(
                 f"flow with the id {id} already exists!"
             )
@@ -351,36 +377,22 @@ class Process(GenericBPMNNode):
         self.add_node(target)
 
         a = Flow(id=id, sourceRef=source.id, targetRef=target.id, name=name)
-        self._temp_flows[id] = a
-        self._update_flow_incoming_outgoing(a)
-        self._update_actual_incoming_outgoing(a)
+        self.graph.add_edge(id, source.id, target.id, a)
+        self.flows.add(a)
         return a
 
     def add_constructed_flow(self, flow: Flow):
         """Add a finished flow to instance."""
         self.add_flow(
-            self._temp_nodes[flow.sourceRef],
-            self._temp_nodes[flow.targetRef],
+            self.get_node(flow.sourceRef),
+            self.get_node(flow.targetRef),
             flow.id,
             flow.name,
         )
 
-    def _remove_actual_flow(self, flow: Flow):
-        """Remove underlying flow of instance."""
-        self.flows.remove(flow)
-
-        source = self._temp_nodes[flow.sourceRef]
-        target = self._temp_nodes[flow.targetRef]
-        source.outgoing.remove(flow.id)
-        target.incoming.remove(flow.id)
-
     def remove_flow(self, flow: Flow):
         """Remove flow reference of instance."""
-        self._temp_flows.pop(flow.id)
-        self._temp_node_id_to_incoming[flow.targetRef].remove(flow)
-        self._temp_node_id_to_outgoing[flow.sourceRef].remove(flow)
-
-        self._remove_actual_flow(flow)
+        self.flows.remove(self.graph.remove_edge(flow.id))
 
     def add_nodes(self, *args: GenericBPMNNode):
         """Add multiple nodes to the BPMN."""
@@ -388,23 +400,19 @@ class Process(GenericBPMNNode):
             self.add_node(node)
 
     def add_node(self, new_node: GenericBPMNNode):
-        """Add single node to the BPMN."""
-        storage_set = self._type_map[type(new_node)]
+        """Add single node to the BPMN or skip if already existing (check by id)."""
+        storage_set = self._type_map.get(type(new_node))
         if storage_set is None:
             raise InternalTransformationException("No BPMN node")
-        if new_node in storage_set:
-            # skip already added node
-            return new_node
 
-        storage_set.add(new_node)
-
-        self._temp_nodes[new_node.id] = new_node
+        if self.graph.add_node(new_node.id, new_node):
+            storage_set.add(new_node)
 
         return new_node
 
     def remove_node(self, to_remove_node: GenericBPMNNode):
         """Remove single node frome the BPMN."""
-        storage_set = self._type_map[type(to_remove_node)]
+        storage_set = self._type_map.get(type(to_remove_node))
         if storage_set is None:
             raise InternalTransformationException("No BPMN node")
 
@@ -413,37 +421,37 @@ class Process(GenericBPMNNode):
 
         storage_set.remove(to_remove_node)
 
-        self._temp_nodes.pop(to_remove_node.id)
-
-        if to_remove_node.id in self._temp_node_id_to_incoming:
-            incoming = self._temp_node_id_to_incoming.pop(to_remove_node.id)
-            for arc in incoming:
-                arc.targetRef = ""
-        if to_remove_node.id in self._temp_node_id_to_outgoing:
-            outgoing = self._temp_node_id_to_outgoing.pop(to_remove_node.id)
-            for arc in outgoing:
-                arc.sourceRef = ""
+        # Connecting flows stay at their other end with an empty source/target.
+        incoming, outgoing = self.graph.remove_node(to_remove_node.id)
+        for flow in incoming:
+            flow.targetRef = ""
+        for flow in outgoing:
+            flow.sourceRef = ""
 
     def get_flow_target_by_id(self, flow_id: str):
         """Return target nodes from flow id."""
-        return self._temp_nodes[self._temp_flows[flow_id].targetRef]
+        return self.get_node(self.get_flow(flow_id).targetRef)
 
     def get_flow_source_by_id(self, flow_id: str):
         """Return source nodes from flow id."""
-        return self._temp_nodes[self._temp_flows[flow_id].sourceRef]
+        return self.get_node(self.get_flow(flow_id).sourceRef)
 
     def get_flow(self, id: str):
         """Return flow by id."""
-        return self._temp_flows[id]
+        flow = self.graph.get_edge(id)
+        if flow is None:
+            raise KeyError(id)
+        return flow
 
     def remove_node_with_connecting_flows(self, node: GenericBPMNNode):
         """Remove node and its connected flows."""
-        if node.get_in_degree() > 0:
-            incoming_arc = list(self._temp_node_id_to_incoming[node.id])[0]
+        incoming, outgoing = self.get_incoming(node.id), self.get_outgoing(node.id)
+        if incoming:
+            incoming_arc = incoming[0]
             source_id = incoming_arc.sourceRef
             self.remove_flow(incoming_arc)
-        if node.get_out_degree() > 0:
-            outgoing_arc = list(self._temp_node_id_to_outgoing[node.id])[0]
+        if outgoing:
+            outgoing_arc = outgoing[0]
             target_id = outgoing_arc.targetRef
             self.remove_flow(outgoing_arc)
         self.remove_node(node)
@@ -458,17 +466,45 @@ class BPMN(BPMNNamespace, tag="definitions"):
     diagram: BPMNDiagram | None = element(default=None)
 
     @staticmethod
-    def from_xml(xml_content: str):
-        """Return a BPMN from a XML string."""
+    def from_xml(xml_content: str | bytes | IO[bytes]):
+        """Return a BPMN from a XML string, bytes or binary stream.
+
+        The document is read in a single streaming pass. Unsupported elements are
+        rejected as soon as their start tag is read, documents with another root than
+        the BPMN definitions as soon as the root is read. Each direct child of the
+        definitions root is deserialized (and released) once its end tag is read.
+        """
+        source: IO[str] | IO[bytes]
+        if isinstance(xml_content, str):
+            source = StringIO(xml_content)
+        elif isinstance(xml_content, bytes):
+            source = BytesIO(xml_content)
+        else:
+            source = xml_content
         try:
-            tree = fromstring(xml_content)
-            used_tags: set[str] = set()
-            for elem in tree.iter():
-                used_tags.add(get_tag_name(elem))
-            unhandled_tags = used_tags.difference(supported_tags)
-            if len(unhandled_tags) > 0:
-                raise NotSupportedBPMNElement(str(unhandled_tags))
-            return BPMN.from_xml_tree(tree)
+            root: Element | None = None
+            depth = 0
+            children: dict[str, BaseXmlModel] = {}
+            for event, elem in iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        if elem.tag != DEFINITIONS_TAG:
+                            raise InvalidInputXML()
+                        root = elem
+                    elif get_tag_name(elem) not in supported_tags:
+                        raise NotSupportedBPMNElement(str({get_tag_name(elem)}))
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1 or elem.tag not in definitions_children:
+                    continue
+                field_name, model = definitions_children[elem.tag]
+                if field_name not in children:
+                    children[field_name] = parse_definitions_child(model, elem)
+                elem.clear()
+            if root is None or "process" not in children:
+                raise InvalidInputXML()
+            return BPMN(id=root.get("id", ""), name=root.get("name"), **children)
         except NotSupportedBPMNElement as e:
             raise e
         except Exception:
@@ -488,15 +524,37 @@ class BPMN(BPMNNamespace, tag="definitions"):
     def to_string(self) -> str:
         """Transform this instance into a string and creates placeholder graphics."""
         try:
-            self.set_graphics()
-            return cast(str, self.to_xml(encoding="unicode"))
+            self.prepare_serialization()
+            return to_xml_string(self)
+        except Exception:
+            raise PrivateInternalException("Can't convert bpmn to string.")
+
+    def iter_string(self) -> Iterator[str]:
+        """Yield this instance serialized in chunks and creates placeholder graphics."""
+        try:
+            self.prepare_serialization()
+            yield from iter_xml(self)
+        except Exception:
+            raise PrivateInternalException("Can't convert bpmn to string.")
+
+    def write(self, sink: IO[str] | IO[bytes]):
+        """Write this instance incrementally to a text/byte sink (with graphics)."""
+        try:
+            self.prepare_serialization()
+            write_xml(self, sink)
         except Exception:
             raise PrivateInternalException("Can't convert bpmn to string.")
 
     def write_to_file(self, path: str):
         """Save this instance xml encoded to a file."""
-        content = self.to_string()
-        Path(path).write_text(content)
+        with Path(path).open("wb") as f:
+            self.write(f)
+
+    def prepare_serialization(self):
+        """Set the flow references of the nodes and the placeholder graphics."""
+        self.process.set_flow_references()
+        with run_stage(Stage.SetGraphics):
+            self.set_graphics()
 
     def set_graphics(self):
         """Define graphical representation of this instance."""
@@ -536,7 +594,7 @@ class BPMN(BPMNNamespace, tag="definitions"):
                 )
             )
 
-        for node in bpmn._flatten_node_typ_map():
+        for node in bpmn.get_nodes():
             s = BPMNShape(
                 id=f"{node.id}_di",
                 bpmnElement=node.id,
@@ -550,3 +608,26 @@ class BPMN(BPMNNamespace, tag="definitions"):
 
         d.plane = p
         self.diagram = d
+
+
+DEFINITIONS_TAG = f"{{{ns_map['bpmn']}}}definitions"
+# Direct children of the definitions root by namespaced tag -> (field, model)
+definitions_children: dict[str, tuple[str, type[BaseXmlModel]]] = {
+    f"{{{ns_map['bpmn']}}}process": ("process", Process),
+    f"{{{ns_map['bpmn']}}}collaboration": ("collaboration", Collaboration),
+    f"{{{ns_map['bpmndi']}}}BPMNDiagram": ("diagram", BPMNDiagram),
+}
+
+
+def parse_definitions_child(model: type[BaseXmlModel], elem: Element):
+    """Deserialize a direct child of the definitions root into its model.
+
+    The process element is tagged by the field of BPMN and not by the Process model
+    itself, so the root tag check of from_xml_tree is skipped here.
+    """
+    serializer = model.__xml_serializer__
+    if serializer is None:
+        raise PrivateInternalException(f"{model.__name__} is not initialized.")
+    return serializer.deserialize(
+        XmlElement.from_native(elem), context=None, sourcemap={}, loc=()
+    )
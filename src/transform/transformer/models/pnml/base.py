@@ -14,6 +14,11 @@ from transformer.models.pnml.workflow import (
     TriggerType,
     WorkflowBranchingType,
 )
+from transformer.models.pnml.workflow_index import (
+    INDEX_REFERENCE,
+    update_workflow_index,
+)
+from transformer.utility.construction import construct
 from transformer.utility.utility import WOPED, BaseModel
 
 
@@ -133,6 +138,13 @@ class NetElement(BaseModel):
     graphics: PositionGraphics | None = None
     toolspecific: Toolspecific | None = None
 
+    def __getstate__(self):
+        """Return the state for pickling without the reference to the net index."""
+        state = super().__getstate__()
+        instance_dict = dict(state["__dict__"])
+        instance_dict.pop(INDEX_REFERENCE, None)
+        return {**state, "__dict__": instance_dict}
+
     def get_name(self):
         """Returns name of instance."""
         if not self.name:
@@ -141,13 +153,20 @@ class NetElement(BaseModel):
 
     def set_name(self, new_name: str):
         """Sets the name from a string."""
-        self.name = Name(title=new_name)
+        self.name = construct(Name, title=new_name)
 
     def set_copy_of_exisiting_toolspecific(self, tool: Toolspecific | None):
         """Set a copy of a existing Toolspecific instance."""
         if not tool:
             return self
         self.toolspecific = tool.model_copy()
+        update_workflow_index(self)
+        return self
+
+    def remove_toolspecific(self):
+        """Remove the Toolspecific instance (and workflow annotations)."""
+        self.toolspecific = None
+        update_workflow_index(self)
         return self
 
     def is_workflow_element(self):
@@ -203,40 +222,45 @@ class NetElement(BaseModel):
     def mark_as_workflow_operator(self, type: WorkflowBranchingType, id: str):
         """Mark this instance as workflow operator."""
         if not self.toolspecific:
-            self.toolspecific = Toolspecific()
-        self.toolspecific.operator = Operator(id=id, type=type)
+            self.toolspecific = construct(Toolspecific)
+        self.toolspecific.operator = construct(Operator, id=id, type=type)
+        update_workflow_index(self)
         return self
 
     def mark_as_workflow_subprocess(self):
         """Mark this instance as a subprocess."""
         if not self.toolspecific:
-            self.toolspecific = Toolspecific()
+            self.toolspecific = construct(Toolspecific)
         self.toolspecific.subprocess = True
+        update_workflow_index(self)
         return self
 
     def mark_as_workflow_resource(self, role_name: str, orga: str):
         """Mark this instance as a resource."""
         if not self.toolspecific:
-            self.toolspecific = Toolspecific()
+            self.toolspecific = construct(Toolspecific)
 
-        self.toolspecific.trigger = Trigger(id="", type=TriggerType.Resource)
-        self.toolspecific.transitionResource = TransitionResource(
-            roleName=role_name, organizationalUnitName=orga
+        self.toolspecific.trigger = construct(Trigger, id="", type=TriggerType.Resource)
+        self.toolspecific.transitionResource = construct(
+            TransitionResource, roleName=role_name, organizationalUnitName=orga
         )
+        update_workflow_index(self)
         return self
 
     def mark_as_workflow_message(self):
         """Mark this instance as a message."""
         if not self.toolspecific:
-            self.toolspecific = Toolspecific()
-        self.toolspecific.trigger = Trigger(id="", type=TriggerType.Message)
+            self.toolspecific = construct(Toolspecific)
+        self.toolspecific.trigger = construct(Trigger, id="", type=TriggerType.Message)
+        update_workflow_index(self)
         return self
 
     def mark_as_workflow_time(self):
         """Mark this instance as a time."""
         if not self.toolspecific:
-            self.toolspecific = Toolspecific()
-        self.toolspecific.trigger = Trigger(id="", type=TriggerType.Time)
+            self.toolspecific = construct(Toolspecific)
+        self.toolspecific.trigger = construct(Trigger, id="", type=TriggerType.Time)
+        update_workflow_index(self)
         return self
 
 
@@ -1,9 +1,11 @@
 """PNML models."""
 
+from collections.abc import Iterator
 from pathlib import Path
-from typing import cast
+from typing import IO, Any, cast
+from xml.etree.ElementTree import Element
 
-from defusedxml.ElementTree import fromstring
+from defusedxml.ElementTree import fromstring, parse
 from pydantic import PrivateAttr
 from pydantic_xml import attr, element
 
@@ -19,7 +21,11 @@ from transformer.models.pnml.base import (
     Toolspecific,
     ToolspecificGlobal,
 )
-from transformer.models.pnml.graphics import OffsetGraphics
+from transformer.models.pnml.graphics import (
+    Coordinates,
+    OffsetGraphics,
+    PositionGraphics,
+)
 from transformer.models.pnml.transform_helper import (
     ANDHelperPNML,
     HelperPNMLElement,
@@ -27,11 +33,28 @@ from transformer.models.pnml.transform_helper import (
     TimeHelperPNML,
     XORHelperPNML,
 )
+from transformer.models.pnml.workflow import (
+    Operator,
+    TransitionResource,
+    Trigger,
+    TriggerType,
+    WorkflowBranchingType,
+)
+from transformer.models.pnml.workflow_index import WorkflowIndex
+from transformer.utility.construction import (
+    ConstructionMode,
+    construct,
+    get_construction_mode,
+    trusted_construct,
+    verify_construction,
+)
+from transformer.utility.graph import Graph
 from transformer.utility.utility import (
     BaseModel,
     create_arc_name,
     create_silent_node_name,
 )
+from transformer.utility.xml_writer import iter_xml, to_xml_string, write_xml
 
 
 class Transition(NetElement, tag="transition"):
@@ -40,7 +63,11 @@ class Transition(NetElement, tag="transition"):
     @staticmethod
     def create(id: str, name: str | None = None):
         """Returns an instance of a transition."""
-        return Transition(id=id, name=Name(title=name) if name is not None else None)
+        return construct(
+            Transition,
+            id=id,
+            name=construct(Name, title=name) if name is not None else None,
+        )
 
 
 class Place(NetElement, tag="place"):
@@ -49,7 +76,9 @@ class Place(NetElement, tag="place"):
     @staticmethod
     def create(id: str, name: str | None = None):
         """Returns instance of a place."""
-        return Place(id=id, name=Name(title=name) if name is not None else None)
+        return construct(
+            Place, id=id, name=construct(Name, title=name) if name is not None else None
+        )
 
 
 class Arc(BaseModel, tag="arc"):
@@ -63,7 +92,11 @@ class Arc(BaseModel, tag="arc"):
 
     def __hash__(self):
         """Retuns a hashed of the arc instance."""
-        return hash((type(self),) + (self.id,) + (self.source,) + (self.target,))
+        return hash((type(self),) + self.get_key())
+
+    def get_key(self):
+        """Return the key of the arc in the net graph (ID, source, target)."""
+        return self.id, self.source, self.target
 
 
 class Page(BaseModel, tag="page"):
@@ -90,29 +123,51 @@ class Net(BaseModel, tag="net"):
     pages: set[Page] = element(default_factory=set)
 
     # internal helper structures
-    _temp_elements: dict[str, NetElement] = PrivateAttr(default_factory=dict)
     _type_map: dict[type[BaseModel], set[BaseModel]] = PrivateAttr(default_factory=dict)
-    _temp_arcs: dict[int, Arc] = PrivateAttr(default_factory=dict)
-    _temp_node_id_to_incoming: dict[str, set[Arc]] = PrivateAttr(default_factory=dict)
-    _temp_node_id_to_outgoing: dict[str, set[Arc]] = PrivateAttr(default_factory=dict)
+    _graph: Graph[NetElement, Arc] = PrivateAttr(default_factory=Graph)
+    _workflow_index: WorkflowIndex = PrivateAttr(default_factory=WorkflowIndex)
+
+    @property
+    def graph(self) -> Graph[NetElement, Arc]:
+        """Return the graph core (element and arc indices) of the net.
+
+        Read without the private attribute lookup of pydantic, which is comparatively
+        slow for the frequent adjacency lookups.
+        """
+        return self.__pydantic_private__["_graph"]  # type: ignore
+
+    @property
+    def workflow_index(self) -> WorkflowIndex:
+        """Return the index of the workflow annotated elements of the net."""
+        return self.__pydantic_private__["_workflow_index"]  # type: ignore
 
     def get_incoming(self, id: str):
         """Return the incoming arcs of a node by id."""
-        if id not in self._temp_node_id_to_incoming:
-            return {}
-        return self._temp_node_id_to_incoming[id]
+        return self.graph.get_incoming(id)
 
     def get_outgoing(self, id: str):
         """Return the outgoing arcs of a node by id."""
-        if id not in self._temp_node_id_to_outgoing:
-            return {}
-        return self._temp_node_id_to_outgoing[id]
+        return self.graph.get_outgoing(id)
 
     def __init__(self, **data):
         """Net constructor."""
         super().__init__(**data)
         self._init_reference_structures()
 
+    def __getstate__(self):
+        """Return the state for pickling without the helper structures.
+
+        The helper structures are rebuilt from the fields when unpickled, so
+        temporary helper elements (not part of the fields) are not kept.
+        """
+        return {**super().__getstate__(), "__pydantic_private__": None}
+
+    def __setstate__(self, state: dict[Any, Any]):
+        """Restore a pickled net and rebuild the helper structures."""
+        super().__setstate__(state)
+        self.model_post_init(None)
+        self._init_reference_structures()
+
     def _init_reference_structures(self):
         """Populate the helper structures."""
         self._type_map = cast(
@@ -128,63 +183,41 @@ class Net(BaseModel, tag="net"):
                 MessageHelperPNML: set([]),
             },
         )
-        for place in self.places:
-            self._temp_elements[place.id] = place
-
-        for transition in self.transitions:
-            self._temp_elements[transition.id] = transition
+        graph = self.graph
+        workflow_index = self.workflow_index
+        for node in [*self.places, *self.transitions]:
+            graph.add_node(node.id, node)
+            workflow_index.add(node)
 
         for arc in self.arcs:
-            self._temp_arcs[hash(arc)] = arc
-            self._update_arc_incoming_outgoing(arc)
-
-    def _flatten_node_typ_map(self):
-        """Return all nodes as a single list."""
-        all_nodes: list[BaseModel] = []
-        for type_sets in self._type_map.values():
-            all_nodes.extend(type_sets)
-        return all_nodes
-
-    def _update_arc_incoming_outgoing(self, arc: Arc):
-        """Updates helper node to arc mapping with the constructed arc."""
-        if arc.target not in self._temp_node_id_to_incoming:
-            self._temp_node_id_to_incoming[arc.target] = set([arc])
-        else:
-            self._temp_node_id_to_incoming[arc.target].add(arc)
-
-        if arc.source not in self._temp_node_id_to_outgoing:
-            self._temp_node_id_to_outgoing[arc.source] = set([arc])
-        else:
-            self._temp_node_id_to_outgoing[arc.source].add(arc)
+            graph.add_edge(arc.get_key(), arc.source, arc.target, arc)
 
     def get_in_degree(self, node: BaseModel):
         """Return degree of incoming arcs."""
-        if node.id not in self._temp_node_id_to_incoming:
-            return 0
-        return len(self._temp_node_id_to_incoming[node.id])
+        return self.graph.get_in_degree(node.id)
 
     def get_out_degree(self, node: BaseModel):
         """Return degree of outgoing arcs."""
-        if node.id not in self._temp_node_id_to_outgoing:
-            return 0
-        return len(self._temp_node_id_to_outgoing[node.id])
+        return self.graph.get_out_degree(node.id)
 
     def add_arc_with_handle_same_type_from_id(self, source_id: str, target_id: str):
         """Add arc connecting source and target id."""
-        source = self._temp_elements[source_id]
-        target = self._temp_elements[target_id]
+        source = self.get_element(source_id)
+        target = self.get_element(target_id)
         self.add_arc_with_handle_same_type(source, target)
 
     def add_arc_with_handle_same_type(self, source: NetElement, target: NetElement):
         """Add arc and add node should source and target be of same type."""
         if isinstance(source, Place) and isinstance(target, Place):
             t = self.add_element(
-                Transition(id=create_silent_node_name(source.id, target.id))
+                Transition.create(id=create_silent_node_name(source.id, target.id))
             )
             self.add_arc(source, t)
             self.add_arc(t, target)
         elif isinstance(source, Transition) and isinstance(target, Transition):
-            p = self.add_element(Place(id=create_silent_node_name(source.id, target.id)))
+            p = self.add_element(
+                Place.create(id=create_silent_node_name(source.id, target.id))
+            )
             self.add_arc(source, p)
             self.add_arc(p, target)
         else:
@@ -192,8 +225,8 @@ class Net(BaseModel, tag="net"):
 
     def add_arc_from_id(self, source_id: str, target_id: str, id: str | None = None):
         """Add arc connecting source and target id."""
-        source = self._temp_elements[source_id]
-        target = self._temp_elements[target_id]
+        source = self.get_element(source_id)
+        target = self.get_element(target_id)
         self.add_arc(source, target, id)
 
     def add_arc(self, source: NetElement, target: NetElement, id: str | None = None):
@@ -208,29 +241,31 @@ class Net(BaseModel, tag="net"):
             raise InternalTransformationException(
                 "Cant connect identical petrinet elements"
             )
-        if id in self._temp_arcs:
-            raise InternalTransformationException(
-                f"arc {id} already exists from {source.id} to {target.id}!"
-            )
-
         self.add_element(source)
         self.add_element(target)
 
-        a = Arc(id=id, source=source.id, target=target.id)
-        self._temp_arcs[hash(a)] = a
-        self._update_arc_incoming_outgoing(a)
-
-        self.arcs.add(a)
+        # Adding an identical arc again is a no-op like for the arc set.
+        a = construct(Arc, id=id, source=source.id, target=target.id)
+        if self.graph.add_edge(a.get_key(), a.source, a.target, a):
+            self.arcs.add(a)
 
     def remove_arc(self, arc: Arc):
-        """Remove arc based on instance."""
-        self._temp_arcs.pop(hash(arc))
-        if arc.target:
-            self._temp_node_id_to_incoming[arc.target].remove(arc)
-        if arc.source:
-            self._temp_node_id_to_outgoing[arc.source].remove(arc)
+        """Remove arc based on instance (or an equal copy)."""
+        self.arcs.remove(self.graph.remove_edge(arc.get_key()))
+
+    def reconnect_arc(self, arc: Arc, source: NetElement, target: NetElement):
+        """Connect an arc of the net to a new source and target in place.
 
+        The arc gets the ID an arc added between both elements would get. If such an
+        arc already exists, the arc is removed instead (like adding a duplicate arc).
+        """
+        key = (create_arc_name(source.id, target.id), source.id, target.id)
+        if not self.graph.reconnect_edge(arc.get_key(), key, source.id, target.id):
+            self.remove_arc(arc)
+            return
         self.arcs.remove(arc)
+        arc.id, arc.source, arc.target = key
+        self.arcs.add(arc)
 
     def add_page(self, new_page: Page):
         """Add a new page or add if not existing (check by id)."""
@@ -248,21 +283,28 @@ class Net(BaseModel, tag="net"):
         if storage_set is None:
             raise InternalTransformationException("No Petrinet node")
 
-        if new_node.id in self._temp_elements:
+        if not self.graph.add_node(new_node.id, new_node):
             return new_node
 
         storage_set.add(new_node)
-
-        self._temp_elements[new_node.id] = new_node
+        self.workflow_index.add(new_node)
         return new_node
 
     def get_element(self, id: str):
         """Return element by id."""
-        if id not in self._temp_elements:
+        element = self.graph.get_node(id)
+        if element is None:
             raise InternalTransformationException(
                 f"Cant get nonexisting Node with id {id}"
             )
-        return self._temp_elements[id]
+        return element
+
+    def get_elements(self):
+        """Return all elements (nodes and helper nodes) in insertion order.
+
+        The returned view is cached until the next element is added or removed.
+        """
+        return self.graph.node_view()
 
     def get_page(self, id: str):
         """Return page by id."""
@@ -273,9 +315,7 @@ class Net(BaseModel, tag="net"):
 
     def get_node_or_none(self, id: str):
         """Return node by id or None as default."""
-        if id not in self._temp_elements:
-            return None
-        return self._temp_elements[id]
+        return self.graph.get_node(id)
 
     def remove_element(self, to_remove_node: BaseModel):
         """Remove element by instance."""
@@ -284,22 +324,31 @@ class Net(BaseModel, tag="net"):
             raise InternalTransformationException("No Petrinet node")
 
         storage_set.remove(to_remove_node)
+        self.workflow_index.remove(cast(NetElement, to_remove_node))
 
-        self._temp_elements.pop(to_remove_node.id)
-        incoming = self._temp_node_id_to_incoming.pop(to_remove_node.id, set())
-        outgoing = self._temp_node_id_to_outgoing.pop(to_remove_node.id, set())
+        # Connecting arcs stay at their other end with an empty source/target.
+        incoming, outgoing = self.graph.remove_node(to_remove_node.id)
         for arc in incoming:
-            arc.target = ""
+            self._detach_arc(arc, target="")
         for arc in outgoing:
-            arc.source = ""
+            self._detach_arc(arc, source="")
+
+    def _detach_arc(self, arc: Arc, **detached_end: str):
+        """Set the source or target of an arc and update its keys."""
+        old_key = arc.get_key()
+        self.arcs.remove(arc)
+        for field_name, value in detached_end.items():
+            setattr(arc, field_name, value)
+        self.arcs.add(arc)
+        self.graph.change_edge_key(old_key, arc.get_key())
 
     def change_id(self, old_id: str, new_id: str):
         """Change the ID of a existing node and the connecting arcs."""
-        if old_id not in self._temp_elements:
+        if not self.graph.has_node(old_id):
             raise InternalTransformationException("old element not exisiting")
-        if new_id in self._temp_elements:
+        if self.graph.has_node(new_id):
             raise InternalTransformationException("new id already exists")
-        current_node = self._temp_elements[old_id]
+        current_node = self.get_element(old_id)
         incoming, outgoing = self.get_incoming_outgoing_and_remove_arcs(current_node)
         self.remove_element(current_node)
         current_node.id = new_id
@@ -358,25 +407,55 @@ class Pnml(BaseModel, tag="pnml"):
     net: Net
 
     def to_string(self) -> str:
-        """Return string of net instance as serialized XML."""
+        """Return string of net instance as serialized XML (with declaration)."""
         try:
-            return cast(str, self.to_xml(encoding="unicode"))
+            return to_xml_string(self)
+        except Exception:
+            raise PrivateInternalException("Can't convert pnml to string.")
+
+    def iter_string(self) -> Iterator[str]:
+        """Yield the serialized XML of the net in chunks (with declaration)."""
+        try:
+            yield from iter_xml(self)
+        except Exception:
+            raise PrivateInternalException("Can't convert pnml to string.")
+
+    def write(self, sink: IO[str] | IO[bytes]):
+        """Write the serialized XML of the net incrementally to a text/byte sink."""
+        try:
+            write_xml(self, sink)
         except Exception:
             raise PrivateInternalException("Can't convert pnml to string.")
 
     def write_to_file(self, path: str):
         """Save net to file."""
-        Path(path).write_text(self.to_string())
+        with Path(path).open("wb") as f:
+            self.write(f)
 
     @staticmethod
-    def from_xml_str(xml_content: str):
-        """Return a petri net from a XML string."""
+    def from_xml_str(xml_content: str | bytes | IO[bytes]):
+        """Return a petri net from a XML string, bytes or binary stream.
+
+        In trusted (and verify) construction mode the net is built without
+        validation, in verify mode it is additionally compared to the validated net.
+        """
+        mode = get_construction_mode()
+        validated: Pnml | None = None
         try:
-            tree = fromstring(xml_content)
-            net = Pnml.from_xml_tree(tree)
-            return net
+            if isinstance(xml_content, str | bytes):
+                tree = fromstring(xml_content)
+            else:
+                tree = parse(xml_content).getroot()
+            if mode is ConstructionMode.Validated:
+                return Pnml.from_xml_tree(tree)
+            net = read_trusted_pnml(tree)
+            if mode is ConstructionMode.Verify:
+                validated = Pnml.from_xml_tree(tree)
         except Exception:
             raise InvalidInputXML()
+        if validated is not None:
+            verify_construction(validated, net)
+        return net
 
     @staticmethod
     def from_file(path: str):
@@ -387,3 +466,213 @@ class Pnml(BaseModel, tag="pnml"):
     def generate_empty_net(id="new_net"):
         """Return empty petri net."""
         return Pnml(net=Net(id=id))
+
+
+# Trusted construction of petri nets from a XML tree. Each model is built with
+# trusted_construct, only the attribute values are converted to the field types.
+BOOL_TRUE_VALUES = {"1", "on", "t", "true", "y", "yes"}
+
+
+def read_attributes(elem: Element, *names: str, **converted_names):
+    """Return the existing attributes of an element (optional converted by type)."""
+    data = {name: elem.get(name) for name in names if elem.get(name) is not None}
+    for name, convert in converted_names.items():
+        value = elem.get(name)
+        if value is not None:
+            data[name] = convert(value)
+    return data
+
+
+def read_required_attributes(elem: Element, *names: str):
+    """Return attributes that an element must have.
+
+    Raises:
+        InvalidInputXML: If an attribute is missing (the models are not validated).
+    """
+    data = read_attributes(elem, *names)
+    if len(data) != len(names):
+        raise InvalidInputXML()
+    return data
+
+
+def read_text(elem: Element, tag: str):
+    """Return the text of a sub element or None if not existing/empty."""
+    sub_elem = elem.find(tag)
+    if sub_elem is None:
+        return None
+    return sub_elem.text or None
+
+
+def read_sub_elements(data: dict, elem: Element, **readers):
+    """Add each existing sub element (by tag of key) read by its reader to data."""
+    for tag, reader in readers.items():
+        sub_elem = elem.find(tag)
+        if sub_elem is not None:
+            data[tag] = reader(sub_elem)
+    return data
+
+
+def read_texts(data: dict, elem: Element, *tags: str):
+    """Add each existing non empty sub element text (by tag) to data."""
+    for tag in tags:
+        text = read_text(elem, tag)
+        if text is not None:
+            data[tag] = text
+    return data
+
+
+def read_coordinates(elem: Element):
+    """Return trusted coordinates."""
+    return trusted_construct(
+        Coordinates, **read_attributes(elem, "id", "name", x=float, y=float)
+    )
+
+
+def read_position_graphics(elem: Element):
+    """Return trusted position graphics."""
+    data = read_attributes(elem, "id", "name")
+    read_sub_elements(data, elem, dimension=read_coordinates, position=read_coordinates)
+    return trusted_construct(PositionGraphics, **data)
+
+
+def read_offset_graphics(elem: Element):
+    """Return trusted offset graphics."""
+    data = read_attributes(elem, "id", "name")
+    read_sub_elements(data, elem, offset=read_coordinates)
+    return trusted_construct(OffsetGraphics, **data)
+
+
+def read_name(elem: Element):
+    """Return a trusted name."""
+    data = read_attributes(elem, "id", "name")
+    read_sub_elements(data, elem, graphics=read_offset_graphics)
+    title = read_text(elem, "text")
+    if title is not None:
+        data["title"] = title
+    return trusted_construct(Name, **data)
+
+
+def read_operator(elem: Element):
+    """Return a trusted workflow operator."""
+    return trusted_construct(
+        Operator,
+        **read_attributes(
+            elem, "id", "name", type=lambda x: WorkflowBranchingType(int(x))
+        ),
+    )
+
+
+def read_trigger(elem: Element):
+    """Return a trusted workflow trigger."""
+    data = read_attributes(elem, "id", "name", type=lambda x: TriggerType(int(x)))
+    read_sub_elements(data, elem, graphics=read_position_graphics)
+    return trusted_construct(Trigger, **data)
+
+
+def read_transition_resource(elem: Element):
+    """Return a trusted transition resource."""
+    data = read_attributes(elem, "id", "name", "roleName", "organizationalUnitName")
+    read_sub_elements(data, elem, graphics=read_position_graphics)
+    return trusted_construct(TransitionResource, **data)
+
+
+def read_toolspecific(elem: Element):
+    """Return a trusted toolspecific extension of a net element or arc."""
+    data = read_attributes(elem, "id", "name", "tool", "version")
+    read_texts(
+        data,
+        elem,
+        "time",
+        "timeUnit",
+        "orientation",
+        "probability",
+        "displayProbabilityOn",
+    )
+    read_sub_elements(
+        data,
+        elem,
+        operator=read_operator,
+        trigger=read_trigger,
+        transitionResource=read_transition_resource,
+        displayProbabilityPosition=read_coordinates,
+    )
+    subprocess = read_text(elem, "subprocess")
+    if subprocess is not None:
+        data["subprocess"] = subprocess.lower() in BOOL_TRUE_VALUES
+    return trusted_construct(Toolspecific, **data)
+
+
+def read_net_element(model: type[Place | Transition], elem: Element):
+    """Return a trusted place or transition."""
+    data = read_required_attributes(elem, "id")
+    read_sub_elements(
+        data,
+        elem,
+        name=read_name,
+        graphics=read_position_graphics,
+        toolspecific=read_toolspecific,
+    )
+    return trusted_construct(model, **data)
+
+
+def read_inscription(elem: Element):
+    """Return a trusted inscription."""
+    data = read_attributes(elem, "id", "name")
+    read_texts(data, elem, "text")
+    read_sub_elements(data, elem, graphics=read_offset_graphics)
+    return trusted_construct(Inscription, **data)
+
+
+def read_arc(elem: Element):
+    """Return a trusted arc."""
+    data = read_attributes(elem, "id", "name")
+    data.update(read_required_attributes(elem, "source", "target"))
+    read_sub_elements(
+        data,
+        elem,
+        inscription=read_inscription,
+        graphics=read_offset_graphics,
+        toolspecific=read_toolspecific,
+    )
+    return trusted_construct(Arc, **data)
+
+
+def read_page(elem: Element):
+    """Return a trusted page."""
+    data = read_attributes(elem, "id", "name")
+    read_sub_elements(data, elem, net=read_net)
+    return trusted_construct(Page, **data)
+
+
+def read_net(elem: Element):
+    """Return a trusted net with initialized helper structures."""
+    data = read_attributes(elem, "id", "name")
+    if elem.get("type") is not None:
+        data["type_field"] = elem.get("type")
+    toolspecific_global = elem.find("toolspecific")
+    if toolspecific_global is not None:
+        # Only exists once per net, validated construction is cheap enough
+        data["toolspecific_global"] = ToolspecificGlobal.from_xml_tree(
+            toolspecific_global
+        )
+    net = trusted_construct(
+        Net,
+        places={read_net_element(Place, e) for e in elem.iterfind("place")},
+        transitions={
+            read_net_element(Transition, e) for e in elem.iterfind("transition")
+        },
+        arcs={read_arc(e) for e in elem.iterfind("arc")},
+        pages={read_page(e) for e in elem.iterfind("page")},
+        **data,
+    )
+    net._init_reference_structures()
+    return net
+
+
+def read_trusted_pnml(elem: Element):
+    """Return a petri net built from a trusted XML tree without validation."""
+    if elem.tag != "pnml":
+        raise InvalidInputXML()
+    data = read_attributes(elem, "id", "name")
+    read_sub_elements(data, elem, net=read_net)
+    return trusted_construct(Pnml, **data)
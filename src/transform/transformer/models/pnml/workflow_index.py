@@ -0,0 +1,159 @@
+"""Index of the workflow annotations (Toolspecific) of the elements of a net.
+
+The index is updated when elements are added to or removed from a net and when an
+element of a net is marked (e.g. `mark_as_workflow_time`). Each element keeps a weak
+reference to the index of its net outside of its model fields, so the reference is
+neither serialized nor compared.
+
+Lookups return the annotated elements in the order they were indexed and cost
+O(result) instead of a scan of the whole net.
+"""
+
+from collections.abc import Hashable
+from copy import deepcopy
+from typing import TYPE_CHECKING, Any
+from weakref import ref
+
+from transformer.models.pnml.workflow import TriggerType
+
+if TYPE_CHECKING:
+    from transformer.models.pnml.base import NetElement
+
+# Key of the index reference in the instance dictionary of an element.
+INDEX_REFERENCE = "_workflow_index"
+
+OPERATOR = "operator"
+SUBPROCESS = "subprocess"
+RESOURCE = "resource"
+TRIGGER = "trigger"
+
+EVENT_TRIGGER_TYPES = (TriggerType.Time, TriggerType.Message)
+
+
+def get_annotation_keys(element: "NetElement") -> tuple[Hashable, ...]:
+    """Return the index keys of the workflow annotations of an element."""
+    tool = element.toolspecific
+    if not tool or not tool.is_woped():
+        return ()
+    keys: list[Hashable] = []
+    if tool.operator:
+        keys.append((OPERATOR, tool.operator.id))
+    if tool.subprocess:
+        keys.append(SUBPROCESS)
+    if tool.trigger:
+        if tool.trigger.type is not TriggerType.Resource:
+            keys.append((TRIGGER, tool.trigger.type))
+        elif tool.transitionResource:
+            resource = tool.transitionResource
+            keys.append((RESOURCE, resource.roleName, resource.organizationalUnitName))
+    return tuple(keys)
+
+
+def update_workflow_index(element: "NetElement"):
+    """Update the index of the net of an element after its annotations changed."""
+    index_reference = element.__dict__.get(INDEX_REFERENCE)
+    if index_reference is None:
+        return
+    index = index_reference()
+    if index is not None:
+        index.update(element)
+
+
+class WorkflowIndex:
+    """Workflow annotated elements of a net by annotation key."""
+
+    __slots__ = ("_elements", "_keys", "_entries", "__weakref__")
+
+    def __init__(self):
+        """Create an empty index."""
+        self._elements: dict[str, NetElement] = {}
+        self._keys: dict[str, tuple[Hashable, ...]] = {}
+        self._entries: dict[Hashable, dict[str, NetElement]] = {}
+
+    def __eq__(self, other: object):
+        """Return whether both indices have equal annotation keys by element ID."""
+        if not isinstance(other, WorkflowIndex):
+            return NotImplemented
+        return self._keys == other._keys
+
+    def __deepcopy__(self, memo: dict[int, Any]):
+        """Return an index of the copied elements."""
+        index = WorkflowIndex()
+        for element in self._elements.values():
+            index.add(deepcopy(element, memo))
+        return index
+
+    def add(self, element: "NetElement"):
+        """Index an element and follow changes of its annotations."""
+        self._elements[element.id] = element
+        element.__dict__[INDEX_REFERENCE] = ref(self)
+        self._add_keys(element)
+
+    def remove(self, element: "NetElement"):
+        """Remove an element from the index."""
+        if self._elements.get(element.id) is not element:
+            return
+        del self._elements[element.id]
+        element.__dict__.pop(INDEX_REFERENCE, None)
+        self._remove_keys(element.id)
+
+    def update(self, element: "NetElement"):
+        """Re-index the annotations of an indexed element."""
+        if self._elements.get(element.id) is not element:
+            return
+        self._remove_keys(element.id)
+        self._add_keys(element)
+
+    def _add_keys(self, element: "NetElement"):
+        """Add the element to the entries of its annotation keys."""
+        keys = get_annotation_keys(element)
+        if not keys:
+            return
+        self._keys[element.id] = keys
+        for key in keys:
+            self._entries.setdefault(key, {})[element.id] = element
+
+    def _remove_keys(self, id: str):
+        """Remove an element ID from the entries of its annotation keys."""
+        for key in self._keys.pop(id, ()):
+            entry = self._entries[key]
+            del entry[id]
+            if not entry:
+                del self._entries[key]
+
+    def _get(self, key: Hashable):
+        """Return the elements of an annotation key."""
+        return list(self._entries.get(key, {}).values())
+
+    def get_event_triggers(self, *trigger_types: TriggerType):
+        """Return the time/message triggers (all event triggers by default)."""
+        return [
+            element
+            for trigger_type in trigger_types or EVENT_TRIGGER_TYPES
+            for element in self._get((TRIGGER, trigger_type))
+        ]
+
+    def get_operators(self):
+        """Return the workflow operator elements grouped by operator ID."""
+        return {
+            key[1]: list(entry.values())
+            for key, entry in self._entries.items()
+            if isinstance(key, tuple) and key[0] == OPERATOR
+        }
+
+    def get_subprocesses(self):
+        """Return the workflow subprocess elements."""
+        return self._get(SUBPROCESS)
+
+    def get_resources(self):
+        """Return the workflow resource elements."""
+        return [
+            element
+            for key, entry in self._entries.items()
+            if isinstance(key, tuple) and key[0] == RESOURCE
+            for element in entry.values()
+        ]
+
+    def get_resources_by_role(self, role_name: str, organization: str):
+        """Return the workflow resource elements of a role in an organization."""
+        return self._get((RESOURCE, role_name, organization))
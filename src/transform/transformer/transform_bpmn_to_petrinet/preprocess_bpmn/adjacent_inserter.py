@@ -2,10 +2,13 @@
 
 from transformer.models.bpmn.base import Gateway, GenericBPMNNode
 from transformer.models.bpmn.bpmn import (
+    AndGateway,
     EndEvent,
     IntermediateCatchEvent,
+    OrGateway,
     Process,
     StartEvent,
+    XorGateway,
 )
 from transformer.utility.utility import create_silent_node_name
 
@@ -20,6 +23,14 @@ def is_place_like(node):
     return type(node) == GenericBPMNNode or isinstance(node, StartEvent | EndEvent)
 
 
+def has_target_wf_transitions(bpmn: Process):
+    """Return whether the process has nodes that will be workflow transitions."""
+    target_wf_transitions = bpmn.get_nodes_by_type(
+        Process, XorGateway, OrGateway, AndGateway, IntermediateCatchEvent
+    )
+    return len(target_wf_transitions) > 0
+
+
 def insert_temp_between_adjacent_mapped_transition(bpmn: Process):
     """Add helper Nodes.
 
@@ -28,12 +39,12 @@ def insert_temp_between_adjacent_mapped_transition(bpmn: Process):
     As a solution GenericBPMNNodes are inserted around each critical element.
     They will be transformed to Places as part of the transformation.
     """
-    nodes = bpmn._flatten_node_typ_map()
+    nodes = bpmn.get_nodes()
     for node in nodes:
         if not is_target_wf_transition(node):
             continue
 
-        for incoming_flow in bpmn.get_incoming(node.id).copy():
+        for incoming_flow in bpmn.get_incoming(node.id):
             incoming_node = bpmn.get_node(incoming_flow.sourceRef)
             # Connected node is already place like
             if is_place_like(incoming_node):
@@ -49,7 +60,7 @@ def insert_temp_between_adjacent_mapped_transition(bpmn: Process):
             bpmn.add_flow(incoming_node, linking_node)
             bpmn.add_flow(linking_node, node)
 
-        for outgoing_flow in bpmn.get_outgoing(node.id).copy():
+        for outgoing_flow in bpmn.get_outgoing(node.id):
             outgoing_node = bpmn.get_node(outgoing_flow.targetRef)
             # Connected node is already place like
             if is_place_like(outgoing_node):
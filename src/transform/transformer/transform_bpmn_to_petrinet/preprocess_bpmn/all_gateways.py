@@ -3,7 +3,13 @@
 from typing import cast
 
 from transformer.models.bpmn.base import Gateway, GenericBPMNNode
-from transformer.models.bpmn.bpmn import Flow, Process
+from transformer.models.bpmn.bpmn import (
+    AndGateway,
+    Flow,
+    OrGateway,
+    Process,
+    XorGateway,
+)
 
 
 def remove_unnecessary_gateways(bpmn: Process, gateways: set[Gateway]):
@@ -13,12 +19,12 @@ def remove_unnecessary_gateways(bpmn: Process, gateways: set[Gateway]):
     """
     to_remove_gws = []
     for gw in gateways:
-        if gw.get_in_degree() > 1 or gw.get_out_degree() > 1:
+        if bpmn.get_in_degree(gw) > 1 or bpmn.get_out_degree(gw) > 1:
             continue
         to_remove_gws.append(gw)
 
-        in_arc: Flow = list(bpmn.get_incoming(gw.id))[0]
-        out_arc: Flow = list(bpmn.get_outgoing(gw.id))[0]
+        in_arc: Flow = bpmn.get_incoming(gw.id)[0]
+        out_arc: Flow = bpmn.get_outgoing(gw.id)[0]
         source_node = bpmn.get_node(in_arc.sourceRef)
         target_node = bpmn.get_node(out_arc.targetRef)
 
@@ -50,11 +56,13 @@ def add_pn_place_between_adjacent_gateways(bpmn: Process, gateways: set[Gateway]
 
 def get_gateways(bpmn: Process):
     """Get all gateways of a process."""
-    nodes = bpmn._flatten_node_typ_map()
-    gateways = cast(
-        set[Gateway], {node for node in nodes if issubclass(type(node), Gateway)}
-    )
-    return gateways
+    nodes = bpmn.get_nodes_by_type(XorGateway, OrGateway, AndGateway)
+    return cast(set[Gateway], set(nodes))
+
+
+def has_gateways(bpmn: Process):
+    """Return whether the process has gateways."""
+    return len(bpmn.get_nodes_by_type(XorGateway, OrGateway, AndGateway)) > 0
 
 
 def preprocess_gateways(bpmn: Process):
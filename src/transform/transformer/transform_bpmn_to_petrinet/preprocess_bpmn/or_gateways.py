@@ -1,5 +1,6 @@
 """Transform OR-Gates into a combination of AND- and XOR-Gates."""
 
+from collections.abc import Sequence
 from typing import cast
 
 from exceptions import ORGatewayDetectionIssue
@@ -15,40 +16,52 @@ from transformer.models.bpmn.bpmn import (
 from transformer.utility.utility import create_arc_name
 
 
-def traverse_matching_gw(
-    bpmn_helper: Process,
-    stack: list[OrGateway],
-    split_ids: set[str],
-    join_ids: set[str],
-    visited_arcs: set[str],
-    flow_id: str,
-):
-    """Find the OR-Join of a OR-Split."""
-    if flow_id in visited_arcs:
-        # already visited arc -> circle detected
-        return None
-    visited_arcs.add(flow_id)
-
-    target_node: GenericBPMNNode = bpmn_helper.get_flow_target_by_id(flow_id)
-    if target_node.id in join_ids:
-        if len(stack) == 1:
-            # matching join found
-            return flow_id, cast(OrGateway, target_node)
-        else:
-            # join for inner split found
-            stack.pop()
-
-    if target_node.id in split_ids:
-        stack.append(cast(OrGateway, target_node))
-
-    outgoing_arcs: list[str] = [x for x in target_node.outgoing]
-    for flow_id in outgoing_arcs:
-        r = traverse_matching_gw(
-            bpmn_helper, stack, split_ids, join_ids, visited_arcs, flow_id
-        )
-        if r is not None:
-            return r
-    return None
+# Stack of the open OR-split branches of a flow as persistent linked list:
+# ((split id, outgoing flow id of the split), parent stack) or None if empty.
+BranchStack = tuple[tuple[str, str], "BranchStack"] | None
+
+
+def match_branches(
+    bpmn_helper: Process, split_ids: set[str], join_ids: set[str]
+) -> dict[tuple[str, str], str]:
+    """Return the incoming join flow of each OR-split branch (by split and flow id).
+
+    Single iterative pass over the flows of the process in which each flow is
+    labeled with the stack of the OR-split branches it is nested in, like brackets.
+    A split pushes one branch per outgoing flow and a join pops the innermost branch
+    of each incoming flow, which matches this branch with the join flow. Each node
+    is expanded once by the label of the first reaching flow, so the pass is linear
+    in the number of flows. For well-structured processes (single entry single exit
+    regions) every flow into a node has the same label, which includes loops whose
+    back edges lead into XOR-joins.
+    """
+    matches: dict[tuple[str, str], str] = {}
+    expanded: set[str] = set()
+    worklist: list[tuple[Flow, BranchStack]] = []
+
+    def expand(node_id: str, stack: BranchStack):
+        expanded.add(node_id)
+        is_split = node_id in split_ids
+        for flow in bpmn_helper.get_outgoing(node_id):
+            worklist.append((flow, ((node_id, flow.id), stack) if is_split else stack))
+
+    # Start at the nodes without incoming flows, then at nodes only on cycles
+    nodes = bpmn_helper.get_nodes()
+    roots = [n.id for n in nodes if bpmn_helper.get_in_degree(n) == 0]
+    roots.extend(n.id for n in nodes)
+    for root_id in roots:
+        if root_id in expanded:
+            continue
+        expand(root_id, None)
+        while worklist:
+            flow, stack = worklist.pop()
+            target_id = flow.targetRef
+            if target_id in join_ids and stack is not None:
+                branch, stack = stack
+                matches.setdefault(branch, flow.id)
+            if target_id not in expanded:
+                expand(target_id, stack)
+    return matches
 
 
 class InclusiveGatewayBridge:
@@ -85,32 +98,33 @@ class ParallelGatewayBridge:
         self.flow_in_join = flow_in_join
 
 
-def find_matching_gateways(bpmn_helper: Process, inclusive_gateways: list[OrGateway]):
+def find_matching_gateways(
+    bpmn_helper: Process, inclusive_gateways: Sequence[OrGateway]
+):
     """Match splits and joins of a set of gateways and process."""
     matches: list[InclusiveGatewayBridge] = []
     splits: list[OrGateway] = []
     joins: list[OrGateway] = []
     for gateway in inclusive_gateways:
-        if gateway.get_in_degree() > 1:
+        if bpmn_helper.get_in_degree(gateway) > 1:
             joins.append(gateway)
-        if gateway.get_out_degree() > 1:
+        if bpmn_helper.get_out_degree(gateway) > 1:
             splits.append(gateway)
     split_ids = {node.id for node in splits}
     join_ids = {node.id for node in joins}
+    branch_matches = match_branches(bpmn_helper, split_ids, join_ids)
     for split in splits:
-        outgoing_flows: list[str] = [x for x in split.outgoing]
-        for out_flow_id in outgoing_flows:
-            r = traverse_matching_gw(
-                bpmn_helper, [split], split_ids, join_ids, set(), out_flow_id
-            )
-            if r is None:
+        for out_flow in bpmn_helper.get_outgoing(split.id):
+            in_join_flow_id = branch_matches.get((split.id, out_flow.id))
+            if in_join_flow_id is None:
                 raise ORGatewayDetectionIssue()
+            in_join_flow = bpmn_helper.get_flow(in_join_flow_id)
             matches.append(
                 InclusiveGatewayBridge(
                     split,
-                    r[1],
-                    bpmn_helper.get_flow(out_flow_id),
-                    bpmn_helper.get_flow(r[0]),
+                    cast(OrGateway, bpmn_helper.get_node(in_join_flow.targetRef)),
+                    out_flow,
+                    in_join_flow,
                 )
             )
     return matches
@@ -186,8 +200,8 @@ def replace_inclusive_to_parallel(bpmn: Process, gw: OrGateway):
     flow_map: dict[str, Flow] = {}
     pw_gw = AndGateway(id="OR" + gw.id)
     bpmn.add_node(pw_gw)
-    in_arcs: set[Flow] = bpmn.get_incoming(gw.id).copy()
-    out_arcs: set[Flow] = bpmn.get_outgoing(gw.id).copy()
+    in_arcs = bpmn.get_incoming(gw.id)
+    out_arcs = bpmn.get_outgoing(gw.id)
     for arc in in_arcs:
         bpmn.remove_flow(arc)
         new_arc = bpmn.add_flow(
@@ -229,12 +243,14 @@ def inclusive_gws_to_parallel_gws(bpmn: Process, gws: list[InclusiveGatewayBridg
     return new_bridges
 
 
+def has_inclusive_gateways(bpmn: Process):
+    """Return whether the process has OR gateways."""
+    return len(bpmn.get_nodes_by_type(OrGateway)) > 0
+
+
 def replace_inclusive_gateways(in_bpmn: Process):
     """Replace OR gateways with a combination of AND- and XOR-Gateways."""
-    nodes = in_bpmn._flatten_node_typ_map()
-    inclusive_gateways: list[OrGateway] = [
-        node for node in nodes if isinstance(node, OrGateway)
-    ]
+    inclusive_gateways = cast(Sequence[OrGateway], in_bpmn.get_nodes_by_type(OrGateway))
     if len(inclusive_gateways) == 0:
         return
 
@@ -1,6 +1,6 @@
 """Methods to initiate a bpmn to petri net transformation."""
 
-from collections.abc import Callable
+from contextlib import nullcontext
 
 from exceptions import InternalTransformationException
 from transformer.models.bpmn.base import Gateway, GenericBPMNNode
@@ -33,19 +33,44 @@ from transformer.transform_bpmn_to_petrinet.transform_workflow_helper import (
     handle_subprocesses,
     handle_triggers,
 )
-from transformer.utility.pnml import find_triggers
+from transformer.utility.memo import is_preprocessing_deferred
+from transformer.utility.passes import (
+    Pass,
+    PassModel,
+    PassStats,
+    collect_pass_stats,
+    run_passes,
+)
+from transformer.utility.stages import Stage, run_stage
 from transformer.utility.utility import create_silent_node_name
 
 
+WORKFLOW_SPLITS = {WorkflowBranchingType.XorSplit, WorkflowBranchingType.AndSplit}
+WORKFLOW_JOINS = {
+    WorkflowBranchingType.XorJoin,
+    WorkflowBranchingType.AndJoin,
+    WorkflowBranchingType.XorJoinAndSplit,
+    WorkflowBranchingType.AndJoinXorSplit,
+    WorkflowBranchingType.XorJoinSplit,
+    WorkflowBranchingType.AndJoinSplit,
+}
+
+
 def merge_single_triggers(net: Net):
     """If trigger transition is before a non-trigger merge both elements.
 
     Place -> Trigger Transition -> Place -> Non-trigger transition
     to
     Place -> Merged transition
+
+    The triggers of the workflow index are processed once as a worklist (merged
+    transitions are not merged again). The incoming arc of a merged trigger is
+    reconnected in place to the first merged transition.
     """
-    triggers = find_triggers(net)
-    for trigger in triggers:
+    worklist = net.workflow_index.get_event_triggers()
+    worklist.reverse()
+    while worklist:
+        trigger = worklist.pop()
         # not clear how to merge a trigger if it is a split/join itself
         if net.get_out_degree(trigger) > 1 or net.get_in_degree(trigger) > 1:
             continue
@@ -54,26 +79,21 @@ def merge_single_triggers(net: Net):
         if net.get_out_degree(trigger) == 0:
             continue
 
-        connecting_place = net.get_element(list(net.get_outgoing(trigger.id))[0].target)
+        (trigger_arc,) = net.get_outgoing(trigger.id)
+        connecting_place = net.get_element(trigger_arc.target)
+        place_arcs = net.get_outgoing(connecting_place.id)
 
         # no following element to merge with
-        if net.get_out_degree(connecting_place) == 0:
+        if not place_arcs:
             continue
 
         # not clear how to merge the following element of a split/join place
-        target_transitions = [
-            net.get_element(x.target) for x in net.get_outgoing(id=connecting_place.id)
-        ]
+        target_transitions = [net.get_element(arc.target) for arc in place_arcs]
         place_is_before_wf_split = all(
-            [
-                x.get_workflow_operator_type()
-                in {WorkflowBranchingType.XorSplit, WorkflowBranchingType.AndSplit}
-                for x in target_transitions
-            ]
+            x.get_workflow_operator_type() in WORKFLOW_SPLITS for x in target_transitions
         )
         if not place_is_before_wf_split and (
-            net.get_out_degree(connecting_place) > 1
-            or net.get_in_degree(connecting_place) > 1
+            len(place_arcs) > 1 or net.get_in_degree(connecting_place) > 1
         ):
             continue
 
@@ -88,19 +108,13 @@ def merge_single_triggers(net: Net):
 
         # not clear how to merge the target if it is a join itself
         # Also check WF joins
-        if net.get_in_degree(
-            target_transition
-        ) > 1 or target_transition.get_workflow_operator_type() in {
-            WorkflowBranchingType.XorJoin,
-            WorkflowBranchingType.AndJoin,
-            WorkflowBranchingType.XorJoinAndSplit,
-            WorkflowBranchingType.AndJoinXorSplit,
-            WorkflowBranchingType.XorJoinSplit,
-            WorkflowBranchingType.AndJoinSplit,
-        }:
+        if (
+            net.get_in_degree(target_transition) > 1
+            or target_transition.get_workflow_operator_type() in WORKFLOW_JOINS
+        ):
             continue
 
-        incoming_trigger_arcs = net.get_incoming_and_remove_arcs(trigger)
+        incoming_trigger_arcs = net.get_incoming(trigger.id)
         net.remove_element_with_connecting_arcs(connecting_place)
         net.remove_element(trigger)
 
@@ -111,8 +125,11 @@ def merge_single_triggers(net: Net):
             for transition in target_transitions:
                 transition.mark_as_workflow_time()
 
-        for transition in target_transitions:
-            net.connect_to_element(transition, incoming_trigger_arcs)
+        for arc in incoming_trigger_arcs:
+            source = net.get_element(arc.source)
+            for transition in target_transitions[1:]:
+                net.add_arc(source, transition)
+            net.reconnect_arc(arc, source, target_transition)
 
 
 def transform_bpmn_to_petrinet(
@@ -123,7 +140,7 @@ def transform_bpmn_to_petrinet(
     pnml = Pnml.generate_empty_net(bpmn.id)
     net = pnml.net
 
-    nodes = set(bpmn._flatten_node_typ_map())
+    nodes = set(bpmn.get_nodes())
 
     # find workflow specific nodes
     to_handle_gateways: list[Gateway] = []
@@ -153,8 +170,8 @@ def transform_bpmn_to_petrinet(
                     name=(
                         node.name
                         if node.name != ""
-                        or node.get_in_degree() > 1
-                        or node.get_out_degree() > 1
+                        or bpmn.get_in_degree(node) > 1
+                        or bpmn.get_out_degree(node) > 1
                         else None
                     ),
                 )
@@ -162,13 +179,18 @@ def transform_bpmn_to_petrinet(
         elif isinstance(
             node, OrGateway | XorGateway | StartEvent | EndEvent | GenericBPMNNode
         ):
-            net.add_element(Place(id=node.id))
+            net.add_element(Place.create(node.id))
         else:
             raise InternalTransformationException(f"{type(node)} not supported")
 
     # handle workflow specific nodes
     handle_subprocesses(
-        net, bpmn, to_handle_subprocesses, organization, transform_bpmn_to_petrinet
+        net,
+        bpmn,
+        to_handle_subprocesses,
+        organization,
+        transform_bpmn_to_petrinet,
+        preprocess_subprocess,
     )
     handle_triggers(net, bpmn, to_handle_triggers)
     handle_gateways(net, bpmn, to_handle_gateways)
@@ -184,12 +206,14 @@ def transform_bpmn_to_petrinet(
             continue
         if isinstance(source, Place) and isinstance(target, Place):
             t = net.add_element(
-                Transition(id=create_silent_node_name(source.id, target.id))
+                Transition.create(create_silent_node_name(source.id, target.id))
             )
             net.add_arc(source, t)
             net.add_arc(t, target)
         elif isinstance(source, Transition) and isinstance(target, Transition):
-            p = net.add_element(Place(id=create_silent_node_name(source.id, target.id)))
+            p = net.add_element(
+                Place.create(create_silent_node_name(source.id, target.id))
+            )
             net.add_arc(source, p)
             net.add_arc(p, target)
         else:
@@ -201,36 +225,71 @@ def transform_bpmn_to_petrinet(
     return pnml
 
 
-def apply_preprocessing(bpmn: Process, funcs: list[Callable[[Process], None]]):
-    """Recursively apply preprocessing to each process and subprocess."""
-    for p in bpmn.subprocesses:
-        apply_preprocessing(p, funcs)
+PREPROCESSING_PASSES: list[Pass[Process, GenericBPMNNode]] = [
+    Pass(
+        or_gateways.replace_inclusive_gateways,
+        needs=or_gateways.has_inclusive_gateways,
+    ),
+    Pass(all_gateways.preprocess_gateways, needs=all_gateways.has_gateways),
+    Pass(
+        adjacent_inserter.insert_temp_between_adjacent_mapped_transition,
+        needs=adjacent_inserter.has_target_wf_transitions,
+    ),
+]
 
-    for f in funcs:
-        f(bpmn)
 
+def get_sequential_subprocesses(bpmn: Process):
+    """Return the subprocesses that are not preprocessed with their transformation."""
+    if is_preprocessing_deferred(len(bpmn.subprocesses)):
+        return set()
+    return bpmn.subprocesses
 
-def bpmn_to_workflow_net(bpmn: BPMN):
-    """Return a processed and transformed workflow net of process."""
-    create_participant_mapping(bpmn.process)
 
-    apply_preprocessing(
-        bpmn.process,
-        [
-            or_gateways.replace_inclusive_gateways,
-            all_gateways.preprocess_gateways,
-            adjacent_inserter.insert_temp_between_adjacent_mapped_transition,
-        ],
-    )
-    organization_name = (
-        bpmn.collaboration.participant.name or "Default"
-        if bpmn.collaboration and bpmn.collaboration.participant
-        else "Default"
-    )
-    pnml = transform_bpmn_to_petrinet(bpmn.process, organization_name)
-    set_global_toolspecifi(
-        pnml.net, bpmn.process._participant_mapping, organization_name
-    )
+PROCESS_PASS_MODEL: PassModel[Process, GenericBPMNNode] = PassModel(
+    get_id=lambda bpmn: bpmn.id,
+    get_children=get_sequential_subprocesses,
+    get_elements=lambda bpmn: bpmn.get_nodes(),
+    count=lambda bpmn: (len(bpmn.get_nodes()), len(bpmn.flows)),
+)
+
+
+def apply_preprocessing(bpmn: Process, passes: list[Pass[Process, GenericBPMNNode]]):
+    """Recursively apply preprocessing to each process and subprocess.
+
+    Passes without inputs in a (sub)process are skipped. Subprocesses handled in the
+    process pool or with the memo are preprocessed with their transformation.
+    Returns the statistics of each pass.
+    """
+    return run_passes(bpmn, passes, PROCESS_PASS_MODEL)
+
+
+def preprocess_subprocess(bpmn: Process):
+    """Apply the preprocessing to a subprocess (and children)."""
+    apply_preprocessing(bpmn, PREPROCESSING_PASSES)
+
+
+def bpmn_to_workflow_net(bpmn: BPMN, pass_stats: list[PassStats] | None = None):
+    """Return a processed and transformed workflow net of process.
+
+    Args:
+        bpmn: The BPMN to transform.
+        pass_stats: Optional list to collect the statistics of the preprocessing.
+    """
+    with nullcontext() if pass_stats is None else collect_pass_stats(pass_stats):
+        with run_stage(Stage.Preprocess):
+            create_participant_mapping(bpmn.process)
+            apply_preprocessing(bpmn.process, PREPROCESSING_PASSES)
+
+        organization_name = (
+            bpmn.collaboration.participant.name or "Default"
+            if bpmn.collaboration and bpmn.collaboration.participant
+            else "Default"
+        )
+        with run_stage(Stage.Transform):
+            pnml = transform_bpmn_to_petrinet(bpmn.process, organization_name)
+            set_global_toolspecifi(
+                pnml.net, bpmn.process._participant_mapping, organization_name
+            )
     return pnml
 
 
@@ -26,10 +26,13 @@ from transformer.models.pnml.pnml import (
 )
 from transformer.models.pnml.workflow import WorkflowBranchingType
 from transformer.utility.bpmn import find_end_events, find_start_events
-from transformer.utility.utility import (
-    create_arc_name, 
-    create_silent_node_name 
+from transformer.utility.memo import (
+    create_memo_key,
+    is_preprocessing_deferred,
+    map_memoized,
 )
+from transformer.utility.parallel import is_parallel, run_in_pool
+from transformer.utility.utility import create_arc_name, create_silent_node_name
 
 
 def create_workflow_operator_helper_transition(
@@ -183,7 +186,7 @@ def handle_gateway(net: Net, bpmn: Process, node: GenericBPMNNode):
     """Transform a gateway to workflow operator."""
     node_type = type(node)
     f_split, f_join, f_split_join = type_map[node_type]  # type: ignore
-    in_degree, out_degree = node.get_in_degree(), node.get_out_degree()
+    in_degree, out_degree = bpmn.get_in_degree(node), bpmn.get_out_degree(node)
     in_flows, out_flows = bpmn.get_incoming(node.id), bpmn.get_outgoing(node.id)
     source_ids, target_ids = (
         [f.sourceRef for f in in_flows],
@@ -238,16 +241,48 @@ def handle_triggers(net: Net, bpmn: Process, triggers: list[IntermediateCatchEve
             raise UnknownIntermediateCatchEvent()
 
 
+def transform_subprocess(
+    subprocess: Process,
+    outer_in_id: str,
+    outer_out_id: str,
+    organization: str,
+    caller_func: Callable[[Process, str], Pnml],
+    preprocess_func: Callable[[Process], object] | None = None,
+):
+    """Transform the inner subprocess with the IDs of the outer connecting places.
+
+    Optionally the subprocess is preprocessed first (if it is not yet preprocessed).
+    """
+    if preprocess_func is not None:
+        preprocess_func(subprocess)
+
+    sub_se, sub_ee = find_start_events(subprocess)[0], find_end_events(subprocess)[0]
+    subprocess.change_node_id(sub_se, outer_in_id)
+    subprocess.change_node_id(sub_ee, outer_out_id)
+
+    inner_net = caller_func(subprocess, organization).net
+    inner_net.id = None
+    return inner_net
+
+
 def handle_subprocesses(
     net: Net,
     bpmn: Process,
     subprocesses: list[Process],
     organization: str,
     caller_func: Callable[[Process, str], Pnml],
+    preprocess_func: Callable[[Process], object],
 ):
-    """Transform a BPMN subprocess to workflow subprocess."""
+    """Transform a BPMN subprocess to workflow subprocess.
+
+    Sibling subprocesses are preprocessed and transformed in the process pool if the
+    parallel execution is active (see `is_parallel`). Subprocesses transformed before
+    in the same context are taken from the memo (see `map_memoized`). Otherwise the
+    subprocesses are expected to be preprocessed already.
+    """
+    jobs: list[tuple[Process, str, str]] = []
     for subprocess in subprocesses:
-        if subprocess.get_in_degree() != 1 or subprocess.get_out_degree() != 1:
+        if bpmn.get_in_degree(subprocess) != 1 or bpmn.get_out_degree(subprocess) != 1:
             raise WrongSubprocessDegree()
 
         subprocess_transition = net.add_element(
@@ -260,8 +295,8 @@ def handle_subprocesses(
         # outgoing node of the subprocess
 
         outer_in_flows, outer_out_flows = (
-            list(bpmn.get_incoming(subprocess.id)),
-            list(bpmn.get_outgoing(subprocess.id)),
+            bpmn.get_incoming(subprocess.id),
+            bpmn.get_outgoing(subprocess.id),
         )
 
         outer_in_id, outer_out_id = (
@@ -283,14 +318,32 @@ def handle_subprocesses(
                 subprocess_transition.id, outer_out.id
             )
 
-        sub_se, sub_ee = find_start_events(subprocess)[0], find_end_events(subprocess)[0]
-        subprocess.change_node_id(sub_se, outer_in_id)
-        subprocess.change_node_id(sub_ee, outer_out_id)
+        jobs.append((subprocess, outer_in_id, outer_out_id))
+
+    # transform inner subprocesses
+    siblings = len(bpmn.subprocesses)
+    preprocess = preprocess_func if is_preprocessing_deferred(siblings) else None
+
+    def transform_jobs(jobs: list[tuple[Process, str, str]]):
+        args = [(*job, organization, caller_func, preprocess) for job in jobs]
+        if is_parallel(siblings):
+            return run_in_pool(transform_subprocess, args)
+        return [transform_subprocess(*job_args) for job_args in args]
+
+    def get_memo_key(job: tuple[Process, str, str]):
+        subprocess, outer_in_id, outer_out_id = job
+        return create_memo_key(
+            subprocess,
+            caller_func.__name__,
+            outer_in_id,
+            outer_out_id,
+            organization,
+            sorted(subprocess._participant_mapping.items()),
+        )
 
-        # transform inner subprocess
-        inner_net = caller_func(subprocess, organization).net
-        inner_net.id = None
+    inner_nets = map_memoized(transform_jobs, jobs, get_memo_key)
 
+    for (subprocess, _, _), inner_net in zip(jobs, inner_nets):
         net.add_page(Page(id=subprocess.id, net=inner_net))
 
 
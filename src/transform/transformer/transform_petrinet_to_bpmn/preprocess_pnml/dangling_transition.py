@@ -3,10 +3,18 @@
 A dangling transitions has a input degree and/or output degree of 0.
 """
 
+from transformer.models.pnml.base import NetElement
 from transformer.models.pnml.pnml import Net, Place, Transition
 from transformer.utility.pnml import generate_sink_id, generate_source_id
 
 
+def is_dangling_transition(net: Net, element: NetElement):
+    """Return whether the element is a transition without incoming or outgoing arcs."""
+    return isinstance(element, Transition) and (
+        net.get_in_degree(element) == 0 or net.get_out_degree(element) == 0
+    )
+
+
 def handle_dangling_sources(net: Net, sources: list[Transition]):
     """Prepends a place to each source."""
     for source in sources:
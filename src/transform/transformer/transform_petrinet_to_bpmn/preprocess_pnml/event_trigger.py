@@ -75,6 +75,11 @@ def handle_join_split(net: Net, trigger: NetElement):
     net.connect_from_element(and_end_gateway, outgoing_arcs)
 
 
+def has_event_triggers(net: Net):
+    """Return whether the net has event triggers."""
+    return len(find_triggers(net)) > 0
+
+
 def split_event_triggers(net: Net):
     """Split the event triggers into a net and helper element."""
     triggers = find_triggers(net)
@@ -1,10 +1,20 @@
 """Split a AND transition with a name (implicit task)."""
 
 from exceptions import InternalTransformationException
+from transformer.models.pnml.base import NetElement
 from transformer.models.pnml.pnml import Net, Transition
 from transformer.utility.pnml import generate_explicit_transition_id
 
 
+def is_named_and_gateway(net: Net, element: NetElement):
+    """Return whether the element is a split/join transition with a name."""
+    return (
+        isinstance(element, Transition)
+        and (net.get_in_degree(element) > 1 or net.get_out_degree(element) > 1)
+        and bool(element.get_name())
+    )
+
+
 def handle_gateway_creation(and_gateway: Transition):
     """Handle the creation of the explicit task of the gateway.
 
@@ -17,7 +27,7 @@ def handle_gateway_creation(and_gateway: Transition):
     # Should the gateway be a message/time remove the toolspecific data
     # If it has as ressource trigger keep it to also add it to the BPMN Lanes
     if and_gateway.is_workflow_event_trigger():
-        and_gateway.toolspecific = None
+        and_gateway.remove_toolspecific()
 
     return explicit_transition
 
@@ -84,11 +94,7 @@ def split_and_gw_with_name(net: Net):
 
     This function also looks at possible Toolspecific annotations.
     """
-    and_gateways = [
-        t
-        for t in net.transitions
-        if (net.get_in_degree(t) > 1 or net.get_out_degree(t) > 1) and t.get_name()
-    ]
+    and_gateways = [t for t in net.transitions if is_named_and_gateway(net, t)]
     for and_gateway in and_gateways:
         in_degree = net.get_in_degree(and_gateway)
         out_degree = net.get_out_degree(and_gateway)
@@ -74,7 +74,7 @@ def handle_combined_operator(net: Net, wo: WorkflowOperatorWrapper):
             )
             secondGatewayPart.set_copy_of_exisiting_toolspecific(toolspecific)
             if toolspecific.is_workflow_event_trigger():
-                firstGatewayPart.toolspecific = None
+                firstGatewayPart.remove_toolspecific()
 
             # Change ID of first gateway because of split
             gw_type = "XOR" if wo.t == WorkflowBranchingType.XorJoinSplit else "AND"
@@ -111,8 +111,8 @@ def handle_combined_operator(net: Net, wo: WorkflowOperatorWrapper):
     explicit_task.set_copy_of_exisiting_toolspecific(toolspecific)
     # Eventtrigger already handled by explicit task
     if toolspecific.is_workflow_event_trigger():
-        firstGatewayPart.toolspecific = None
-        secondGatewayPart.toolspecific = None
+        firstGatewayPart.remove_toolspecific()
+        secondGatewayPart.remove_toolspecific()
 
     net.add_element(explicit_task)
     net.add_arc(firstGatewayPart, explicit_task)
@@ -166,7 +166,7 @@ def handle_single_operator(net: Net, wo: WorkflowOperatorWrapper):
         explicit_task.set_copy_of_exisiting_toolspecific(toolspecific)
         # Eventtrigger already handled by explicit task
         if toolspecific.is_workflow_event_trigger():
-            new_gateway.toolspecific = None
+            new_gateway.remove_toolspecific()
 
         net.add_element(explicit_task)
         net.add_arc(new_gateway, explicit_task)
@@ -193,7 +193,7 @@ def handle_single_operator(net: Net, wo: WorkflowOperatorWrapper):
         explicit_task.set_copy_of_exisiting_toolspecific(toolspecific)
         # Eventtrigger already handled by explicit task
         if toolspecific.is_workflow_event_trigger():
-            new_gateway.toolspecific = None
+            new_gateway.remove_toolspecific()
 
         net.add_element(explicit_task)
         net.add_arc(explicit_task, new_gateway)
@@ -208,6 +208,11 @@ def handle_single_operator(net: Net, wo: WorkflowOperatorWrapper):
             net.remove_arc(incoming_arc)
 
 
+def has_workflow_operators(net: Net):
+    """Return whether the net has workflow operators."""
+    return len(net.workflow_index.get_operators()) > 0
+
+
 def handle_workflow_operators(net: Net):
     """Handle workflowoperators by replacing them with temp nodes and extracting task."""
     wf_operators = find_workflow_operators(net)
@@ -1,17 +1,18 @@
 """Initiate the preprocessing and transformation of pnml to bpmn."""
 
-from collections.abc import Callable
+from contextlib import nullcontext
 
-from transformer.models.bpmn.base import Gateway
 from transformer.models.bpmn.bpmn import (
     BPMN,
     AndGateway,
     EndEvent,
+    OrGateway,
     Process,
     StartEvent,
     Task,
     XorGateway,
 )
+from transformer.models.pnml.base import NetElement
 from transformer.models.pnml.pnml import Net, Pnml
 from transformer.models.pnml.transform_helper import (
     GatewayHelperPNML,
@@ -31,6 +32,15 @@ from transformer.transform_petrinet_to_bpmn.workflow_helper import (
     handle_workflow_operators,
     handle_workflow_subprocesses,
 )
+from transformer.utility.memo import is_preprocessing_deferred
+from transformer.utility.passes import (
+    Pass,
+    PassModel,
+    PassStats,
+    collect_pass_stats,
+    run_passes,
+)
+from transformer.utility.stages import Stage, run_stage
 from transformer.utility.utility import create_arc_name
 
 
@@ -44,32 +54,29 @@ def remove_silent_tasks(bpmn: Process):
 
 
 def remove_unnecessary_gateways(bpmn: Process):
-    """Remove unnecessary gateways (In and out degree == 1)."""
-    is_rerun_reduce = True
-    while is_rerun_reduce:
-        is_rerun_reduce = False
-
-        gw_nodes = [
-            node
-            for node in bpmn._flatten_node_typ_map()
-            if issubclass(type(node), Gateway)
-        ]
-        for gw_node in gw_nodes:
-            if gw_node.get_in_degree() > 1 or gw_node.get_out_degree() > 1:
-                continue
-            if gw_node.get_in_degree() == 0 or gw_node.get_out_degree() == 0:
-                continue
-
-            source_id, target_id = bpmn.remove_node_with_connecting_flows(gw_node)
-            new_flow_id = create_arc_name(source_id, target_id)
-            if new_flow_id in bpmn._temp_flows:
-                continue
-
-            bpmn.add_flow(
-                bpmn.get_node(source_id), bpmn.get_node(target_id), id=new_flow_id
-            )
-
-            is_rerun_reduce = True
+    """Remove unnecessary gateways (In and out degree == 1).
+
+    Worklist of gateways to check, starting with all gateways. Removing a gateway
+    only changes the degrees of its neighbours (if the bridging flow already
+    exists), so only neighbouring gateways are checked again.
+    """
+    gateway_types = (XorGateway, OrGateway, AndGateway)
+    worklist = list(reversed(bpmn.get_nodes_by_type(*gateway_types)))
+    while worklist:
+        gw_node = worklist.pop()
+        if not bpmn.is_node_existing(gw_node.id):
+            continue
+        if bpmn.get_in_degree(gw_node) != 1 or bpmn.get_out_degree(gw_node) != 1:
+            continue
+
+        source_id, target_id = bpmn.remove_node_with_connecting_flows(gw_node)
+        source, target = bpmn.get_node(source_id), bpmn.get_node(target_id)
+        new_flow_id = create_arc_name(source_id, target_id)
+        if bpmn.is_flow_existing(new_flow_id):
+            worklist.extend(n for n in (target, source) if isinstance(n, gateway_types))
+            continue
+
+        bpmn.add_flow(source, target, id=new_flow_id)
 
 
 def transform_petrinet_to_bpmn(net: Net):
@@ -85,22 +92,18 @@ def transform_petrinet_to_bpmn(net: Net):
     transitions.difference_update(to_handle_subprocesses)
 
     to_handle_temp_gateways = [
-        elem
-        for elem in net._flatten_node_typ_map()
-        if isinstance(elem, GatewayHelperPNML)
+        elem for elem in net.get_elements() if isinstance(elem, GatewayHelperPNML)
     ]
 
     to_handle_temp_triggers = [
-        elem
-        for elem in net._flatten_node_typ_map()
-        if isinstance(elem, TriggerHelperPNML)
+        elem for elem in net.get_elements() if isinstance(elem, TriggerHelperPNML)
     ]
 
     # Only transitions could be  be mapped to usertasks
     to_handle_temp_resources = [
         transition
-        for transition in transitions
-        if transition.is_workflow_resource()
+        for transition in net.workflow_index.get_resources()
+        if transition in transitions
         and net.get_in_degree(transition) <= 1
         and net.get_out_degree(transition) <= 1
     ]
@@ -136,13 +139,13 @@ def transform_petrinet_to_bpmn(net: Net):
     handle_workflow_operators(bpmn, to_handle_temp_gateways)
     handle_event_triggers(bpmn, to_handle_temp_triggers)
     handle_workflow_subprocesses(
-        net, bpmn, to_handle_subprocesses, transform_petrinet_to_bpmn
+        net, bpmn, to_handle_subprocesses, transform_petrinet_to_bpmn, preprocess_page
     )
 
     # handle remaining arcs
     for arc in net.arcs:
-        source_in_nodes = arc.source in net._temp_elements
-        target_in_nodes = arc.target in net._temp_elements
+        source_in_nodes = net.get_node_or_none(arc.source) is not None
+        target_in_nodes = net.get_node_or_none(arc.target) is not None
         if not source_in_nodes or not target_in_nodes:
             continue
         source = bpmn.get_node(arc.source)
@@ -156,28 +159,66 @@ def transform_petrinet_to_bpmn(net: Net):
     return bpmn_general
 
 
-def apply_preprocessing(net: Net, funcs: list[Callable[[Net], None]]):
-    """Recursively apply each preprocessing to the net and each page."""
-    for p in net.pages:
-        apply_preprocessing(p.net, funcs)
+PREPROCESSING_PASSES: list[Pass[Net, NetElement]] = [
+    Pass(
+        dangling_transition.add_places_at_dangling_transitions,
+        needs_element=dangling_transition.is_dangling_transition,
+    ),
+    Pass(
+        workflow_operators.handle_workflow_operators,
+        needs=workflow_operators.has_workflow_operators,
+    ),
+    Pass(
+        vanilla_gateway_transition.split_and_gw_with_name,
+        needs_element=vanilla_gateway_transition.is_named_and_gateway,
+    ),
+    Pass(event_trigger.split_event_triggers, needs=event_trigger.has_event_triggers),
+]
+
+
+def get_sequential_page_nets(net: Net):
+    """Return the page nets that are not preprocessed with their transformation."""
+    if is_preprocessing_deferred(len(net.pages)):
+        return []
+    return [page.net for page in net.pages]
+
+
+NET_PASS_MODEL: PassModel[Net, NetElement] = PassModel(
+    get_id=lambda net: net.id,
+    get_children=get_sequential_page_nets,
+    get_elements=lambda net: net.get_elements(),
+    count=lambda net: (len(net.get_elements()), len(net.arcs)),
+)
 
-    for f in funcs:
-        f(net)
 
+def apply_preprocessing(net: Net, passes: list[Pass[Net, NetElement]]):
+    """Recursively apply each preprocessing to the net and each page.
 
-def pnml_to_bpmn(pnml: Pnml):
-    """Process and transform a petri net to bpmn."""
+    Passes without inputs in a net are skipped. Pages handled in the process pool or
+    with the memo are preprocessed with their transformation. Returns the statistics
+    of each pass.
+    """
+    return run_passes(net, passes, NET_PASS_MODEL)
+
+
+def preprocess_page(net: Net):
+    """Apply the preprocessing to the net of a page (and its pages)."""
+    apply_preprocessing(net, PREPROCESSING_PASSES)
+
+
+def pnml_to_bpmn(pnml: Pnml, pass_stats: list[PassStats] | None = None):
+    """Process and transform a petri net to bpmn.
+
+    Args:
+        pnml: The petri net to transform.
+        pass_stats: Optional list to collect the statistics of the preprocessing.
+    """
     net = pnml.net
 
-    apply_preprocessing(
-        net,
-        [
-            dangling_transition.add_places_at_dangling_transitions,
-            workflow_operators.handle_workflow_operators,
-            vanilla_gateway_transition.split_and_gw_with_name,
-            event_trigger.split_event_triggers,
-        ],
-    )
-    bpmn = transform_petrinet_to_bpmn(net)
-    annotate_resources(net, bpmn)
+    with nullcontext() if pass_stats is None else collect_pass_stats(pass_stats):
+        with run_stage(Stage.Preprocess):
+            apply_preprocessing(net, PREPROCESSING_PASSES)
+        with run_stage(Stage.Transform):
+            bpmn = transform_petrinet_to_bpmn(net)
+            annotate_resources(net, bpmn)
     return bpmn
@@ -32,6 +32,12 @@ from transformer.models.pnml.transform_helper import (
     XORHelperPNML,
 )
 from transformer.models.pnml.workflow import WorkflowBranchingType
+from transformer.utility.memo import (
+    create_memo_key,
+    is_preprocessing_deferred,
+    map_memoized,
+)
+from transformer.utility.parallel import is_parallel, run_in_pool
 from transformer.utility.pnml import (
     generate_subprocess_inner_id,
 )
@@ -90,23 +96,14 @@ class WorkflowOperatorWrapper(BaseModel):
 
 def find_workflow_subprocesses(net: Net):
     """Return all workflow subprocesses of a net."""
-    return [e for e in net.transitions if e.is_workflow_subprocess()]
+    return [
+        e for e in net.workflow_index.get_subprocesses() if isinstance(e, Transition)
+    ]
 
 
 def find_workflow_operators(net: Net):
     """Return all workflow operators of a net."""
-    operator_map: dict[str, list[NetElement]] = {}
-    for node in net._temp_elements.values():
-        if isinstance(node, Page):
-            continue
-        if not node.is_workflow_operator():
-            continue
-        if not node.toolspecific or not node.toolspecific.operator:
-            raise InternalTransformationException("Should not happen.")
-        op_id = node.toolspecific.operator.id
-        if op_id not in operator_map:
-            operator_map[op_id] = []
-        operator_map[op_id].append(node)
+    operator_map = net.workflow_index.get_operators()
     operator_wrappers: list[WorkflowOperatorWrapper] = []
     for op_id, operators in operator_map.items():
         o = WorkflowOperatorWrapper(
@@ -134,42 +131,90 @@ def find_workflow_operators(net: Net):
     return operator_wrappers
 
 
+def transform_page_net(
+    page_net: Net,
+    outer_source_id: str,
+    outer_sink_id: str,
+    caller_func: Callable[[Net], BPMN],
+    preprocess_func: Callable[[Net], object] | None = None,
+):
+    """Transform the net of a page connected to outer source and sink places.
+
+    Optionally the net is preprocessed first (if it is not yet preprocessed).
+    Returns the (renamed) page net and the inner process.
+    """
+    if preprocess_func is not None:
+        preprocess_func(page_net)
+
+    inner_source_id, inner_sink_id = (
+        page_net.get_element(outer_source_id),
+        page_net.get_element(outer_sink_id),
+    )
+
+    if (
+        page_net.get_in_degree(inner_source_id) > 0
+        or page_net.get_out_degree(inner_sink_id) > 0
+    ):
+        raise SubprocessWrongInnerSourceSinkDegree()
+
+    # Rename inner start and end event because bpmn wont allow same duplicated IDs
+    page_net.change_id(
+        inner_source_id.id, generate_subprocess_inner_id(inner_source_id.id)
+    )
+    page_net.change_id(inner_sink_id.id, generate_subprocess_inner_id(inner_sink_id.id))
+
+    return page_net, caller_func(page_net).process
+
+
 def handle_workflow_subprocesses(
     net: Net,
     bpmn: Process,
     to_handle_subprocesses: list[Transition],
     caller_func: Callable[[Net], BPMN],
+    preprocess_func: Callable[[Net], object],
 ):
-    """Add all found workflow subprocesses of a net as nodes to a bpmn."""
+    """Add all found workflow subprocesses of a net as nodes to a bpmn.
+
+    The pages are preprocessed and transformed in the process pool if the parallel
+    execution is active (see `is_parallel`). Pages transformed before in the same
+    context are taken from the memo (see `map_memoized`). Otherwise the pages are
+    expected to be preprocessed already. The processed page nets replace the sent
+    ones.
+    """
+    pages: list[Page] = []
+    jobs: list[tuple[Net, str, str]] = []
     for subprocess_transition in to_handle_subprocesses:
         sb_id = subprocess_transition.id
         page = net.get_page(sb_id)
-        page_net = page.net
 
         outer_source_id = list(net.get_incoming(sb_id))[0].source
         outer_sink_id = list(net.get_outgoing(sb_id))[0].target
 
-        inner_source_id, inner_sink_id = (
-            page_net.get_element(outer_source_id),
-            page_net.get_element(outer_sink_id),
-        )
+        pages.append(page)
+        jobs.append((page.net, outer_source_id, outer_sink_id))
 
-        if (
-            page_net.get_in_degree(inner_source_id) > 0
-            or page_net.get_out_degree(inner_sink_id) > 0
-        ):
-            raise SubprocessWrongInnerSourceSinkDegree()
+    siblings = len(net.pages)
+    preprocess = preprocess_func if is_preprocessing_deferred(siblings) else None
 
-        # Rename inner start and end event because bpmn wont allow same duplicated IDs
-        page_net.change_id(
-            inner_source_id.id, generate_subprocess_inner_id(inner_source_id.id)
-        )
-        page_net.change_id(
-            inner_sink_id.id, generate_subprocess_inner_id(inner_sink_id.id)
+    def transform_jobs(jobs: list[tuple[Net, str, str]]):
+        args = [(*job, caller_func, preprocess) for job in jobs]
+        if is_parallel(siblings):
+            return run_in_pool(transform_page_net, args)
+        return [transform_page_net(*job_args) for job_args in args]
+
+    def get_memo_key(job: tuple[Net, str, str]):
+        page_net, outer_source_id, outer_sink_id = job
+        return create_memo_key(
+            page_net, caller_func.__name__, outer_source_id, outer_sink_id
         )
 
-        inner_bpmn = caller_func(page_net).process
-        inner_bpmn.id = sb_id
+    results = map_memoized(transform_jobs, jobs, get_memo_key)
+
+    for subprocess_transition, page, (page_net, inner_bpmn) in zip(
+        to_handle_subprocesses, pages, results
+    ):
+        page.net = page_net
+        inner_bpmn.id = subprocess_transition.id
         inner_bpmn.name = subprocess_transition.get_name()
         inner_bpmn.isExecutable = None
         bpmn.add_node(inner_bpmn)
@@ -210,11 +255,7 @@ def find_role_type_of_subprocess(net: Net, current_role: str | None = None):
 
     Should there be more than one role a exception will be thrown.
     """
-    to_handle_temp_resources = [
-        elem
-        for elem in net._flatten_node_typ_map()
-        if isinstance(elem, NetElement) and elem.is_workflow_resource()
-    ]
+    to_handle_temp_resources = net.workflow_index.get_resources()
     for resource in to_handle_temp_resources:
         if not resource.toolspecific or not resource.toolspecific.transitionResource:
             raise InternalTransformationException("Not possible.")
@@ -233,11 +274,7 @@ def annotate_resources(net: Net, bpmn: BPMN):
     """Handle resources to participant if net if root element."""
     current_organization: str | None = None
     role_map: dict[str, list[str]] = {}
-    to_handle_temp_resources = [
-        elem
-        for elem in net._flatten_node_typ_map()
-        if isinstance(elem, NetElement) and elem.is_workflow_resource()
-    ]
+    to_handle_temp_resources = net.workflow_index.get_resources()
     for resource in to_handle_temp_resources:
         if not resource.toolspecific or not resource.toolspecific.transitionResource:
             raise InternalTransformationException("Not possible.")
@@ -274,10 +311,11 @@ def annotate_resources(net: Net, bpmn: BPMN):
         return
 
     # Add all elements without a role annotation to a Unkown lane
-    all_net_elements = net._flatten_node_typ_map()
-    all_net_ids = {node.id for node in all_net_elements}
+    all_net_ids = {node.id for node in net.get_elements()}.union(
+        page.id for page in net.pages
+    )
     unhandled_ids = all_net_ids.difference(handled_nodes).intersection(
-        [node.id for node in bpmn.process._flatten_node_typ_map()]
+        [node.id for node in bpmn.process.get_nodes()]
     )
     UNKOWN_LANE = "Unkown participant"
     role_map[UNKOWN_LANE] = list(unhandled_ids)
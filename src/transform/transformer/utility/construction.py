@@ -0,0 +1,111 @@
+"""Switch between validated and trusted construction of model instances.
+
+Validated construction runs the full pydantic validation. Trusted construction skips
+it like `model_construct`, so it must only be used for data that already has the
+right types (e.g. data created by the transformer itself). The verify mode builds
+both and fails on any difference; it is meant for tests.
+"""
+
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import deepcopy
+from enum import Enum
+from functools import cache, partial
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from exceptions import InternalTransformationException
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ConstructionMode(str, Enum):
+    """Construction mode definition."""
+
+    Validated = "validated"
+    Trusted = "trusted"
+    Verify = "verify"
+
+
+_mode: ContextVar[ConstructionMode] = ContextVar(
+    "construction_mode",
+    default=ConstructionMode(os.getenv("CONSTRUCTION_MODE", "validated")),
+)
+
+
+def get_construction_mode():
+    """Return the construction mode of the current context."""
+    return _mode.get()
+
+
+@contextmanager
+def construction_mode(mode: ConstructionMode) -> Iterator[ConstructionMode]:
+    """Use a construction mode within the current context."""
+    token = _mode.set(mode)
+    try:
+        yield mode
+    finally:
+        _mode.reset(token)
+
+
+@cache
+def get_field_defaults(model: type[BaseModel]):
+    """Return the shared defaults and the default factories of a model.
+
+    Like the validation, hashable defaults are shared and others are copied.
+    """
+    shared_defaults: dict[str, Any] = {}
+    default_factories: list[tuple[str, Callable[[], Any]]] = []
+    for name, field in model.model_fields.items():
+        if field.default_factory is not None:
+            default_factories.append((name, field.default_factory))  # type: ignore
+        elif field.is_required():
+            continue
+        elif field.default.__hash__:
+            shared_defaults[name] = field.default
+        else:
+            default_factories.append((name, partial(deepcopy, field.default)))
+    return shared_defaults, default_factories
+
+
+def trusted_construct(model: type[ModelT], **data: Any) -> ModelT:
+    """Return an instance of a model without validation (data by field names).
+
+    Same result as `model_construct` but the defaults are looked up once per model.
+    """
+    shared_defaults, default_factories = get_field_defaults(model)
+    values = {**shared_defaults, **data}
+    for name, default_factory in default_factories:
+        if name not in data:
+            values[name] = default_factory()
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(data))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    if model.__pydantic_post_init__:
+        instance.model_post_init(None)
+    else:
+        object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def construct(model: type[ModelT], **data: Any) -> ModelT:
+    """Return an instance of a model built in the current construction mode."""
+    mode = _mode.get()
+    if mode is ConstructionMode.Validated:
+        return model(**data)
+    trusted = trusted_construct(model, **data)
+    if mode is ConstructionMode.Verify:
+        verify_construction(model(**data), trusted)
+    return trusted
+
+
+def verify_construction(validated: BaseModel, trusted: BaseModel):
+    """Raise if a trusted instance differs from its validated counterpart."""
+    if validated != trusted:
+        raise InternalTransformationException(
+            f"Trusted {type(trusted).__name__} differs from validated instance."
+        )
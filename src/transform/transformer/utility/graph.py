@@ -0,0 +1,268 @@
+"""Compact directed graph core of the models.
+
+Node IDs are mapped once to dense integer indices. The edge endpoints are stored in
+integer arrays and the adjacency as lists of edge indices per node index, so lookups
+of connected edges and degrees are plain index lookups. The node and edge models are
+only kept as payloads (e.g. for the XML serialization).
+
+Read-only views of the nodes are cached until the next node is added or removed,
+which is tracked by a generation counter.
+"""
+
+from array import array
+from collections.abc import Callable, Hashable, Iterator
+from typing import Generic, TypeVar
+
+NodeT = TypeVar("NodeT")
+EdgeT = TypeVar("EdgeT")
+
+# Endpoint of an edge whose node was removed.
+DETACHED = -1
+
+
+class Graph(Generic[NodeT, EdgeT]):
+    """Directed multigraph with integer indexed nodes and edges.
+
+    Edges can reference node IDs without a node payload (e.g. nodes of other pages).
+    """
+
+    __slots__ = (
+        "_node_index",
+        "_nodes",
+        "_node_count",
+        "_incoming",
+        "_outgoing",
+        "_edge_index",
+        "_edges",
+        "_sources",
+        "_targets",
+        "_free_edges",
+        "_generation",
+        "_views",
+    )
+
+    def __init__(self):
+        """Create an empty graph."""
+        self._node_index: dict[str, int] = {}
+        self._nodes: list[NodeT | None] = []
+        self._node_count = 0
+        self._incoming: list[list[int]] = []
+        self._outgoing: list[list[int]] = []
+        self._edge_index: dict[Hashable, int] = {}
+        self._edges: list[EdgeT | None] = []
+        self._sources = array("q")
+        self._targets = array("q")
+        self._free_edges: list[int] = []
+        self._generation = 0
+        self._views: dict[Hashable, tuple[NodeT, ...]] = {}
+
+    def __eq__(self, other: object):
+        """Return whether both graphs have equal node and edge payloads by key."""
+        if not isinstance(other, Graph):
+            return NotImplemented
+        return (
+            self._get_node_payloads() == other._get_node_payloads()
+            and self._get_edge_payloads() == other._get_edge_payloads()
+        )
+
+    def _get_node_payloads(self):
+        """Return the node payloads by ID."""
+        nodes = self._nodes
+        return {
+            id: nodes[index]
+            for id, index in self._node_index.items()
+            if nodes[index] is not None
+        }
+
+    def _get_edge_payloads(self):
+        """Return the edge payloads by key."""
+        edges = self._edges
+        return {key: edges[edge_index] for key, edge_index in self._edge_index.items()}
+
+    @property
+    def node_count(self):
+        """Return the number of node payloads."""
+        return self._node_count
+
+    @property
+    def generation(self):
+        """Return the number of node changes (added or removed nodes)."""
+        return self._generation
+
+    def _bump_generation(self):
+        """Count a node change and drop the cached node views."""
+        self._generation += 1
+        self._views.clear()
+
+    def get_view(
+        self, key: Hashable, build: Callable[[], Iterator[NodeT]]
+    ) -> tuple[NodeT, ...]:
+        """Return a cached read-only view of nodes, built once per generation."""
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = tuple(build())
+        return view
+
+    def node_view(self):
+        """Return a cached read-only view of all node payloads in insertion order."""
+        return self.get_view(None, self.nodes)
+
+    def get_index(self, id: str):
+        """Return the index of a node ID (assigned on first use)."""
+        index = self._node_index.get(id)
+        if index is None:
+            index = self._node_index[id] = len(self._nodes)
+            self._nodes.append(None)
+            self._incoming.append([])
+            self._outgoing.append([])
+        return index
+
+    def add_node(self, id: str, node: NodeT):
+        """Add a node payload, return false if the ID already has one."""
+        index = self.get_index(id)
+        if self._nodes[index] is not None:
+            return False
+        self._nodes[index] = node
+        self._node_count += 1
+        self._bump_generation()
+        return True
+
+    def get_node(self, id: str):
+        """Return the node payload of an ID or None."""
+        index = self._node_index.get(id)
+        if index is None:
+            return None
+        return self._nodes[index]
+
+    def has_node(self, id: str):
+        """Return whether the ID has a node payload."""
+        return self.get_node(id) is not None
+
+    def nodes(self) -> Iterator[NodeT]:
+        """Yield all node payloads in insertion order."""
+        return (node for node in self._nodes if node is not None)
+
+    def remove_node(self, id: str):
+        """Remove a node and detach its edges.
+
+        The edges stay connected at their other end. Returns the detached incoming
+        and outgoing edges.
+        """
+        index = self._node_index.get(id)
+        if index is None or self._nodes[index] is None:
+            raise KeyError(id)
+        del self._node_index[id]
+        self._nodes[index] = None
+        self._node_count -= 1
+        self._bump_generation()
+        incoming, outgoing = self._incoming[index], self._outgoing[index]
+        self._incoming[index], self._outgoing[index] = [], []
+        for edge_index in incoming:
+            self._targets[edge_index] = DETACHED
+        for edge_index in outgoing:
+            self._sources[edge_index] = DETACHED
+        return self._get_edges(incoming), self._get_edges(outgoing)
+
+    def add_edge(self, key: Hashable, source_id: str, target_id: str, edge: EdgeT):
+        """Add an edge payload by key, return false if the key already exists."""
+        if key in self._edge_index:
+            return False
+        source, target = self.get_index(source_id), self.get_index(target_id)
+        if self._free_edges:
+            edge_index = self._free_edges.pop()
+            self._edges[edge_index] = edge
+            self._sources[edge_index] = source
+            self._targets[edge_index] = target
+        else:
+            edge_index = len(self._edges)
+            self._edges.append(edge)
+            self._sources.append(source)
+            self._targets.append(target)
+        self._edge_index[key] = edge_index
+        self._outgoing[source].append(edge_index)
+        self._incoming[target].append(edge_index)
+        return True
+
+    def get_edge(self, key: Hashable):
+        """Return the edge payload of a key or None."""
+        edge_index = self._edge_index.get(key)
+        if edge_index is None:
+            return None
+        return self._edges[edge_index]
+
+    def has_edge(self, key: Hashable):
+        """Return whether an edge with the key exists."""
+        return key in self._edge_index
+
+    def remove_edge(self, key: Hashable) -> EdgeT:
+        """Remove an edge by key and return its payload."""
+        edge_index = self._edge_index.pop(key)
+        source, target = self._sources[edge_index], self._targets[edge_index]
+        if source != DETACHED:
+            self._outgoing[source].remove(edge_index)
+        if target != DETACHED:
+            self._incoming[target].remove(edge_index)
+        edge = self._edges[edge_index]
+        self._edges[edge_index] = None
+        self._free_edges.append(edge_index)
+        return edge  # type: ignore
+
+    def reconnect_edge(
+        self, key: Hashable, new_key: Hashable, source_id: str, target_id: str
+    ):
+        """Move an edge to new endpoints and key in place.
+
+        Returns false (and keeps the edge unchanged) if the new key already exists.
+        """
+        if new_key != key and new_key in self._edge_index:
+            return False
+        edge_index = self._edge_index.pop(key)
+        source, target = self._sources[edge_index], self._targets[edge_index]
+        if source != DETACHED:
+            self._outgoing[source].remove(edge_index)
+        if target != DETACHED:
+            self._incoming[target].remove(edge_index)
+        source, target = self.get_index(source_id), self.get_index(target_id)
+        self._sources[edge_index] = source
+        self._targets[edge_index] = target
+        self._outgoing[source].append(edge_index)
+        self._incoming[target].append(edge_index)
+        self._edge_index[new_key] = edge_index
+        return True
+
+    def change_edge_key(self, old_key: Hashable, new_key: Hashable):
+        """Change the key of an existing edge."""
+        self._edge_index[new_key] = self._edge_index.pop(old_key)
+
+    def get_incoming(self, id: str):
+        """Return the incoming edge payloads of a node ID."""
+        index = self._node_index.get(id)
+        if index is None:
+            return []
+        return self._get_edges(self._incoming[index])
+
+    def get_outgoing(self, id: str):
+        """Return the outgoing edge payloads of a node ID."""
+        index = self._node_index.get(id)
+        if index is None:
+            return []
+        return self._get_edges(self._outgoing[index])
+
+    def get_in_degree(self, id: str):
+        """Return the number of incoming edges of a node ID."""
+        index = self._node_index.get(id)
+        if index is None:
+            return 0
+        return len(self._incoming[index])
+
+    def get_out_degree(self, id: str):
+        """Return the number of outgoing edges of a node ID."""
+        index = self._node_index.get(id)
+        if index is None:
+            return 0
+        return len(self._outgoing[index])
+
+    def _get_edges(self, edge_indices: list[int]) -> list[EdgeT]:
+        """Return the edge payloads of edge indices."""
+        edges = self._edges
+        return [edges[edge_index] for edge_index in edge_indices]  # type: ignore
@@ -0,0 +1,152 @@
+"""Memoization of transformed subprocesses and pages.
+
+The results of `transform_subprocess` and `transform_page_net` are stored by the
+fingerprint of the (sub)model before its preprocessing and the context that affects
+the result: the transformation, the IDs of the outer connecting nodes, the
+organization and the participant mapping. Subprocesses that were already
+transformed (e.g. unchanged subprocesses of a diagram that is posted again) are
+therefore not preprocessed and transformed again. For this, subprocesses are
+preprocessed with their transformation while the memo is used.
+
+The results are stored pickled, so each hit returns new instances that the caller
+may change. The memo is shared by the requests of a process and the least recently
+used results are evicted by their pickled size (env SUBPROCESS_MEMO_BYTES, 0
+disables the memo).
+"""
+
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from transformer.equality.fingerprint import get_fingerprint, hash_canonical
+from transformer.models.bpmn.bpmn import Process
+from transformer.models.pnml.pnml import Net
+from transformer.utility.parallel import is_parallel
+
+JobT = TypeVar("JobT")
+ResultT = TypeVar("ResultT")
+
+# Disabled by default, the fingerprints cost about as much as the transformation
+# of simple subprocesses.
+DEFAULT_MAX_BYTES = 0
+
+
+@dataclass
+class MemoStats:
+    """Counters of the memo lookups."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+class SubprocessMemo:
+    """Pickled results by key, bounded by their total size."""
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty memo with the maximum total size of the results."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.stats = MemoStats()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of stored results."""
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        """Return a new instance of the result of a key (None if missing)."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return pickle.loads(value)
+
+    def put(self, key: str, result: Any):
+        """Store the result of a key and evict the least recently used results."""
+        value = pickle.dumps(result)
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+def create_subprocess_memo():
+    """Return a new memo configured by the env (None if disabled)."""
+    max_bytes = int(os.getenv("SUBPROCESS_MEMO_BYTES", DEFAULT_MAX_BYTES))
+    return SubprocessMemo(max_bytes) if max_bytes > 0 else None
+
+
+_memo: ContextVar[SubprocessMemo | None] = ContextVar(
+    "subprocess_memo", default=create_subprocess_memo()
+)
+
+
+def get_subprocess_memo():
+    """Return the memo of the current context (None if disabled)."""
+    return _memo.get()
+
+
+@contextmanager
+def subprocess_memo(memo: SubprocessMemo | None) -> Iterator[SubprocessMemo | None]:
+    """Use a memo (None to disable it) within the current context."""
+    token = _memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _memo.reset(token)
+
+
+def is_preprocessing_deferred(siblings: int):
+    """Return whether sibling subprocesses are preprocessed with their transformation.
+
+    This is the case in the process pool and with the memo, which looks up the
+    subprocesses before they are preprocessed.
+    """
+    return is_parallel(siblings) or (siblings > 0 and get_subprocess_memo() is not None)
+
+
+def create_memo_key(model: Process | Net, *context: Any):
+    """Return the key of the result for a (sub)model in a context."""
+    return hash_canonical([get_fingerprint(model), *context])
+
+
+def map_memoized(
+    run_jobs: Callable[[list[JobT]], list[ResultT]],
+    jobs: list[JobT],
+    get_key: Callable[[JobT], str],
+) -> list[ResultT]:
+    """Return the results of the jobs, only the jobs without stored result are run.
+
+    The keys are created before running the jobs, since jobs may change their
+    models. Returns the results in the order of the jobs.
+    """
+    memo = get_subprocess_memo()
+    if memo is None:
+        return run_jobs(jobs)
+
+    keys = [get_key(job) for job in jobs]
+    results: list[ResultT | None] = [memo.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results  # type: ignore
+    for i, result in zip(missing, run_jobs([jobs[i] for i in missing])):
+        memo.put(keys[i], result)
+        results[i] = result
+    return results  # type: ignore
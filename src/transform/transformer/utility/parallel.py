@@ -0,0 +1,108 @@
+"""Parallel preprocessing and transformation of sibling subprocesses and pages.
+
+With more than one worker (env SUBPROCESS_WORKERS or `subprocess_workers`), the
+sibling subprocesses of a process (or pages of a net) are preprocessed and
+transformed in a shared process pool. The jobs and results are pickled without the
+helper structures of the models, which are rebuilt from the fields in the receiving
+process. The results are returned in the order of the jobs, so they are stitched
+together like in the sequential transformation.
+
+Within the workers all nested subprocesses are handled sequentially.
+"""
+
+import atexit
+import multiprocessing
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, TypeVar
+
+from transformer.utility.passes import (
+    PassStats,
+    collect_pass_stats,
+    record_pass_stats,
+)
+
+ResultT = TypeVar("ResultT")
+
+_workers: ContextVar[int] = ContextVar(
+    "subprocess_workers", default=int(os.getenv("SUBPROCESS_WORKERS", "0"))
+)
+
+# Whether the current process is a worker of the pool.
+_is_worker = False
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def get_subprocess_workers():
+    """Return the number of workers for subprocesses in the current context."""
+    return _workers.get()
+
+
+@contextmanager
+def subprocess_workers(workers: int) -> Iterator[int]:
+    """Use a number of workers for subprocesses within the current context."""
+    token = _workers.set(workers)
+    try:
+        yield workers
+    finally:
+        _workers.reset(token)
+
+
+def is_parallel(siblings: int):
+    """Return whether a number of sibling subprocesses is handled in the pool."""
+    return not _is_worker and siblings > 1 and get_subprocess_workers() > 1
+
+
+def _init_worker():
+    """Mark the process as worker (nested subprocesses are handled sequentially)."""
+    global _is_worker
+    _is_worker = True
+
+
+def _shutdown_pools():
+    """Shut down all started pools."""
+    for pool in _pools.values():
+        pool.shutdown(cancel_futures=True)
+    _pools.clear()
+
+
+atexit.register(_shutdown_pools)
+
+
+def get_pool(workers: int):
+    """Return the shared pool with a number of workers (started on first use)."""
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return pool
+
+
+def _run_job(
+    func: Callable[..., ResultT], job: tuple[Any, ...]
+) -> tuple[ResultT, list[PassStats]]:
+    """Run a job in a worker and return the result with the pass statistics."""
+    with collect_pass_stats([]) as stats:
+        return func(*job), stats
+
+
+def run_in_pool(func: Callable[..., ResultT], jobs: list[tuple[Any, ...]]):
+    """Run a module level function for the arguments of each job in the pool.
+
+    Returns the results in the order of the jobs. The pass statistics of the workers
+    are added to the current context.
+    """
+    pool = get_pool(get_subprocess_workers())
+    results: list[ResultT] = []
+    for result, stats in pool.map(partial(_run_job, func), jobs):
+        record_pass_stats(stats)
+        results.append(result)
+    return results
@@ -0,0 +1,180 @@
+"""Manager of the preprocessing passes of the transformations.
+
+A pass declares the inputs it needs, either as a check of an index of the model
+(e.g. "has OR-gateways" or "has workflow operators") or as a predicate on single
+elements (e.g. "is a dangling transition"). Passes without inputs are skipped.
+
+The element predicates of all remaining passes are evaluated together in one
+traversal of the model elements, which stays valid until a pass actually runs.
+Consecutive passes without inputs therefore cost at most one traversal. The passes
+themselves are not merged, because each pass relies on the rewrites of the passes
+before it.
+
+For each pass and (sub)model the wall time and the change of the number of elements
+and connections are recorded. They are returned and added to the list collecting
+the statistics in the current context (see `collect_pass_stats`).
+"""
+
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+ModelT = TypeVar("ModelT")
+ElementT = TypeVar("ElementT")
+
+
+@dataclass(frozen=True)
+class Pass(Generic[ModelT, ElementT]):
+    """Preprocessing pass with the inputs it needs.
+
+    Attributes:
+        run: Applies the pass to a single (sub)model.
+        needs: Index check whether the model contains inputs of the pass.
+        needs_element: Predicate whether an element of the model is an input.
+    """
+
+    run: Callable[[ModelT], None]
+    needs: Callable[[ModelT], bool] | None = None
+    needs_element: Callable[[ModelT, ElementT], bool] | None = None
+
+    @property
+    def name(self):
+        """Return the name of the pass."""
+        return self.run.__name__
+
+
+@dataclass(frozen=True)
+class PassStats:
+    """Recorded run (or skip) of a pass on a single (sub)model."""
+
+    name: str
+    model_id: str | None
+    skipped: bool
+    seconds: float = 0.0
+    elements_delta: int = 0
+    connections_delta: int = 0
+
+
+@dataclass(frozen=True)
+class PassModel(Generic[ModelT, ElementT]):
+    """Accessors of a model type used by the pass manager.
+
+    Attributes:
+        get_id: Returns the ID of a model (for the statistics).
+        get_children: Returns the submodels (subprocesses, pages) of a model.
+        get_elements: Returns the elements of a model (traversed for predicates).
+        count: Returns the number of elements and connections of a model.
+    """
+
+    get_id: Callable[[ModelT], str | None]
+    get_children: Callable[[ModelT], Iterable[ModelT]]
+    get_elements: Callable[[ModelT], Iterable[ElementT]]
+    count: Callable[[ModelT], tuple[int, int]]
+
+
+_collected_stats: ContextVar[list[PassStats] | None] = ContextVar(
+    "collected_pass_stats", default=None
+)
+
+
+@contextmanager
+def collect_pass_stats(stats: list[PassStats]) -> Iterator[list[PassStats]]:
+    """Collect the statistics of all passes run within the current context."""
+    token = _collected_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _collected_stats.reset(token)
+
+
+def record_pass_stats(stats: Iterable[PassStats]):
+    """Add statistics to the collecting list of the current context (if any)."""
+    collected = _collected_stats.get()
+    if collected is not None:
+        collected.extend(stats)
+
+
+def find_element_inputs(
+    model: ModelT,
+    elements: Iterable[ElementT],
+    passes: Sequence[Pass[ModelT, ElementT]],
+):
+    """Return the passes with an element predicate that matches any element.
+
+    All predicates are checked in a single traversal which stops as soon as every
+    pass has a match.
+    """
+    pending = [p for p in passes if p.needs_element is not None]
+    found: set[int] = set()
+    if not pending:
+        return found
+    for element in elements:
+        for p in pending:
+            if p.needs_element(model, element):  # type: ignore
+                found.add(id(p))
+        pending = [p for p in pending if id(p) not in found]
+        if not pending:
+            break
+    return found
+
+
+def run_passes(
+    model: ModelT,
+    passes: Sequence[Pass[ModelT, ElementT]],
+    accessors: PassModel[ModelT, ElementT],
+):
+    """Recursively run the passes on each submodel and then on the model.
+
+    Returns the statistics of each pass and (sub)model in the order of execution.
+    """
+    stats: list[PassStats] = []
+    _run_passes(model, passes, accessors, stats)
+    record_pass_stats(stats)
+    return stats
+
+
+def _run_passes(
+    model: ModelT,
+    passes: Sequence[Pass[ModelT, ElementT]],
+    accessors: PassModel[ModelT, ElementT],
+    stats: list[PassStats],
+):
+    """Run the passes on each submodel and the model, append the statistics."""
+    for child in accessors.get_children(model):
+        _run_passes(child, passes, accessors, stats)
+
+    model_id = accessors.get_id(model)
+    element_inputs: set[int] | None = None
+    for i, p in enumerate(passes):
+        if p.needs is not None and not p.needs(model):
+            stats.append(PassStats(p.name, model_id, skipped=True))
+            continue
+        if p.needs_element is not None:
+            if element_inputs is None:
+                element_inputs = find_element_inputs(
+                    model, accessors.get_elements(model), passes[i:]
+                )
+            if id(p) not in element_inputs:
+                stats.append(PassStats(p.name, model_id, skipped=True))
+                continue
+
+        elements_before, connections_before = accessors.count(model)
+        start = time.perf_counter()
+        p.run(model)
+        seconds = time.perf_counter() - start
+        elements_after, connections_after = accessors.count(model)
+        # The model changed, element inputs have to be found again.
+        element_inputs = None
+        stats.append(
+            PassStats(
+                p.name,
+                model_id,
+                skipped=False,
+                seconds=seconds,
+                elements_delta=elements_after - elements_before,
+                connections_delta=connections_after - connections_before,
+            )
+        )
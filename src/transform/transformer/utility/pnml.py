@@ -1,6 +1,5 @@
 """Shared PNML related helper functions."""
 
-from transformer.models.pnml.base import NetElement
 from transformer.models.pnml.pnml import Net
 
 
@@ -31,12 +30,4 @@ def generate_sink_id(id: str):
 
 def find_triggers(net: Net):
     """Find all event triggers."""
-    all_types = net._flatten_node_typ_map()
-
-    net_elements: list[NetElement] = [
-        node for node in all_types if isinstance(node, NetElement)
-    ]
-    triggers: list[NetElement] = [
-        trigger for trigger in net_elements if trigger.is_workflow_event_trigger()
-    ]
-    return triggers
+    return net.workflow_index.get_event_triggers()
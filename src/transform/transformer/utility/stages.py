@@ -0,0 +1,76 @@
+"""Reporting of the stages of a transformation.
+
+A transformation runs the stages parse, preprocess, transform and serialize. The
+preprocess and transform stages are reported by the transformations, parsing and
+serialization by their callers (see `run_stage`). Setting the graphics of a BPMN is
+reported as nested stage of its serialization. The observers of the current context
+(see `observe_stages`) are notified when a stage starts and finishes, e.g. to report
+the progress of a job or to record metrics. Without observers a stage only costs a
+lookup of the context.
+
+Subprocesses and pages that are preprocessed with their transformation (in the
+process pool or with the memo) are part of the transform stage.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+
+
+class Stage(str, Enum):
+    """Stage of a transformation in the order of execution."""
+
+    Parse = "parse"
+    Preprocess = "preprocess"
+    Transform = "transform"
+    Serialize = "serialize"
+    SetGraphics = "set_graphics"
+
+
+class StageObserver(ABC):
+    """Receiver of the stage notifications of a transformation."""
+
+    @abstractmethod
+    def start_stage(self, stage: Stage):
+        """Handle the start of a stage."""
+
+    @abstractmethod
+    def finish_stage(self, stage: Stage, seconds: float):
+        """Handle the successful end of a stage with its wall time."""
+
+
+_observers: ContextVar[tuple[StageObserver, ...]] = ContextVar(
+    "stage_observers", default=()
+)
+
+
+@contextmanager
+def observe_stages(observer: StageObserver) -> Iterator[StageObserver]:
+    """Notify an observer (besides the outer ones) of the stages run in the context."""
+    token = _observers.set((*_observers.get(), observer))
+    try:
+        yield observer
+    finally:
+        _observers.reset(token)
+
+
+@contextmanager
+def run_stage(stage: Stage) -> Iterator[None]:
+    """Report a stage to the observers of the current context.
+
+    A stage that raises an exception is not reported as finished.
+    """
+    observers = _observers.get()
+    if not observers:
+        yield
+        return
+    for observer in observers:
+        observer.start_stage(stage)
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    for observer in observers:
+        observer.finish_stage(stage, seconds)
@@ -26,13 +26,6 @@ def create_arc_name(source: str | None, target: str | None):
     return f"{source}TO{target}"
 
 
-def clean_xml_string(xml_string: str):
-    """Add XML header if not already existing."""
-    if not xml_string.startswith("<?xml"):
-        xml_string = '<?xml version="1.0" encoding="UTF-8"?>' + xml_string
-    return xml_string
-
-
 class BaseModel(
     BaseXmlModel,
     search_mode="unordered",
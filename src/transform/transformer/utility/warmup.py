@@ -0,0 +1,54 @@
+"""Warm-up of the transformer before serving requests.
+
+Transforming a small diagram in both directions imports all transformer modules and
+initializes the lazily created parts of the pydantic_xml models (e.g. the element
+lookups of the readers and the serializers). In a pre-forking server this runs in
+the master, so the workers share the warmed state instead of each paying for it
+with their first request.
+
+Subprocesses are transformed sequentially and without memo during the warm-up, so
+no process pool is started before the workers are forked.
+"""
+
+from transformer.models.bpmn.bpmn import BPMN
+from transformer.models.pnml.pnml import Pnml
+from transformer.transform_bpmn_to_petrinet.transform import bpmn_to_workflow_net
+from transformer.transform_petrinet_to_bpmn.transform import pnml_to_bpmn
+from transformer.utility.memo import subprocess_memo
+from transformer.utility.parallel import subprocess_workers
+
+WARM_UP_BPMN = b"""<?xml version="1.0" encoding="UTF-8"?>
+<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" id="warmup">
+  <bpmn:process id="process" isExecutable="false">
+    <bpmn:startEvent id="start" />
+    <bpmn:exclusiveGateway id="split" />
+    <bpmn:task id="task" name="task" />
+    <bpmn:subProcess id="subprocess" name="subprocess">
+      <bpmn:startEvent id="inner_start" />
+      <bpmn:task id="inner_task" name="inner task" />
+      <bpmn:endEvent id="inner_end" />
+      <bpmn:sequenceFlow id="f1" sourceRef="inner_start" targetRef="inner_task" />
+      <bpmn:sequenceFlow id="f2" sourceRef="inner_task" targetRef="inner_end" />
+    </bpmn:subProcess>
+    <bpmn:exclusiveGateway id="join" />
+    <bpmn:endEvent id="end" />
+    <bpmn:sequenceFlow id="f3" sourceRef="start" targetRef="split" />
+    <bpmn:sequenceFlow id="f4" sourceRef="split" targetRef="task" />
+    <bpmn:sequenceFlow id="f5" sourceRef="split" targetRef="subprocess" />
+    <bpmn:sequenceFlow id="f6" sourceRef="task" targetRef="join" />
+    <bpmn:sequenceFlow id="f7" sourceRef="subprocess" targetRef="join" />
+    <bpmn:sequenceFlow id="f8" sourceRef="join" targetRef="end" />
+  </bpmn:process>
+</bpmn:definitions>
+"""
+
+
+def warm_up():
+    """Transform a small diagram to a workflow net and back.
+
+    Returns the serialized BPMN of the round trip.
+    """
+    with subprocess_workers(0), subprocess_memo(None):
+        pnml = bpmn_to_workflow_net(BPMN.from_xml(WARM_UP_BPMN))
+        bpmn = pnml_to_bpmn(Pnml.from_xml_str(pnml.to_string().encode()))
+    return bpmn.to_string()
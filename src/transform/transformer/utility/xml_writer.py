@@ -0,0 +1,257 @@
+"""Incremental XML writer for the pydantic_xml models.
+
+pydantic_xml builds the complete element tree of a model before serializing it. The
+writer walks the model instead and only serializes the leaf elements (e.g. a place
+or a task) as a whole, so the memory peak is bound by the largest leaf element and
+not by the document. Models with collections of sub-models (e.g. a net or a
+process) are written as start tag, children and end tag.
+
+It works with both etree backends of pydantic_xml (lxml and the standard library).
+The writer relies on internal serializers of pydantic_xml, which is therefore pinned
+to an exact version. Its tests compare the output with `to_xml` for all assets.
+"""
+
+import io
+from collections.abc import Callable, Iterator
+from functools import cache
+from typing import IO, Any
+from xml.sax.saxutils import escape
+
+import pydantic_core
+from pydantic_xml import BaseXmlModel
+from pydantic_xml.element.native import ElementT, XmlElement
+from pydantic_xml.serializers.factories.homogeneous import ElementSerializer
+from pydantic_xml.serializers.factories.model import ModelProxySerializer
+from pydantic_xml.serializers.factories.union import (
+    ModelSerializer as UnionModelSerializer,
+)
+from pydantic_xml.serializers.serializer import Serializer
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+CHUNK_SIZE = 1 << 16
+
+# Write empty elements and namespace declarations like the etree backend of
+# pydantic_xml (lxml keeps the namespace map order, ElementTree sorts by prefix).
+LXML_BACKEND = XmlElement.__module__.endswith("lxml")
+EMPTY_END = "/>" if LXML_BACKEND else " />"
+ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+def iter_xml(model: BaseXmlModel, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the XML document (with declaration) of a model in chunks.
+
+    Args:
+        model: Model with a tag, its namespace map must cover all used namespaces.
+        chunk_size: Minimal length of the yielded chunks (except the last one).
+    """
+    nsmap = model.__xml_nsmap__ or {}
+    prefixes = {uri: prefix for prefix, uri in nsmap.items()}
+    declarations = {
+        f"xmlns:{prefix}" if prefix else "xmlns": uri
+        for prefix, uri in (nsmap.items() if LXML_BACKEND else sorted(nsmap.items()))
+    }
+    serializer = model.__xml_serializer__
+    assert serializer is not None
+
+    chunk = [XML_DECLARATION]
+    size = len(XML_DECLARATION)
+    for part in iter_model_element(
+        serializer.element_name, model, prefixes, skip_empty=False, root=declarations
+    ):
+        chunk.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def write_xml(model: BaseXmlModel, sink: IO[str] | IO[bytes]):
+    """Write the XML document of a model to a text or byte (UTF-8) sink."""
+    if isinstance(sink, io.TextIOBase):
+        for chunk in iter_xml(model):
+            sink.write(chunk)
+    else:
+        for chunk in iter_xml(model):
+            sink.write(chunk.encode())  # type: ignore
+
+
+def to_xml_string(model: BaseXmlModel):
+    """Return the XML document (with declaration) of a model."""
+    return "".join(iter_xml(model))
+
+
+@cache
+def get_streamed_fields(model: type[BaseXmlModel]) -> frozenset[str]:
+    """Return the fields of a model that are written element by element.
+
+    These are collections of sub-models and sub-models that contain such collections.
+    """
+    serializer = model.__xml_serializer__
+    assert serializer is not None
+    fields = serializer.fields_serializers
+    collections = {
+        name
+        for name, field_serializer in fields.items()
+        if isinstance(field_serializer, ElementSerializer)
+        and isinstance(
+            get_item_serializer(field_serializer),
+            ModelProxySerializer | UnionModelSerializer,
+        )
+    }
+    if collections:
+        return frozenset(collections)
+    return frozenset(
+        name
+        for name, field_serializer in fields.items()
+        if isinstance(field_serializer, ModelProxySerializer)
+        and get_streamed_fields(field_serializer.model)
+    )
+
+
+def get_item_serializer(collection_serializer: ElementSerializer) -> Serializer:
+    """Return the serializer of the items of a collection."""
+    return collection_serializer._inner_serializer
+
+
+def iter_model_element(
+    tag: str,
+    model: BaseXmlModel,
+    prefixes: dict[str, str],
+    skip_empty: bool,
+    root: dict[str, str] | None = None,
+) -> Iterator[str]:
+    """Yield the serialized element of a model (start tag, children and end tag)."""
+    model_type = type(model)
+    serializer = model_type.__xml_serializer__
+    assert serializer is not None
+    if model_type.__xml_skip_empty__ is not None:
+        skip_empty = model_type.__xml_skip_empty__
+    streamed = get_streamed_fields(model_type)
+    encoded = encode(model, exclude=streamed)
+
+    # Non streamed fields are small and serialized at once. Each field is serialized
+    # separately to keep the order of the children.
+    attributes = dict(root or {})
+    text = None
+    children: dict[str, list[Any]] = {}
+    for name, field_serializer in serializer.fields_serializers.items():
+        if name in streamed:
+            continue
+        part = XmlElement(tag)
+        field_serializer.serialize(
+            part, getattr(model, name), encoded[name], skip_empty=skip_empty
+        )
+        native = part.to_native()
+        attributes.update(native.attrib)
+        text = native.text or text
+        children[name] = list(native)
+
+    def iter_children():
+        for name, field_serializer in serializer.fields_serializers.items():
+            if name not in streamed:
+                for child in children[name]:
+                    yield serialize_element(child, prefixes)
+            elif isinstance(field_serializer, ModelProxySerializer):
+                value = getattr(model, name)
+                if value is not None:
+                    yield from iter_model_element(
+                        field_serializer.element_name, value, prefixes, skip_empty
+                    )
+            else:
+                yield from iter_collection(
+                    field_serializer, getattr(model, name), prefixes, skip_empty
+                )
+
+    qualified_tag = qualify(tag, prefixes)
+    start = f"<{qualified_tag}{serialize_attributes(attributes, prefixes)}"
+    body = iter_children()
+    first_child = next(body, None)
+    if first_child is None and not text:
+        if attributes or not skip_empty or root is not None:
+            yield f"{start}{EMPTY_END}"
+        return
+    yield f"{start}>{escape(text or '')}"
+    if first_child is not None:
+        yield first_child
+        yield from body
+    yield f"</{qualified_tag}>"
+
+
+def iter_collection(
+    collection_serializer: ElementSerializer,
+    items: Any,
+    prefixes: dict[str, str],
+    skip_empty: bool,
+) -> Iterator[str]:
+    """Yield the serialized elements of a collection of sub-models item by item."""
+    if items is None:
+        return
+    item_serializer = get_item_serializer(collection_serializer)
+    stream_items = isinstance(item_serializer, ModelProxySerializer) and bool(
+        get_streamed_fields(item_serializer.model)
+    )
+    for item in items:
+        if item is None:
+            continue
+        if stream_items:
+            assert isinstance(item_serializer, ModelProxySerializer)
+            yield from iter_model_element(
+                item_serializer.element_name, item, prefixes, skip_empty
+            )
+            continue
+        part = XmlElement("part")
+        item_serializer.serialize(part, item, encode(item), skip_empty=skip_empty)
+        for child in part.to_native():
+            yield serialize_element(child, prefixes)
+
+
+def encode(value: Any, exclude: frozenset[str] | None = None):
+    """Return the JSON compatible representation pydantic_xml serializes from."""
+    return pydantic_core.to_jsonable_python(
+        value,
+        by_alias=False,
+        exclude=exclude,
+        fallback=lambda obj: obj if not isinstance(obj, ElementT) else None,
+    )
+
+
+def qualify(name: str, prefixes: dict[str, str]):
+    """Return a tag or attribute name with namespace prefix instead of URI."""
+    if not name.startswith("{"):
+        return name
+    uri, local_name = name[1:].split("}", 1)
+    prefix = prefixes[uri]
+    return f"{prefix}:{local_name}" if prefix else local_name
+
+
+def serialize_attributes(attributes: dict[str, str], prefixes: dict[str, str]):
+    """Return the serialized attributes of a start tag."""
+    return "".join(
+        f' {qualify(name, prefixes)}="{escape(value, ATTRIBUTE_ENTITIES)}"'
+        for name, value in attributes.items()
+    )
+
+
+def serialize_element(element: Any, prefixes: dict[str, str]):
+    """Return a serialized (lxml or standard library) element."""
+    parts: list[str] = []
+    write_element(parts.append, element, prefixes)
+    return "".join(parts)
+
+
+def write_element(write: Callable[[str], Any], element: Any, prefixes: dict[str, str]):
+    """Write an element and its children like ElementTree does."""
+    tag = qualify(element.tag, prefixes)
+    write(f"<{tag}{serialize_attributes(element.attrib, prefixes)}")
+    if element.text or len(element):
+        write(f">{escape(element.text or '')}")
+        for child in element:
+            write_element(write, child, prefixes)
+        write(f"</{tag}>")
+    else:
+        write(EMPTY_END)
+    if element.tail:
+        write(escape(element.tail))